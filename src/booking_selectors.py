@@ -6,6 +6,10 @@ class SearchResults:
     
     # Selectores para enlaces de hoteles (lista de posibles candidatos)
     HOTEL_LINKS = 'a.e3859ef1a4, a[data-testid="title-link"], a[data-testid="property-card-desktop-single-image"], .c-property-card__title a'
+    
+    # Metadatos de la tarjeta (nombre, puntuación y número de comentarios)
+    CARD_TITLE = '[data-testid="title"], .c-property-card__title'
+    CARD_REVIEW_SCORE = '[data-testid="review-score"], .bui-review-score'
 
 class HotelPage:
     # Estrategias para obtener el nombre del hotel
@@ -29,8 +33,12 @@ class HotelPage:
     
     # Google One Tap
     GOOGLE_ONE_TAP_IFRAME = "iframe[id*='credential_picker']"
+    GOOGLE_ONE_TAP_CONTAINER = "#credential_picker_container, #credential_picker_iframe"
     GOOGLE_ONE_TAP_CLOSE = "#close"
     
+    # Banner de cookies
+    COOKIE_BANNER_ACCEPT = '#onetrust-accept-btn-handler, [data-gdpr-consent="accept"]'
+    
     # Estrategias para abrir la pestaña de reseñas (Tuplas By, Selector)
     OPEN_REVIEWS_STRATEGIES = [
         (By.CSS_SELECTOR, '[data-testid="review-score-link"]'),
@@ -56,5 +64,14 @@ class Reviews:
     BODY_FALLBACK = '.c-review-block__row'
     DATE = '[data-testid="review-date"], .c-review-block__date'
     
+    # Ordenamiento (modo incremental: más recientes primero)
+    SORT_TRIGGER = '[data-testid="sorters-dropdown-trigger"], #review_sort'
+    SORT_NEWEST_FIRST = '[data-id="NEWEST_FIRST"], option[value="f_recent_desc"]'
+    
     # Paginación
     NEXT_PAGE = '[data-testid="pagination-next-link"], button[aria-label="Next page"], button[aria-label="Página siguiente"]'
+
+class Blocking:
+    # Páginas de bloqueo / captcha (control de ritmo AIMD)
+    CAPTCHA = 'iframe[src*="captcha"], #px-captcha, .g-recaptcha, #challenge-form, [data-testid="captcha"]'
+    BLOCKED_TITLES = ["access denied", "acceso denegado", "forbidden", "too many requests", "just a moment", "are you a robot"]
@@ -9,6 +9,12 @@ DATA_DIR = os.path.join(PROJECT_ROOT, 'data')
 
 # URLs
 SEARCH_URL = "https://www.booking.com/searchresults.html?ss=Tlaxcala%2C+Tlaxcala%2C+M%C3%A9xico&lang=es"
+# Frontera de búsqueda: regiones (URLs de búsqueda) x particiones de filtros (query strings que se
+# añaden a cada región para quedar bajo el tope de resultados de Booking; vacío = sin particionar)
+SEARCH_URLS = [SEARCH_URL]
+SEARCH_PARTITIONS = [] # p. ej. ["nflt=class%3D1", "nflt=class%3D2", ...]
+SEARCH_PARALLELISM = 3 # Búsquedas (navegadores) simultáneas en la Fase 1
+REVIEW_LIST_URL = "https://www.booking.com/reviewlist.es.html" # Lista de reseñas direccionable por offset
 
 # Archivos (Rutas absolutas)
 LINKS_FILE = os.path.join(DATA_DIR, "tlaxcala_hotel_links.csv")
@@ -19,12 +25,79 @@ DATABASE_URL = f"sqlite:///{os.path.join(DATA_DIR, 'reviews.db')}"
 
 # Scraper Settings
 HEADLESS_MODE = False
+USER_AGENT_POOL_SIZE = 50 # User-Agents distintos en el pool rotativo
+USER_AGENT_CACHE_FILE = os.path.join(DATA_DIR, "user_agents.json") # Evita cargar el dataset de fake_useragent en cada arranque
+USER_AGENT_CACHE_TTL_HOURS = 24 * 7
 MAX_WAIT_TIME = 10
+POPUP_AUTODISMISS = True # Cerrar popups con un MutationObserver inyectado vía CDP
+REVIEWS_TRIGGER_TIMEOUT = 8 # Espera combinada (popups + disparadores) para abrir las reseñas
 HOTEL_VISIT_LIMIT = 0  # 0 = Todos
+LINKS_CACHE_TTL_HOURS = 24 # Reutilizar los enlaces de la última búsqueda completa si es más reciente (--refresh-links la ignora)
+STREAM_SEARCH_LINKS = True # Encolar los hoteles tras cada "Cargar más" para que los workers empiecen en segundos
 MAX_WORKERS = 8 # Número de navegadores simultáneos
+TABS_PER_BROWSER = 1 # Pestañas (hoteles en paralelo) por navegador; hilos = MAX_WORKERS * TABS_PER_BROWSER
+# Nodos WebDriver remotos (Selenium Grid/standalone): [{"url": "http://nodo1:4444", "capacity": 4}, ...].
+# Vacío = Chrome local. Con nodos, el número de navegadores lo fija la capacidad total en lugar de MAX_WORKERS.
+REMOTE_WEBDRIVER_NODES = []
+DRIVER_MAX_HOTELS = 25 # Reciclar cada navegador tras N hoteles
+DRIVER_MAX_RSS_MB = 1500 # ... o si su memoria supera este valor (requiere psutil; 0 = desactivado)
+LONGEST_JOB_FIRST = True # Procesar primero los hoteles con más reseñas esperadas
 MAX_REVIEWS_PER_HOTEL = 1000 # Límite de reseñas por hotel
-TIME_BETWEEN_PAGES_MIN = 2.0
-TIME_BETWEEN_PAGES_MAX = 3.5
+OFFSET_PAGINATION = False # Repartir las páginas de reseñas de hoteles grandes entre workers vía URLs con offset
+OFFSET_FANOUT_MIN_PAGES = 3 # Solo se reparte si el hotel tiene al menos estas páginas
+REVIEW_LIST_ROWS = 25 # Reseñas por página en la lista por offset
+HTTP_FETCHER = False # Descargar las páginas por offset con HTTP + lxml (Selenium como respaldo)
+HTTP_MAX_CONNECTIONS = 16 # Conexiones keep-alive (y peticiones simultáneas) por host
+HTTP_TIMEOUT = 15
+SNAPSHOT_STORE = False # Guardar el HTML de cada página (zstd, direccionado por contenido) para re-extraer sin navegar
+SNAPSHOT_DIR = os.path.join(DATA_DIR, "snapshots")
+SNAPSHOT_ZSTD_LEVEL = 3
+JS_EXTRACTION = True # Extraer cada página de reseñas con un solo execute_script
+INCREMENTAL_MODE = False # Revisitar hoteles ordenando por más recientes y parar en la primera página ya conocida
+SKIP_UNCHANGED_HOTELS = True # En modo incremental, omitir hoteles cuyo conteo de reseñas no cambió desde la última visita
+TIME_BETWEEN_PAGES_MIN = 2.0 # Pausa inicial entre páginas (el control AIMD la ajusta)
+TIME_BETWEEN_PAGES_MAX = 3.5 # ... más un jitter de hasta MAX - MIN
+RATE_CONTROL = True # Ajustar workers activos y pausa entre páginas según latencia, timeouts y bloqueos (AIMD)
+RATE_MIN_WORKERS = 1
+RATE_MIN_DELAY = 0.0 # Pausa mínima alcanzable mientras el sitio responde bien
+RATE_MAX_DELAY = 30.0
+RATE_DELAY_STEP = 0.1 # Reducción aditiva de la pausa por ronda de páginas correctas
+RATE_LATENCY_TARGET = 12.0 # Latencia media (s) por página por encima de la cual se considera congestión
+RATE_DECREASE_FACTOR = 0.5 # Reducción multiplicativa ante timeouts, bloqueos o latencia alta
+RATE_COOLDOWN = 10.0 # Segundos mínimos entre dos reducciones
+RETRY_MAX_ATTEMPTS = 4 # Fallos de un hotel antes de pasarlo a dead-letter (failed_hotels.dead)
+RETRY_BASE_DELAY = 60.0 # Espera (s) tras el primer fallo; se duplica en cada intento
+RETRY_MAX_BACKOFF = 6 * 3600.0
+RETRY_MAX_WAIT_IN_RUN = 300.0 # Al final de la ejecución se esperan reintentos que venzan dentro de este margen (s)
+RETRY_ROUNDS_IN_RUN = 1 # Rondas de reintento al final de una ejecución; el resto del backoff queda para las siguientes
+JOB_TABLE = False # Repartir los hoteles entre varios procesos/máquinas que comparten la DB (tabla hotel_jobs)
+JOB_LEASE_SECONDS = 300.0 # Un hotel reclamado vuelve a estar disponible si su proceso no renueva el lease en este tiempo
+JOB_HEARTBEAT_SECONDS = 60.0 # Cada cuánto se renuevan los leases de los hoteles en proceso
+JOB_POLL_SECONDS = 2.0 # Espera entre consultas a hotel_jobs cuando la cola local está llena o vacía
+JOB_IDLE_TIMEOUT = 120.0 # `--worker`: segundos sin trabajo en la tabla antes de terminar
+RESULT_QUEUE_MAXSIZE = 200 # Páginas de reseñas en espera de ser escritas
+BULK_INSERT_CHUNK_SIZE = 500 # Filas por sentencia INSERT (límite de variables de SQLite)
+
+# Bloqueo de recursos del navegador (CDP Network.setBlockedURLs)
+BLOCK_RESOURCES = True
+BLOCKED_RESOURCE_METRICS = True # Contar peticiones bloqueadas (usa el performance log de Chrome)
+BLOCKED_URL_PATTERNS = {
+    "images": ["*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.avif", "*.ico", "*.svg", "*/xdata/images/*"],
+    "media": ["*.mp4", "*.webm", "*.m3u8", "*.mp3"],
+    "fonts": ["*.woff", "*.woff2", "*.ttf", "*.otf"],
+    "third_party": [
+        "*doubleclick.net*", "*googletagmanager.com*", "*google-analytics.com*", "*googlesyndication.com*",
+        "*facebook.net*", "*facebook.com/tr*", "*hotjar.com*", "*criteo.*", "*bing.com/bat*",
+        "*accounts.google.com/gsi/*", # Google One Tap
+    ],
+    "maps": ["*maps.googleapis.com*", "*maps.gstatic.com*", "*api.mapbox.com*"],
+}
+# Categorías bloqueadas por tipo de página
+RESOURCE_POLICY = {
+    "search": ["images", "media", "fonts", "third_party", "maps"],
+    "hotel": ["images", "media", "fonts", "third_party", "maps"],
+    "reviews": ["images", "media", "fonts", "third_party", "maps"],
+}
 
 # Inference Settings
 BATCH_SIZE = 32
@@ -0,0 +1,85 @@
+from typing import Dict, Optional, Set
+
+from sqlalchemy import exists
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from src.models import HotelCrawlState, Review
+
+def get_crawl_state(db: Session, hotel_url: str) -> Optional[HotelCrawlState]:
+    """Devuelve el estado guardado de un hotel o None si nunca se visitó."""
+    return db.query(HotelCrawlState).filter(HotelCrawlState.hotel_url == hotel_url).first()
+
+def load_completion_map(db: Session) -> Dict[str, bool]:
+    """Mapa `hotel_url -> completed` de todos los hoteles con estado guardado."""
+    return dict(db.query(HotelCrawlState.hotel_url, HotelCrawlState.completed).all())
+
+def load_processed_urls(db: Session) -> Set[str]:
+    """
+    Conjunto de hoteles que no hace falta volver a visitar.
+
+    Incluye los hoteles con checkpoint completo y, por compatibilidad con ejecuciones
+    anteriores al checkpointing, los hoteles con reseñas guardadas pero sin checkpoint.
+    Ambas consultas usan índices, así que el costo es O(hoteles) y no O(reseñas).
+    """
+    completed = db.query(HotelCrawlState.hotel_url).filter(HotelCrawlState.completed.is_(True))
+    legacy = (
+        db.query(Review.hotel_url)
+        .filter(Review.hotel_url.isnot(None))
+        .filter(~exists().where(HotelCrawlState.hotel_url == Review.hotel_url))
+        .distinct()
+    )
+    return {url for (url,) in completed} | {url for (url,) in legacy}
+
+def load_known_review_counts(db: Session) -> Dict[str, int]:
+    """Conteo de reseñas que mostraba Booking en la última visita completa de cada hotel."""
+    rows = (
+        db.query(HotelCrawlState.hotel_url, HotelCrawlState.expected_count)
+        .filter(HotelCrawlState.completed.is_(True), HotelCrawlState.expected_count.isnot(None))
+        .all()
+    )
+    return dict(rows)
+
+def review_count_unchanged(current_count: Optional[int], known_count: Optional[int]) -> bool:
+    """True si el conteo actual coincide con el de la última visita completa (no hay reseñas nuevas)."""
+    return current_count is not None and known_count is not None and current_count == known_count
+
+def record_page_progress(
+    db: Session,
+    hotel_url: str,
+    page: Optional[int],
+    last_review_hash: Optional[str] = None,
+    expected_count: Optional[int] = None,
+    completed: bool = False,
+    saved_count: Optional[int] = None,
+) -> None:
+    """
+    Registra (upsert) el progreso de un hotel tras persistir una página de reseñas.
+
+    Args:
+        db (Session): Sesión de base de datos.
+        hotel_url (str): URL del hotel tal como se encoló.
+        page (int, optional): Última página cuyas reseñas ya están en la DB. None = no cambia
+            (páginas por offset, que no forman una secuencia contigua).
+        last_review_hash (str, optional): Hash de la última reseña guardada de esa página.
+        expected_count (int, optional): Conteo total de reseñas mostrado por Booking.
+        completed (bool): True solo cuando la paginación terminó de verdad.
+        saved_count (int, optional): Reseñas extraídas del hotel hasta `page` inclusive; al
+            reanudar es el offset de la primera reseña pendiente.
+    """
+    values = {"hotel_url": hotel_url, "completed": completed}
+    if page is not None:
+        values["last_page"] = page
+    if last_review_hash:
+        values["last_review_hash"] = last_review_hash
+    if expected_count is not None:
+        values["expected_count"] = expected_count
+    if saved_count is not None:
+        values["saved_count"] = saved_count
+
+    stmt = sqlite_insert(HotelCrawlState.__table__).values(**values)
+    updates = {key: stmt.excluded[key] for key in values if key != "hotel_url"}
+    updates["updated_at"] = func.now()
+    db.execute(stmt.on_conflict_do_update(index_elements=["hotel_url"], set_=updates))
+    db.commit()
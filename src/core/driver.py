@@ -1,25 +1,41 @@
+import copy
+import itertools
+import json
 import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Set
+
 from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.switch_to import SwitchTo
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
-from fake_useragent import UserAgent
-import os
+
+try:
+    import psutil
+except ImportError:  # Sin psutil no se recicla por memoria, solo por número de hoteles
+    psutil = None
 
 from src import config
+from src.core.user_agents import random_user_agent, user_agent_pool
 
+@lru_cache(maxsize=None)
 def get_driver_path():
     """
-    Instala/Verifica el driver una sola vez y retorna la ruta del ejecutable.
+    Instala/Verifica el driver una sola vez por proceso y retorna la ruta del ejecutable.
     """
     logging.info("🔧 Verificando ChromeDriver...")
     return ChromeDriverManager().install()
 
-def initialize_driver(executable_path: str = None):
-    """
-    Inicializa Chrome con opciones anti-detección, idioma español y rotación de User-Agent.
-    """
-    logging.info("🚀 Iniciando WebDriver (Core)...")
+@lru_cache(maxsize=None)
+def _base_chrome_options() -> Options:
+    """Opciones comunes a todos los navegadores; se construyen una vez por proceso."""
     options = Options()
     
     if config.HEADLESS_MODE:
@@ -39,29 +55,546 @@ def initialize_driver(executable_path: str = None):
     # Disable Google One Tap and other optimization features that might cause popups
     options.add_argument("--disable-features=OptimizationGuideModelDownloading,OptimizationHintsFetching,OptimizationTargetPrediction,OptimizationHints")
     
-    # User-Agent Rotativo
-    try:
-        ua = UserAgent()
-        user_agent = ua.random
-        logging.info(f"🎭 User-Agent asignado: {user_agent}")
-    except Exception as e:
-        logging.warning(f"⚠️ Falló fake-useragent ({e}), usando default.")
-        user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    
-    options.add_argument(f"user-agent={user_agent}")
-    
     options.add_argument("--log-level=3")
     options.add_argument("--disable-blink-features=AutomationControlled")
     
     # Opciones adicionales para estabilidad
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
-    
-    # Usar el path proporcionado o instalar si no se provee (fallback)
-    if executable_path:
-        service = Service(executable_path)
-    else:
-        service = Service(ChromeDriverManager().install())
-        
+
+    # Modo multi-pestaña: evitar que Chrome congele las pestañas en segundo plano y no bloquear
+    # al resto de pestañas hasta que carguen todos los recursos de una navegación
+    if config.TABS_PER_BROWSER > 1:
+        options.add_argument("--disable-background-timer-throttling")
+        options.add_argument("--disable-backgrounding-occluded-windows")
+        options.add_argument("--disable-renderer-backgrounding")
+        options.page_load_strategy = "eager"
+
+    # Performance log (solo red) para contar peticiones bloqueadas por la política de recursos
+    if config.BLOCK_RESOURCES and config.BLOCKED_RESOURCE_METRICS:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+    return options
+
+def build_chrome_options() -> Options:
+    """
+    Opciones de Chrome: anti-detección, idioma español y rotación de User-Agent.
+    Se usan igual para el Chrome local y para los nodos remotos. Copia las opciones base
+    (construidas una vez) y solo añade un User-Agent del pool cacheado (`user_agents`).
+    """
+    options = copy.deepcopy(_base_chrome_options())
+    user_agent = random_user_agent()
+    logging.info(f"🎭 User-Agent asignado: {user_agent}")
+    options.add_argument(f"user-agent={user_agent}")
+    return options
+
+def warm_up_driver_config() -> None:
+    """Carga el pool de User-Agents y las opciones base antes de arrancar navegadores en paralelo."""
+    _base_chrome_options()
+    user_agent_pool()
+
+def initialize_driver(executable_path: str = None):
+    """
+    Inicializa Chrome local con las opciones de `build_chrome_options`.
+    """
+    logging.info("🚀 Iniciando WebDriver (Core)...")
+    options = build_chrome_options()
+
+    # Usar el path proporcionado o el verificado una vez por proceso (fallback)
+    service = Service(executable_path or get_driver_path())
+
     driver = webdriver.Chrome(service=service, options=options)
     return driver
+
+
+def supports_cdp(driver) -> bool:
+    """
+    True si el driver acepta comandos CDP. Los drivers remotos lo comprueban al crearse
+    (`probe_cdp`); en un nodo sin CDP el bloqueo de recursos y el auto-cierre de popups se omiten.
+    """
+    return getattr(driver, "_cdp_supported", None) is not False and hasattr(driver, "execute_cdp_cmd")
+
+def probe_cdp(driver) -> bool:
+    """
+    Prueba un comando CDP inocuo y recuerda el resultado en el driver (ver `supports_cdp`).
+    En un `RemoteChrome` cuyo nodo no reenvía `goog/cdp/execute`, prueba el endpoint `se:cdp`.
+    """
+    try:
+        driver.execute_cdp_cmd("Browser.getVersion", {})
+        driver._cdp_supported = True
+    except Exception:
+        driver._cdp_supported = isinstance(driver, RemoteChrome) and driver.use_se_cdp()
+    return driver._cdp_supported
+
+class SeCdpConnection:
+    """
+    CDP por el WebSocket `se:cdp` que Selenium Grid 4 anuncia en las capabilities de la sesión.
+
+    El WebSocket es del navegador: cada pestaña se adjunta una vez (`Target.attachToTarget` en
+    modo `flatten`) y sus comandos llevan el `sessionId` de CDP. ChromeDriver usa el id de
+    target de DevTools como window handle, así que la pestaña se identifica por su handle.
+    """
+    def __init__(self, ws_url: str, connect: Optional[Callable] = None):
+        if connect is None:
+            import websocket  # websocket-client: solo hace falta con nodos remotos que usan `se:cdp`
+            connect = websocket.create_connection
+        self._ws = connect(ws_url, timeout=30)
+        self._ids = itertools.count(1)
+        self._sessions: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _call(self, method: str, params: dict, session_id: Optional[str] = None) -> dict:
+        message = {"id": next(self._ids), "method": method, "params": params}
+        if session_id:
+            message["sessionId"] = session_id
+        self._ws.send(json.dumps(message))
+        while True:
+            reply = json.loads(self._ws.recv())
+            if reply.get("id") != message["id"]:
+                continue  # Eventos de CDP: no se usan
+            if "error" in reply:
+                raise WebDriverException(f"CDP {method}: {reply['error'].get('message')}")
+            return reply.get("result", {})
+
+    def execute(self, target_id: str, cmd: str, params: dict) -> dict:
+        with self._lock:
+            session_id = self._sessions.get(target_id)
+            if session_id is None:
+                session_id = self._call("Target.attachToTarget", {"targetId": target_id, "flatten": True})["sessionId"]
+                self._sessions[target_id] = session_id
+            return self._call(cmd, params, session_id)
+
+    def close(self) -> None:
+        try:
+            self._ws.close()
+        except Exception:
+            pass
+
+class RemoteChrome(webdriver.Remote):
+    """
+    Chrome remoto. `execute_cdp_cmd` usa `goog/cdp/execute` (ChromeDriver standalone o nodos que
+    lo reenvían) y, si el nodo no lo admite, el WebSocket `se:cdp` del grid (ver `use_se_cdp`).
+    """
+    _se_cdp: Optional[SeCdpConnection] = None
+
+    def use_se_cdp(self) -> bool:
+        """Pasa los comandos CDP al WebSocket `se:cdp`, si la sesión lo anuncia y responde."""
+        ws_url = self.caps.get("se:cdp")
+        if not ws_url:
+            return False
+        try:
+            self._se_cdp = SeCdpConnection(ws_url)
+            self.execute_cdp_cmd("Browser.getVersion", {})
+            return True
+        except Exception as e:
+            logging.warning(f"[GRID] `se:cdp` no disponible ({ws_url}): {e}")
+            if self._se_cdp is not None:
+                self._se_cdp.close()
+            self._se_cdp = None
+            return False
+
+    def execute_cdp_cmd(self, cmd: str, cmd_args: dict):
+        if self._se_cdp is None:
+            return super().execute_cdp_cmd(cmd, cmd_args)
+        # `current_window_handle` pasa por `execute`: en una pestaña de `Browser`, es la suya
+        return self._se_cdp.execute(self.current_window_handle, cmd, cmd_args)
+
+    def quit(self) -> None:
+        if self._se_cdp is not None:
+            self._se_cdp.close()
+        super().quit()
+
+def connect_remote(node_url: str) -> RemoteChrome:
+    """Abre una sesión de Chrome en un nodo remoto (Selenium Grid/standalone o ChromeDriver expuesto)."""
+    logging.info(f"🚀 Iniciando WebDriver remoto en {node_url}...")
+    return RemoteChrome(command_executor=node_url, options=build_chrome_options())
+
+class RemoteNode:
+    """Un endpoint WebDriver remoto y cuántos navegadores admite a la vez."""
+    def __init__(self, url: str, capacity: int):
+        self.url = url
+        self.capacity = capacity
+        self.in_use = 0
+        self.sessions = 0 # Navegadores creados en la ejecución
+        self.failures = 0 # Arranques fallidos
+        self.cdp: Optional[bool] = None # Resultado de `probe_cdp` en el primer navegador del nodo
+
+    @property
+    def free(self) -> int:
+        return self.capacity - self.in_use
+
+class RemoteGrid:
+    """
+    Backend de navegadores remotos: cada navegador del `DriverPool` se crea en el nodo con más
+    huecos libres (a igualdad, el que menos navegadores lleva creados), de modo que los hoteles
+    se reparten entre nodos según su capacidad.
+
+    Un nodo que falla al crear la sesión se salta y se prueba el siguiente con hueco libre (en el
+    próximo arranque vuelve a ser candidato). `release()` libera el hueco al cerrar el navegador.
+    """
+    def __init__(self, nodes: List[Dict], connect: Callable[[str], webdriver.Remote] = connect_remote):
+        self.nodes = [RemoteNode(node["url"], int(node.get("capacity", 1))) for node in nodes]
+        self._connect = connect
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return sum(node.capacity for node in self.nodes)
+
+    def _reserve(self, exclude: Set[str]) -> Optional[RemoteNode]:
+        with self._lock:
+            candidates = [node for node in self.nodes if node.free > 0 and node.url not in exclude]
+            if not candidates:
+                return None
+            node = max(candidates, key=lambda n: (n.free, -n.failures, -n.sessions))
+            node.in_use += 1
+            return node
+
+    def create_driver(self) -> webdriver.Remote:
+        """Crea un navegador en el nodo más libre; lanza `WebDriverException` si ninguno puede."""
+        tried: Set[str] = set()
+        while True:
+            node = self._reserve(tried)
+            if node is None:
+                raise WebDriverException(f"Ningún nodo remoto disponible (probados: {len(tried)}).")
+            try:
+                driver = self._connect(node.url)
+            except Exception as e:
+                with self._lock:
+                    node.in_use -= 1
+                    node.failures += 1
+                logging.warning(f"[GRID] Falló el arranque en {node.url}: {e}")
+                tried.add(node.url)
+                continue
+            driver._grid_node = node
+            if node.cdp is False:
+                driver._cdp_supported = False
+            else:
+                # Cada navegador se prueba: con `se:cdp` necesita su propia conexión
+                supported = probe_cdp(driver)
+                if node.cdp is None:
+                    node.cdp = supported
+                    if not supported:
+                        logging.warning(
+                            f"[GRID] {node.url} sin CDP (ni `goog/cdp/execute` ni `se:cdp`): "
+                            f"sin bloqueo de recursos ni auto-cierre de popups en sus navegadores."
+                        )
+            with self._lock:
+                node.sessions += 1
+            return driver
+
+    def release(self, driver) -> None:
+        """Libera el hueco del nodo de un navegador cerrado."""
+        node = getattr(driver, "_grid_node", None)
+        if isinstance(node, RemoteNode):
+            with self._lock:
+                node.in_use -= 1
+
+    def log_summary(self) -> None:
+        for node in self.nodes:
+            logging.info(
+                f"[GRID] {node.url}: {node.sessions} navegadores, {node.failures} arranques fallidos, "
+                f"capacidad {node.capacity}."
+            )
+
+def create_remote_grid() -> Optional[RemoteGrid]:
+    """Crea el backend remoto si hay nodos en `config.REMOTE_WEBDRIVER_NODES`; None = Chrome local."""
+    return RemoteGrid(config.REMOTE_WEBDRIVER_NODES) if config.REMOTE_WEBDRIVER_NODES else None
+
+class PoolMetrics:
+    """Métricas del pool de drivers (thread-safe)."""
+    def __init__(self):
+        self.creations = 0
+        self.recycles = 0
+        self.failures = 0
+        self.startup_seconds = 0.0
+        self.max_startup_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record_creation(self, seconds: float) -> None:
+        with self._lock:
+            self.creations += 1
+            self.startup_seconds += seconds
+            self.max_startup_seconds = max(self.max_startup_seconds, seconds)
+
+    def record_recycle(self) -> None:
+        with self._lock:
+            self.recycles += 1
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+
+    @property
+    def avg_startup_seconds(self) -> float:
+        return self.startup_seconds / self.creations if self.creations else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"creados: {self.creations}, reciclados: {self.recycles}, fallidos: {self.failures}, "
+            f"arranque promedio: {self.avg_startup_seconds:.1f}s"
+        )
+
+class Browser:
+    """
+    Un proceso Chrome compartido por una o más pestañas.
+
+    Con `tabs > 1` cada pestaña se expone como un driver propio (ver `_make_tab_driver`) que
+    toma el lock del navegador y cambia a su ventana antes de cada comando WebDriver. Las esperas
+    (`WebDriverWait`) duermen fuera del lock, así que mientras una pestaña espera a que cargue
+    la paginación las demás siguen trabajando.
+    """
+    def __init__(self, driver: webdriver.Chrome, tabs: int = 1):
+        self.driver = driver
+        self.uses = 0
+        self.active_tabs = tabs
+        self.retiring = False
+        self._lock = threading.RLock()
+
+        if tabs == 1:
+            self.tabs: List[webdriver.Chrome] = [driver]
+            return
+
+        handles = [driver.current_window_handle]
+        for _ in range(tabs - 1):
+            driver.switch_to.new_window("tab")
+            handles.append(driver.current_window_handle)
+        self._current_handle = handles[-1]
+        self.tabs = [self._make_tab_driver(handle) for handle in handles]
+
+    def _make_tab_driver(self, handle: str) -> webdriver.Chrome:
+        """
+        Copia superficial del driver (misma sesión) cuyo `execute` fija la ventana `handle`.
+
+        Se usa `type(driver).execute` ligado a la copia para que los WebElements que devuelva
+        tengan como padre a la pestaña y sus comandos también pasen por el cambio de ventana.
+        Nota: un `switch_to.frame` no sobrevive a que otra pestaña tome el navegador entre dos comandos.
+        """
+        tab = copy.copy(self.driver)
+        base_execute = type(self.driver).execute
+        browser = self
+
+        def execute(driver_command, params=None):
+            with browser._lock:
+                if browser._current_handle != handle:
+                    base_execute(tab, Command.SWITCH_TO_WINDOW, {"handle": handle})
+                    browser._current_handle = handle
+                return base_execute(tab, driver_command, params)
+
+        tab.execute = execute
+        tab._switch_to = SwitchTo(tab)
+        return tab
+
+    def quit(self) -> None:
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+class PooledDriver:
+    """Driver (o pestaña) entregado por el pool."""
+    def __init__(self, driver: webdriver.Chrome, browser: Browser):
+        self.driver = driver
+        self.browser = browser
+
+    @property
+    def uses(self) -> int:
+        return self.browser.uses
+
+def is_session_alive(driver: webdriver.Chrome) -> bool:
+    """Comprueba con un comando trivial que la sesión de WebDriver sigue respondiendo."""
+    try:
+        driver.execute_script("return 1")
+        return True
+    except WebDriverException:
+        return False
+
+def driver_rss_mb(driver: webdriver.Chrome) -> float:
+    """Memoria residente (MB) de ChromeDriver y sus procesos Chrome hijos. 0 si no se puede medir."""
+    if psutil is None:
+        return 0.0
+    try:
+        process = psutil.Process(driver.service.process.pid)
+        processes = [process] + process.children(recursive=True)
+        return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+    except (AttributeError, psutil.Error):
+        return 0.0
+
+class DriverPool:
+    """
+    Pool de navegadores reutilizables, entregados pestaña a pestaña.
+
+    - Cada navegador abre `tabs_per_browser` pestañas; cada pestaña atiende un hotel a la vez.
+    - Recicla un navegador tras `max_uses` hoteles (sumando sus pestañas) o si su RSS supera
+      `max_rss_mb`. Un navegador marcado para reciclar deja de entregar pestañas y se cierra
+      cuando la última pestaña en uso vuelve al pool.
+    - Detecta sesiones muertas al entregar/devolver una pestaña y reemplaza el navegador.
+    - `prewarm()` arranca todos los navegadores en paralelo.
+    - Con `factory`/`on_quit` los navegadores vienen de otro backend (p. ej. `RemoteGrid`).
+
+    En la cola, None representa un navegador pendiente de crear; se crea de forma perezosa
+    en `acquire()`, para que el worker que recicla no pague el arranque del siguiente.
+    """
+    def __init__(
+        self,
+        size: int,
+        driver_path: Optional[str] = None,
+        max_uses: Optional[int] = None,
+        max_rss_mb: Optional[float] = None,
+        factory: Optional[Callable[[], webdriver.Chrome]] = None,
+        tabs_per_browser: Optional[int] = None,
+        on_quit: Optional[Callable[[webdriver.Chrome], None]] = None,
+    ):
+        self.size = size
+        self.tabs_per_browser = tabs_per_browser or config.TABS_PER_BROWSER
+        self.max_uses = config.DRIVER_MAX_HOTELS if max_uses is None else max_uses
+        self.max_rss_mb = config.DRIVER_MAX_RSS_MB if max_rss_mb is None else max_rss_mb
+        self._factory = factory or (lambda: initialize_driver(executable_path=driver_path))
+        self._on_quit = on_quit
+        self._slots: "queue.Queue[Optional[PooledDriver]]" = queue.Queue()
+        for _ in range(size):
+            self._slots.put(None)
+        self._browsers: Set[Browser] = set()
+        self._lock = threading.Lock()
+        self.metrics = PoolMetrics()
+
+    def _create_browser(self) -> Browser:
+        started = time.perf_counter()
+        try:
+            driver = self._factory()
+            browser = Browser(driver, self.tabs_per_browser)
+        except Exception:
+            self.metrics.record_failure()
+            raise
+        self.metrics.record_creation(time.perf_counter() - started)
+        with self._lock:
+            self._browsers.add(browser)
+        return browser
+
+    def _retire_tab(self, browser: Browser) -> None:
+        """Retira una pestaña de un navegador marcado; cierra el navegador al retirar la última."""
+        with self._lock:
+            browser.active_tabs -= 1
+            last = browser.active_tabs == 0
+            if last:
+                self._browsers.discard(browser)
+        if last:
+            self._quit(browser)
+            self._slots.put(None)
+
+    def _quit(self, browser: Browser) -> None:
+        browser.quit()
+        if self._on_quit is not None:
+            self._on_quit(browser.driver)
+
+    def _retire(self, browser: Browser, reason: str) -> None:
+        with self._lock:
+            first = not browser.retiring
+            browser.retiring = True
+        if first:
+            logging.info(f"[POOL] Reciclando navegador ({reason}).")
+            self.metrics.record_recycle()
+
+    def recycle_all(self, reason: str) -> None:
+        """
+        Marca para reciclar todos los navegadores: cada uno se cierra al volver su última pestaña
+        (las que están en la cola, en el próximo `acquire()`) y se reemplaza por uno nuevo.
+        """
+        with self._lock:
+            browsers = list(self._browsers)
+        for browser in browsers:
+            self._retire(browser, reason)
+
+    def prewarm(self) -> None:
+        """Arranca en paralelo los navegadores de todos los huecos vacíos."""
+        slots = []
+        while True:
+            try:
+                slots.append(self._slots.get_nowait())
+            except queue.Empty:
+                break
+        ready = [slot for slot in slots if slot is not None]
+        for pooled in ready:
+            self._slots.put(pooled)
+        missing = len(slots) - len(ready)
+        if not missing:
+            return
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=missing) as executor:
+            futures = [executor.submit(self._create_browser) for _ in range(missing)]
+        for future in futures:
+            try:
+                browser = future.result()
+                for tab in browser.tabs:
+                    self._slots.put(PooledDriver(tab, browser))
+            except Exception as e:
+                logging.error(f"[POOL] Falló el arranque de un navegador: {e}")
+                self._slots.put(None)  # Se reintentará en acquire()
+        logging.info(f"[POOL] {missing} navegadores arrancados en paralelo en {time.perf_counter() - started:.1f}s.")
+
+    def acquire(self) -> PooledDriver:
+        """Entrega una pestaña sana; crea o reemplaza el navegador si hace falta."""
+        while True:
+            pooled = self._slots.get()
+            if pooled is not None:
+                if pooled.browser.retiring:
+                    self._retire_tab(pooled.browser)
+                    continue
+                if is_session_alive(pooled.driver):
+                    return pooled
+                logging.warning("[POOL] Sesión muerta detectada, reemplazando navegador.")
+                self.metrics.record_failure()
+                self._retire(pooled.browser, "sesión muerta")
+                self._retire_tab(pooled.browser)
+                continue
+
+            try:
+                browser = self._create_browser()
+            except Exception:
+                self._slots.put(None)  # No perder el hueco si el arranque falla
+                raise
+            for tab in browser.tabs[1:]:
+                self._slots.put(PooledDriver(tab, browser))
+            return PooledDriver(browser.tabs[0], browser)
+
+    def release(self, pooled: PooledDriver, failed: bool = False, recycle: bool = False) -> None:
+        """
+        Devuelve una pestaña al pool tras procesar un hotel.
+
+        Args:
+            pooled (PooledDriver): Pestaña entregada por `acquire()`.
+            failed (bool): True si el hotel terminó con error; se verifica que la sesión siga viva.
+            recycle (bool): Retirar el navegador aunque su sesión siga viva (p. ej. tras una página
+                de bloqueo: su perfil y cookies ya están marcados).
+        """
+        browser = pooled.browser
+        with self._lock:
+            browser.uses += 1
+            uses = browser.uses
+
+        if recycle:
+            self._retire(browser, "página de bloqueo")
+        elif failed and not is_session_alive(pooled.driver):
+            self.metrics.record_failure()
+            self._retire(browser, "sesión muerta")
+        elif uses >= self.max_uses:
+            self._retire(browser, f"{uses} hoteles")
+        elif self.max_rss_mb:
+            rss = driver_rss_mb(browser.driver)
+            if rss > self.max_rss_mb:
+                self._retire(browser, f"RSS {rss:.0f}MB")
+
+        if browser.retiring:
+            self._retire_tab(browser)
+        else:
+            self._slots.put(pooled)
+
+    def close(self) -> None:
+        """Cierra todos los navegadores del pool y reporta las métricas."""
+        with self._lock:
+            browsers = list(self._browsers)
+            self._browsers.clear()
+        for browser in browsers:
+            self._quit(browser)
+        logging.info(f"[POOL] Métricas de drivers: {self.metrics.summary()}")
@@ -0,0 +1,60 @@
+import bisect
+import logging
+import threading
+from array import array
+from typing import Iterable, Set
+
+from sqlalchemy.orm import Session
+
+from src.models import Review
+
+# Tamaño de lote al leer hashes existentes de la DB
+LOAD_BATCH_SIZE = 10000
+
+class ReviewHashIndex:
+    """
+    Índice en memoria de los `review_hash` ya guardados en la base de datos.
+
+    Solo se guardan los primeros 64 bits de cada MD5 en un arreglo ordenado (8 bytes por reseña),
+    más un set pequeño con los hashes añadidos durante la ejecución actual. La probabilidad de
+    colisión con 64 bits es despreciable para millones de reseñas, y los falsos negativos son
+    imposibles: cualquier reseña que no esté en el índice sigue pasando por el
+    `ON CONFLICT DO NOTHING` de la DB, que es la comprobación exacta.
+    """
+    def __init__(self, hashes: Iterable[str] = ()):
+        self._sorted = array('Q', sorted({self._digest(h) for h in hashes}))
+        self._recent: Set[int] = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _digest(review_hash: str) -> int:
+        return int(review_hash[:16], 16)
+
+    @classmethod
+    def load(cls, db: Session) -> "ReviewHashIndex":
+        """Construye el índice leyendo todos los hashes existentes de la tabla `reviews`."""
+        query = (
+            db.query(Review.review_hash)
+            .filter(Review.review_hash.isnot(None))
+            .yield_per(LOAD_BATCH_SIZE)
+        )
+        index = cls(review_hash for (review_hash,) in query)
+        logging.info(f"[INDEX] {len(index)} hashes de reseñas cargados en memoria.")
+        return index
+
+    def __contains__(self, review_hash: str) -> bool:
+        digest = self._digest(review_hash)
+        with self._lock:
+            if digest in self._recent:
+                return True
+        pos = bisect.bisect_left(self._sorted, digest)
+        return pos < len(self._sorted) and self._sorted[pos] == digest
+
+    def __len__(self) -> int:
+        return len(self._sorted) + len(self._recent)
+
+    def add(self, review_hash: str) -> None:
+        """Registra un hash recién guardado."""
+        digest = self._digest(review_hash)
+        with self._lock:
+            self._recent.add(digest)
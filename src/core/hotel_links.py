@@ -0,0 +1,122 @@
+import csv
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, TypedDict
+from urllib.parse import urlsplit, urlunsplit
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from src.models import HotelLink, LinkSearch
+
+LINKS_CSV_HEADERS = ["url", "search_url", "name", "review_count", "score", "discovered_at", "last_seen_at"]
+
+# Varias regiones pueden terminar a la vez y volcar el mismo CSV
+_export_lock = threading.Lock()
+
+class HotelCard(TypedDict):
+    """Un hotel tal como aparece en la tarjeta de resultados de búsqueda."""
+    url: str
+    name: str
+    review_count: Optional[int]
+    score: Optional[float]
+
+def canonical_hotel_url(url: str) -> str:
+    """
+    URL de hotel sin query ni fragmento. Los enlaces de búsqueda llevan parámetros de sesión
+    (srpvid, fechas, posición...) que cambian en cada búsqueda y entre regiones.
+    """
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, "", ""))
+
+def utcnow() -> datetime:
+    """Hora UTC sin zona (así la guarda y compara SQLite)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def start_search(db: Session, search_url: str) -> None:
+    """Registra el inicio de una búsqueda completa (invalida la caché hasta que termine)."""
+    stmt = sqlite_insert(LinkSearch.__table__).values(
+        search_url=search_url, started_at=utcnow(), completed_at=None, hotel_count=0
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["search_url"],
+        set_={"started_at": stmt.excluded.started_at, "completed_at": None, "hotel_count": 0},
+    ))
+    db.commit()
+
+def save_hotel_cards(db: Session, search_url: str, cards: List[HotelCard]) -> None:
+    """Upsert de las tarjetas encontradas; conserva la fecha de descubrimiento original."""
+    if not cards:
+        return
+    now = utcnow()
+    rows = [
+        {"url": c["url"], "search_url": search_url, "name": c["name"] or None,
+         "review_count": c["review_count"], "score": c["score"], "discovered_at": now, "last_seen_at": now}
+        for c in cards
+    ]
+    stmt = sqlite_insert(HotelLink.__table__).values(rows)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["url"],
+        set_={key: stmt.excluded[key] for key in ("search_url", "name", "review_count", "score", "last_seen_at")},
+    ))
+    db.commit()
+
+def complete_search(db: Session, search_url: str, hotel_count: int) -> None:
+    """Marca la búsqueda como completa: a partir de aquí su caché es válida durante el TTL."""
+    db.query(LinkSearch).filter(LinkSearch.search_url == search_url).update(
+        {"completed_at": utcnow(), "hotel_count": hotel_count}
+    )
+    db.commit()
+
+def load_cached_cards(db: Session, search_url: str, ttl_hours: float) -> Optional[List[HotelCard]]:
+    """
+    Tarjetas de la última búsqueda completa si terminó hace menos de `ttl_hours`.
+
+    Returns:
+        Lista de tarjetas (en orden de aparición), o None si no hay caché vigente.
+    """
+    search = db.get(LinkSearch, search_url)
+    if search is None or search.completed_at is None:
+        return None
+    if utcnow() - search.completed_at > timedelta(hours=ttl_hours):
+        return None
+
+    # Solo los hoteles vistos en esa búsqueda (los que desaparecieron de los resultados no)
+    links = (
+        db.query(HotelLink)
+        .filter(HotelLink.search_url == search_url, HotelLink.last_seen_at >= search.started_at)
+        .order_by(HotelLink.id)
+        .all()
+    )
+    return [
+        HotelCard(url=l.url, name=l.name or "", review_count=l.review_count, score=l.score)
+        for l in links
+    ]
+
+def export_links_csv(db: Session, filename: str) -> int:
+    """
+    Vuelca a CSV los enlaces vistos en la última búsqueda de cada URL de búsqueda (copia legible
+    de la caché). La escritura es atómica. Devuelve las filas escritas.
+    """
+    links = (
+        db.query(HotelLink)
+        .join(LinkSearch, LinkSearch.search_url == HotelLink.search_url)
+        .filter(HotelLink.last_seen_at >= LinkSearch.started_at)
+        .order_by(HotelLink.search_url, HotelLink.id)
+        .all()
+    )
+    with _export_lock:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(filename) or ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=LINKS_CSV_HEADERS)
+                writer.writeheader()
+                for l in links:
+                    writer.writerow({key: getattr(l, key) for key in LINKS_CSV_HEADERS})
+            os.replace(tmp_path, filename)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+    return len(links)
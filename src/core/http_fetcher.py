@@ -0,0 +1,104 @@
+import logging
+import time
+from typing import List, Optional, Tuple
+
+import urllib3
+
+from src import config
+from src.core.rate_control import RateController
+from src.pages import review_parser
+from src.pages.review_list_page import review_list_url
+from src.pages.reviews_modal import ReviewData
+from src.utils.metrics import CounterStats
+
+# Respuestas que indican bloqueo o limitación de ritmo
+BLOCKED_STATUSES = (403, 429)
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+class HttpReviewFetcher:
+    """
+    Descarga páginas de reseñas por offset con un cliente HTTP (sin navegador) y las parsea con lxml.
+
+    Usa un único `PoolManager` compartido entre hilos: conexiones keep-alive reutilizadas y como
+    máximo `max_connections` peticiones simultáneas por host. Cuando una página no se puede
+    resolver sin JS (estado HTTP inesperado, HTML sin reseñas), `fetch_page` devuelve None para
+    que el llamador recurra a Selenium.
+    """
+    def __init__(self, max_connections: Optional[int] = None, timeout: Optional[float] = None,
+                 user_agent: Optional[str] = None, base_url: Optional[str] = None,
+                 rate: Optional[RateController] = None):
+        self.base_url = base_url or config.REVIEW_LIST_URL
+        self.rate = rate
+        self.http = urllib3.PoolManager(
+            maxsize=max_connections or config.HTTP_MAX_CONNECTIONS,
+            block=True, # Limita la concurrencia en lugar de abrir conexiones de usar y tirar
+            timeout=urllib3.Timeout(total=timeout or config.HTTP_TIMEOUT),
+            retries=urllib3.Retry(total=2, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504)),
+            headers={
+                "User-Agent": user_agent or DEFAULT_USER_AGENT,
+                "Accept-Language": "es-MX,es;q=0.9",
+            },
+        )
+        self.parser = review_parser.ReviewHtmlParser()
+        self.stats = CounterStats()
+
+    def fetch_page(self, hotel_name: str, hotel_url: str, offset: int) -> Optional[List[ReviewData]]:
+        """
+        Descarga y parsea una página de reseñas.
+
+        Returns:
+            Lista de reseñas, o None si la página necesita el navegador.
+        """
+        result = self.fetch_page_html(hotel_name, hotel_url, offset)
+        return result[0] if result else None
+
+    def fetch_page_html(self, hotel_name: str, hotel_url: str, offset: int) -> Optional[Tuple[List[ReviewData], str]]:
+        """Como `fetch_page`, pero devuelve también el HTML descargado (para el almacén de snapshots)."""
+        url = review_list_url(hotel_url, offset, base_url=self.base_url)
+        if url is None:
+            return None
+
+        started = time.perf_counter()
+        try:
+            response = self.http.request("GET", url)
+        except urllib3.exceptions.HTTPError as e:
+            logging.warning(f"[HTTP] Falló {url}: {e}")
+            self.stats.add({"error": 1})
+            if self.rate is not None and isinstance(e, (urllib3.exceptions.TimeoutError, urllib3.exceptions.MaxRetryError)):
+                self.rate.record_failure("timeout")
+            return None
+        if self.rate is not None:
+            if response.status in BLOCKED_STATUSES:
+                self.rate.record_failure("blocked")
+            else:
+                self.rate.record_success(time.perf_counter() - started)
+        if response.status != 200:
+            logging.info(f"[HTTP] Estado {response.status} en {url}, se usará el navegador.")
+            self.stats.add({"fallback": 1})
+            return None
+
+        html = response.data.decode("utf-8", errors="replace")
+        reviews = self.parser.parse(html, hotel_name, hotel_url)
+        if not reviews:
+            # Página vacía o renderizada por JS: que la confirme Selenium
+            self.stats.add({"fallback": 1})
+            return None
+        self.stats.add({"ok": 1})
+        return reviews, html
+
+    def close(self) -> None:
+        self.http.clear()
+
+    def log_summary(self) -> None:
+        if self.stats.total():
+            logging.info(f"[HTTP] Páginas de reseñas: {self.stats.summary()}")
+
+def create_http_fetcher(rate: Optional[RateController] = None) -> Optional[HttpReviewFetcher]:
+    """Crea el fetcher HTTP si está activado en config y lxml está instalado."""
+    if not config.HTTP_FETCHER:
+        return None
+    if not review_parser.is_available():
+        logging.warning("[HTTP] lxml no está instalado; las páginas de reseñas se extraerán con Selenium.")
+        return None
+    return HttpReviewFetcher(rate=rate)
@@ -0,0 +1,243 @@
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from src import config
+from src.core.database import SessionLocal
+from src.core.hotel_links import utcnow
+from src.core.work_queue import HotelQueue
+from src.models import HotelJob
+
+PENDING, LEASED, DONE, FAILED = "pending", "leased", "done", "failed"
+
+def process_owner() -> str:
+    """Identificador de este proceso en `hotel_jobs.owner`."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def enqueue_jobs(db: Session, urls: Iterable[str], priorities: Optional[Dict[str, int]] = None) -> None:
+    """
+    Encola hoteles en `hotel_jobs`. Un hotel ya terminado (de una ejecución anterior) vuelve a
+    quedar pendiente; uno pendiente solo actualiza su prioridad y uno con lease no se toca.
+    """
+    priorities = priorities or {}
+    rows = [{"hotel_url": url, "priority": priorities.get(url, 0), "status": PENDING} for url in urls]
+    if not rows:
+        return
+    stmt = sqlite_insert(HotelJob.__table__).values(rows)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["hotel_url"],
+        set_={"priority": stmt.excluded.priority, "status": PENDING, "updated_at": func.now()},
+        where=HotelJob.__table__.c.status != LEASED,
+    ))
+    db.commit()
+
+def claim_jobs(
+    db: Session, owner: str, limit: int, lease_seconds: float, now: Optional[datetime] = None
+) -> List[str]:
+    """
+    Reclama hasta `limit` hoteles pendientes o con el lease vencido, por prioridad.
+
+    Es un único `UPDATE ... WHERE id IN (SELECT ...) RETURNING`: SQLite toma el bloqueo de
+    escritura al empezar la sentencia, así que dos procesos nunca reclaman el mismo hotel.
+    """
+    now = now or utcnow()
+    claimable = (
+        select(HotelJob.id)
+        .where(or_(
+            HotelJob.status == PENDING,
+            and_(HotelJob.status == LEASED, HotelJob.lease_expires_at < now),
+        ))
+        .order_by(HotelJob.priority.desc(), HotelJob.id)
+        .limit(limit)
+    )
+    stmt = (
+        update(HotelJob)
+        .where(HotelJob.id.in_(claimable.scalar_subquery()))
+        .values(
+            status=LEASED, owner=owner, attempts=HotelJob.attempts + 1,
+            lease_expires_at=now + timedelta(seconds=lease_seconds),
+        )
+        .returning(HotelJob.hotel_url, HotelJob.priority, HotelJob.attempts)
+        .execution_options(synchronize_session=False)
+    )
+    rows = db.execute(stmt).all()
+    db.commit()
+    reclaimed = [url for url, _, attempts in rows if attempts > 1]
+    if reclaimed:
+        logging.warning(f"[JOBS] {owner} reclamó {len(reclaimed)} hoteles con lease vencido o reencolados.")
+    return [url for url, _, _ in sorted(rows, key=lambda row: -(row[1] or 0))]
+
+def renew_leases(db: Session, owner: str, urls: Iterable[str], lease_seconds: float) -> Set[str]:
+    """Heartbeat: extiende los leases de `owner`. Devuelve los que siguen siendo suyos."""
+    urls = list(urls)
+    if not urls:
+        return set()
+    stmt = (
+        update(HotelJob)
+        .where(HotelJob.hotel_url.in_(urls), HotelJob.owner == owner, HotelJob.status == LEASED)
+        .values(lease_expires_at=utcnow() + timedelta(seconds=lease_seconds))
+        .returning(HotelJob.hotel_url)
+        .execution_options(synchronize_session=False)
+    )
+    renewed = set(db.execute(stmt).scalars())
+    db.commit()
+    return renewed
+
+def finish_job(db: Session, hotel_url: str, owner: str, failed: bool = False) -> None:
+    """Cierra el lease de `owner` sobre el hotel (si otro proceso lo reclamó, no se toca)."""
+    db.execute(
+        update(HotelJob)
+        .where(HotelJob.hotel_url == hotel_url, HotelJob.owner == owner, HotelJob.status == LEASED)
+        .values(status=FAILED if failed else DONE, lease_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+def count_outstanding(db: Session) -> int:
+    """Hoteles pendientes o en proceso (en cualquier proceso, incluidos leases vencidos)."""
+    return db.query(HotelJob).filter(HotelJob.status.in_([PENDING, LEASED])).count()
+
+class JobFeeder:
+    """
+    Alimenta la `HotelQueue` local de un proceso desde la tabla compartida `hotel_jobs`.
+
+    Varios procesos (en la misma máquina o en varias que comparten la DB) ejecutan cada uno su
+    pipeline con su propio escritor; ninguno reparte trabajo a otro. Cada `JobFeeder` reclama
+    hoteles cuando su cola local baja de `prefetch`, renueva cada `heartbeat` segundos el lease
+    de los que tiene en proceso y lo cierra con `finish()`. Si un proceso muere, sus leases
+    vencen y otro proceso los reclama. La cola local se cierra cuando no queda trabajo en la
+    tabla, el productor local (si lo hay) terminó y pasaron `idle_timeout` segundos así.
+
+    También sirve de destino para `_produce_links`: `put()` encola en la tabla y `close()` marca
+    el fin de la búsqueda local.
+    """
+    def __init__(
+        self,
+        prefetch: int = 1,
+        producing: bool = False,
+        idle_timeout: float = 0.0,
+        owner: Optional[str] = None,
+        lease_seconds: Optional[float] = None,
+        heartbeat: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self.prefetch = max(prefetch, 1)
+        self.idle_timeout = idle_timeout
+        self.owner = owner or process_owner()
+        self.lease_seconds = lease_seconds or config.JOB_LEASE_SECONDS
+        self.heartbeat = heartbeat or config.JOB_HEARTBEAT_SECONDS
+        self.poll_interval = poll_interval or config.JOB_POLL_SECONDS
+        self._session_factory = session_factory
+        self._producing = producing
+        self._held: Set[str] = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._producer_db: Optional[Session] = None
+        self.claimed = 0
+        self.finished = 0
+
+    def enqueue(self, urls: Iterable[str], priorities: Optional[Dict[str, int]] = None) -> None:
+        db = self._session_factory()
+        try:
+            enqueue_jobs(db, urls, priorities)
+        finally:
+            db.close()
+        self._wake.set()
+
+    def put(self, url: str, expected_reviews: int = 0) -> None:
+        """Encola un hotel encontrado por la búsqueda local (misma interfaz que `HotelQueue.put`)."""
+        if self._producer_db is None:
+            self._producer_db = self._session_factory()
+        enqueue_jobs(self._producer_db, [url], {url: expected_reviews})
+        self._wake.set()
+
+    def close(self) -> None:
+        """La búsqueda local terminó."""
+        if self._producer_db is not None:
+            self._producer_db.close()
+            self._producer_db = None
+        self._producing = False
+        self._wake.set()
+
+    def finish(self, hotel_url: str, failed: bool = False) -> None:
+        """El hotel terminó en este proceso (idempotente)."""
+        with self._lock:
+            if hotel_url not in self._held:
+                return
+            self._held.discard(hotel_url)
+        db = self._session_factory()
+        try:
+            finish_job(db, hotel_url, self.owner, failed)
+        except Exception as e:
+            logging.error(f"[JOBS] No se pudo cerrar el lease de {hotel_url}: {e}")
+        finally:
+            db.close()
+        self.finished += 1
+        self._wake.set()
+
+    def start(self, hotel_queue: HotelQueue) -> threading.Thread:
+        """Arranca el hilo que alimenta `hotel_queue` (abierta) y la cierra al no quedar trabajo."""
+        thread = threading.Thread(target=self._run, args=(hotel_queue,), name="job-feeder", daemon=True)
+        thread.start()
+        return thread
+
+    def _run(self, hotel_queue: HotelQueue) -> None:
+        db = self._session_factory()
+        last_heartbeat = time.monotonic()
+        idle_since: Optional[float] = None
+        try:
+            while True:
+                self._wake.clear()
+                try:
+                    if time.monotonic() - last_heartbeat >= self.heartbeat:
+                        self._renew(db)
+                        last_heartbeat = time.monotonic()
+                    wanted = self.prefetch - len(hotel_queue)
+                    if wanted > 0:
+                        urls = claim_jobs(db, self.owner, wanted, self.lease_seconds)
+                        with self._lock:
+                            self._held.update(urls)
+                        for url in urls:
+                            hotel_queue.put(url)
+                        self.claimed += len(urls)
+                    with self._lock:
+                        busy = bool(self._held)
+                    if busy or self._producing or count_outstanding(db):
+                        idle_since = None
+                    else:
+                        idle_since = idle_since or time.monotonic()
+                        if time.monotonic() - idle_since >= self.idle_timeout:
+                            break
+                except Exception as e:
+                    db.rollback()
+                    logging.warning(f"[JOBS] Error consultando hotel_jobs (se reintenta): {e}")
+                self._wake.wait(self.poll_interval)
+        finally:
+            db.close()
+            hotel_queue.close()
+            logging.info(f"[JOBS] {self.owner}: {self.claimed} hoteles reclamados, {self.finished} terminados.")
+
+    def _renew(self, db: Session) -> None:
+        with self._lock:
+            held = set(self._held)
+        lost = held - renew_leases(db, self.owner, held, self.lease_seconds)
+        if lost:
+            # Nuestro lease venció y otro proceso lo reclamó: el escritor deduplica si ambos terminan
+            logging.warning(f"[JOBS] {len(lost)} leases perdidos por {self.owner} (reclamados por otro proceso).")
+            with self._lock:
+                self._held -= lost
+
+def create_job_feeder(prefetch: int, producing: bool, jobs_only: bool = False) -> Optional[JobFeeder]:
+    """Crea el alimentador si `config.JOB_TABLE` está activado. `jobs_only`: proceso sin búsqueda propia."""
+    if not (config.JOB_TABLE or jobs_only):
+        return None
+    return JobFeeder(prefetch, producing, idle_timeout=config.JOB_IDLE_TIMEOUT if jobs_only else 0.0)
@@ -3,16 +3,35 @@ import threading
 import logging
 import os
 import csv
-import hashlib
-from sqlalchemy.exc import IntegrityError
-from typing import List, Dict, Optional, Set, TypedDict
+import tempfile
+import io
+import time
+from contextlib import nullcontext
+from selenium.common.exceptions import TimeoutException
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from typing import List, Dict, Iterable, NotRequired, Optional, Set, Tuple, TypedDict, Union
 
 from src import config
 from src.core.database import SessionLocal
+from src.core.crawl_state import get_crawl_state, record_page_progress, review_count_unchanged
+from src.core.hash_index import ReviewHashIndex
+from src.core.hotel_links import HotelCard, utcnow
+from src.core.http_fetcher import HttpReviewFetcher, create_http_fetcher
+from src.core.job_table import JobFeeder, create_job_feeder
+from src.core.snapshot_store import SnapshotStore, create_snapshot_store, record_snapshot
+from src.core.popup_dismisser import collect_popup_dismissals, log_dismissal_summary
+from src.core.rate_control import BlockedPageError, RateController, create_rate_controller, detect_block
+from src.core.retry_queue import HotelFailedError, clear_failure, load_retry_state, next_retry_at, record_failure
+from src.core.resource_policy import collect_blocked_requests, log_blocked_summary
+from src.core.strategy_stats import STRATEGY_STATS
+from src.core.work_queue import HotelQueue, ReviewPageJob
 from src.models import Review
 from src.pages.hotel_page import HotelPage
-from src.core.driver import initialize_driver, get_driver_path
+from src.pages.review_list_page import ReviewListPage, page_offsets, review_list_url
+from src.core.driver import DriverPool, create_remote_grid, get_driver_path, warm_up_driver_config
 from src.utils.cleaning import fix_score_value
+from src.utils.hashing import compute_review_hash
 
 class ReviewData(TypedDict):
     hotel_name: str
@@ -23,80 +42,206 @@ class ReviewData(TypedDict):
     negative: str
     date: str
 
-def csv_writer_listener(result_queue: queue.Queue, filename: str) -> None:
+class SnapshotRef(TypedDict):
+    """Referencia a un HTML guardado en el almacén de snapshots, para indexarlo en la DB."""
+    kind: str # "hotel" o "reviews"
+    page: int
+    content_hash: str
+    hotel_name: Optional[str]
+    reviews_hotel_url: NotRequired[str] # `hotel_url` de las reseñas de la página (solo "reviews")
+
+class ReviewBatch(TypedDict):
+    """Mensaje worker -> escritor: una página de reseñas de un hotel."""
+    hotel_url: str
+    page: int
+    reviews: List[ReviewData]
+    expected_count: Optional[int]
+    completed: bool # True en el último mensaje de un hotel cuya paginación terminó
+    snapshots: NotRequired[List[SnapshotRef]] # Solo con `config.SNAPSHOT_STORE`
+    fanout: NotRequired[bool] # Páginas por offset: terminan en cualquier orden y no avanzan `last_page`
+    saved_count: NotRequired[int] # Reseñas extraídas del hotel hasta `page` inclusive (offset para reanudar)
+
+def _review_rows(batch: List[ReviewData]) -> Tuple[Dict[str, ReviewData], List[dict]]:
+    """Filas de la tabla `reviews` de un lote, sin duplicados por hash, junto al item original de cada hash."""
+    items_by_hash: Dict[str, ReviewData] = {}
+    rows = []
+    for item in batch:
+        review_hash = compute_review_hash(item)
+        if review_hash in items_by_hash:
+            continue  # Duplicado dentro del mismo lote
+        items_by_hash[review_hash] = item
+        rows.append({
+            "hotel_name": item.get("hotel_name"),
+            "hotel_url": item.get("hotel_url"),
+            "title": item.get("title"),
+            "score": fix_score_value(item.get("score")),
+            "positive": item.get("positive"),
+            "negative": item.get("negative"),
+            "date": item.get("date"),
+            "review_hash": review_hash,
+        })
+    return items_by_hash, rows
+
+def insert_reviews_batch(db: Session, batch: List[ReviewData]) -> List[ReviewData]:
+    """
+    Inserta un lote completo de reseñas en una sola transacción.
+
+    Usa `INSERT ... ON CONFLICT(review_hash) DO NOTHING RETURNING review_hash` (SQLAlchemy Core)
+    para que SQLite descarte los duplicados y nos diga exactamente qué filas eran nuevas.
+
+    Args:
+        db (Session): Sesión de base de datos del escritor.
+        batch (List[ReviewData]): Lote de reseñas tal como llega de los workers.
+
+    Returns:
+        List[ReviewData]: Las reseñas del lote que no existían previamente, en su orden original.
+    """
+    items_by_hash, rows = _review_rows(batch)
+    if not rows:
+        return []
+
+    inserted_hashes: Set[str] = set()
+    chunk_size = config.BULK_INSERT_CHUNK_SIZE
+    try:
+        # Troceamos solo para respetar el límite de variables de SQLite; el commit es único.
+        for i in range(0, len(rows), chunk_size):
+            stmt = (
+                sqlite_insert(Review.__table__)
+                .values(rows[i:i + chunk_size])
+                .on_conflict_do_nothing(index_elements=["review_hash"])
+                .returning(Review.__table__.c.review_hash)
+            )
+            inserted_hashes.update(db.execute(stmt).scalars())
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return [item for review_hash, item in items_by_hash.items() if review_hash in inserted_hashes]
+
+def upsert_reviews_batch(db: Session, batch: List[ReviewData]) -> int:
+    """
+    Inserta o actualiza un lote de reseñas (`ON CONFLICT(review_hash) DO UPDATE`) sin hacer commit.
+
+    Los campos que no forman parte del hash (nombre del hotel, puntaje) se sobrescriben, así que
+    una corrección de selectores re-extraída desde snapshots reemplaza los valores anteriores.
+
+    Returns:
+        int: Número de filas distintas escritas.
+    """
+    _, rows = _review_rows(batch)
+    chunk_size = config.BULK_INSERT_CHUNK_SIZE
+    for i in range(0, len(rows), chunk_size):
+        stmt = sqlite_insert(Review.__table__).values(rows[i:i + chunk_size])
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["review_hash"],
+            set_={"hotel_name": stmt.excluded.hotel_name, "score": stmt.excluded.score},
+        ))
+    return len(rows)
+
+def _create_csv_with_header(filename: str, headers: List[str]) -> None:
+    """
+    Crea el CSV con su cabecera si no existe. Se escribe en un temporal y se enlaza con
+    `os.link`, que falla si el archivo ya existe: con varios procesos (`config.JOB_TABLE`)
+    solo uno escribe la cabecera y ninguno puede añadir filas antes que ella.
+    """
+    if os.path.exists(filename):
+        return
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(filename) or ".", suffix=".csv.tmp")
+    try:
+        with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+            csv.DictWriter(f, fieldnames=headers).writeheader()
+        try:
+            os.link(tmp_path, filename)
+        except FileExistsError:
+            pass  # Otro proceso lo creó primero, con su cabecera
+    finally:
+        os.unlink(tmp_path)
+
+def csv_writer_listener(result_queue: queue.Queue, filename: str, hash_index: Optional[ReviewHashIndex] = None) -> None:
     """
     Hilo dedicado a escuchar la cola de resultados y persistir los datos en CSV y Base de Datos.
     
     Implementa un patrón productor-consumidor donde este hilo actúa como consumidor único
-    para escritura, evitando condiciones de carrera en el archivo y la DB.
+    para escritura, evitando condiciones de carrera en el archivo y la DB. Cada lote se
+    filtra primero contra el índice de hashes en memoria y solo las reseñas desconocidas
+    se insertan, en una única transacción (ver `insert_reviews_batch`). Después de guardar
+    cada página se indexan sus snapshots de HTML (si los hay) y se actualiza el checkpoint
+    del hotel (`hotel_crawl_state`). Un hotel completo sale de la cola de reintentos (`failed_hotels`).
     
     Args:
-        result_queue (queue.Queue): Cola compartida de donde se leen los lotes de reseñas.
+        result_queue (queue.Queue): Cola compartida de donde se leen los mensajes `ReviewBatch`.
         filename (str): Ruta del archivo CSV donde se exportarán los datos.
+        hash_index (ReviewHashIndex, optional): Índice de hashes existentes. Si no se provee,
+            se carga desde la DB al iniciar el hilo.
     """
     review_headers = config.REVIEW_CSV_HEADERS
-    file_exists = os.path.isfile(filename)
+    _create_csv_with_header(filename, review_headers)
     
     # Abrimos el archivo en modo append, pero escribiremos solo lo que se guarde en DB
     with open(filename, "a", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=review_headers)
-        if not file_exists:
-            writer.writeheader()
-            
         # Instanciar sesión de DB una vez para reutilizar conexión
         db = SessionLocal()
         try:
+            if hash_index is None:
+                hash_index = ReviewHashIndex.load(db)
+
             while True:
-                batch = result_queue.get()
-                if batch is None: # Poison pill para detener el hilo
+                message = result_queue.get()
+                if message is None: # Poison pill para detener el hilo
                     break
                 
                 try:
-                    # 1. Intentar guardar en DB primero para filtrar duplicados
-                    saved_count = 0
+                    batch = message["reviews"]
+                    # 1. Filtrar duplicados en memoria y guardar en DB solo los candidatos
                     new_reviews_for_csv = []
+                    candidates = {}
+                    for item in batch:
+                        review_hash = compute_review_hash(item)
+                        if review_hash not in hash_index:
+                            candidates.setdefault(review_hash, item)
+                    skipped_count = len(batch) - len(candidates)
 
                     try:
-                        for item in batch:
-                            # Generar Hash Único basado en campos clave
-                            unique_str = f"{item.get('hotel_url')}{item.get('date')}{item.get('title')}{item.get('positive')}{item.get('negative')}"
-                            review_hash = hashlib.md5(unique_str.encode('utf-8')).hexdigest()
-                            
-                            # Limpiar score antes de guardar
-                            raw_score = item.get("score")
-                            clean_score = fix_score_value(raw_score)
-
-                            review = Review(
-                                hotel_name=item.get("hotel_name"),
-                                hotel_url=item.get("hotel_url"),
-                                title=item.get("title"),
-                                score=clean_score,
-                                positive=item.get("positive"),
-                                negative=item.get("negative"),
-                                date=item.get("date"),
-                                review_hash=review_hash
+                        if candidates:
+                            new_reviews_for_csv = insert_reviews_batch(db, list(candidates.values()))
+                            # Tras el commit todos los candidatos existen en DB (nuevos o no)
+                            for review_hash in candidates:
+                                hash_index.add(review_hash)
+                        for ref in message.get("snapshots", []):
+                            record_snapshot(
+                                db, message["hotel_url"], ref["kind"], ref["page"], ref["content_hash"],
+                                ref["hotel_name"], ref.get("reviews_hotel_url"),
                             )
-                            try:
-                                db.add(review)
-                                db.commit()
-                                # Si llegamos aquí, se guardó correctamente (no era duplicado)
-                                saved_count += 1
-                                new_reviews_for_csv.append(item)
-                            except IntegrityError:
-                                db.rollback()
-                                # Duplicado, lo ignoramos silenciosamente
-                                pass
-                                
+                        # 2. Checkpoint: solo avanza cuando la página ya está persistida. Las páginas
+                        # por offset llegan en cualquier orden: su avance lo lleva `FanOutTracker`
+                        fanout_page = message.get("fanout", False)
+                        record_page_progress(
+                            db,
+                            message["hotel_url"],
+                            None if fanout_page else message["page"],
+                            last_review_hash=compute_review_hash(batch[-1]) if batch and not fanout_page else None,
+                            expected_count=message.get("expected_count"),
+                            completed=message["completed"],
+                            saved_count=None if fanout_page else message.get("saved_count"),
+                        )
+                        if message["completed"]:
+                            clear_failure(db, message["hotel_url"])
                     except Exception as db_e:
                         logging.error(f"Error guardando en DB: {db_e}")
-                        db.rollback()
 
-                    # 2. Escribir en CSV solo los registros que fueron nuevos en la DB
+                    # 3. Escribir en CSV solo los registros que fueron nuevos en la DB
                     if new_reviews_for_csv:
-                        writer.writerows(new_reviews_for_csv)
+                        # Un solo write por lote: con varios procesos (`config.JOB_TABLE`) las filas no se intercalan
+                        chunk = io.StringIO()
+                        csv.DictWriter(chunk, fieldnames=review_headers).writerows(new_reviews_for_csv)
+                        f.write(chunk.getvalue())
                         f.flush()
 
-                    logging.info(f"   [SAVED] Procesados {len(batch)}. Nuevos en DB/CSV: {saved_count}.")
+                    if message["completed"]:
+                        logging.info(f"   [DONE] Hotel completo: {message['hotel_url']} ({message['page']} páginas).")
+                    if batch:
+                        logging.info(f"   [SAVED] Procesados {len(batch)}. Duplicados en memoria: {skipped_count}. Nuevos en DB/CSV: {len(new_reviews_for_csv)}.")
                 except Exception as e:
                     logging.error(f"Error escribiendo datos: {e}")
                 finally:
@@ -104,95 +249,679 @@ def csv_writer_listener(result_queue: queue.Queue, filename: str) -> None:
         finally:
             db.close()
 
-def worker_process(urls: List[str], result_queue: queue.Queue, worker_id: int, driver_path: str) -> None:
+class WorkerStats:
+    """Métricas de utilización de un worker (tiempo ocupado vs. tiempo total del pipeline)."""
+    def __init__(self, worker_id: int):
+        self.worker_id = worker_id
+        self.hotels = 0
+        self.pages = 0 # Páginas sueltas procesadas en modo fan-out
+        self.busy_seconds = 0.0
+
+    def utilisation(self, wall_seconds: float) -> float:
+        return self.busy_seconds / wall_seconds if wall_seconds > 0 else 0.0
+
+class FanOutTracker:
+    """
+    Páginas pendientes por hotel en modo fan-out (`config.OFFSET_PAGINATION`).
+
+    Las páginas de un hotel se procesan en cualquier orden y en distintos workers; el hotel solo
+    se marca completo cuando terminó la última y ninguna falló.
     """
-    Función ejecutada por cada hilo worker para procesar una lista de URLs de hoteles.
+    def __init__(self):
+        self._pending: Dict[str, int] = {}
+        self._failed: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def start(self, hotel_url: str, pages: int) -> None:
+        with self._lock:
+            self._pending[hotel_url] = pages
+            self._failed.discard(hotel_url)
+
+    def __contains__(self, hotel_url: str) -> bool:
+        """True si el hotel tiene páginas pendientes."""
+        with self._lock:
+            return hotel_url in self._pending
+
+    def finish_page(self, hotel_url: str, ok: bool) -> Optional[bool]:
+        """
+        Registra el fin de una página.
+
+        Returns:
+            None si quedan páginas; True si el hotel terminó sin fallos; False si alguna falló.
+        """
+        with self._lock:
+            if not ok:
+                self._failed.add(hotel_url)
+            self._pending[hotel_url] -= 1
+            if self._pending[hotel_url] > 0:
+                return None
+            del self._pending[hotel_url]
+            failed = hotel_url in self._failed
+            self._failed.discard(hotel_url)
+            return not failed
+
+def _fan_out_pages(
+    url: str, hotel_page: HotelPage, expected_count: Optional[int],
+    hotel_queue: HotelQueue, fanout: FanOutTracker, worker_id: int,
+) -> bool:
+    """
+    Encola las páginas de reseñas de un hotel grande como trabajos independientes por offset.
+    Devuelve False si el hotel no es apto (pocas páginas o URL no direccionable).
+    """
+    offsets = page_offsets(expected_count or 0, config.MAX_REVIEWS_PER_HOTEL)
+    reviews_hotel_url = hotel_page.driver.current_url
+    if len(offsets) < config.OFFSET_FANOUT_MIN_PAGES or review_list_url(reviews_hotel_url, 0) is None:
+        return False
+
+    hotel_name = hotel_page.get_name()
+    fanout.start(url, len(offsets))
+    for page, offset in enumerate(offsets, start=1):
+        hotel_queue.put_page(ReviewPageJob(
+            hotel_url=url, reviews_hotel_url=reviews_hotel_url, hotel_name=hotel_name,
+            page=page, offset=offset, expected_count=expected_count,
+        ))
+    logging.info(f"Worker {worker_id}: {url} repartido en {len(offsets)} páginas por offset.")
+    return True
+
+def _snapshot(
+    store: Optional[SnapshotStore], kind: str, page: int, html: str, hotel_name: Optional[str],
+    reviews_hotel_url: Optional[str] = None,
+) -> List[SnapshotRef]:
+    """Guarda el HTML en el almacén. Un fallo aquí no debe costar las reseñas ya extraídas."""
+    if store is None:
+        return []
+    try:
+        ref = SnapshotRef(kind=kind, page=page, content_hash=store.put(html), hotel_name=hotel_name)
+        if reviews_hotel_url:
+            ref["reviews_hotel_url"] = reviews_hotel_url
+        return [ref]
+    except Exception as e:
+        logging.warning(f"[SNAPSHOT] No se pudo guardar la página {page} ({kind}): {e}")
+        return []
+
+def _send_review_pages(
+    pages: Iterable[Tuple[int, List[ReviewData]]], url: str, hotel_name: str, reviews_url: str,
+    expected_count: Optional[int], saved_page: int, saved_count: int, snapshots: List[SnapshotRef],
+    result_queue: queue.Queue, driver, snapshot_store: Optional[SnapshotStore],
+    rate: Optional[RateController], worker_id: int,
+) -> None:
+    """
+    Envía al escritor cada página de reseñas en cuanto se obtiene, con el total acumulado
+    (`saved_count`) para el checkpoint, y al final el mensaje que marca el hotel completo.
+    """
+    last_page = max(saved_page, 1)
+    sent_count = 0
+    load_started = time.perf_counter()
+    for last_page, batch in pages:
+        _report_page(driver, rate, load_started)
+        saved_count += len(batch)
+        sent_count += len(batch)
+        message = ReviewBatch(
+            hotel_url=url, page=last_page, reviews=batch,
+            expected_count=expected_count, completed=False, saved_count=saved_count
+        )
+        if snapshot_store is not None:
+            snapshots += _snapshot(snapshot_store, "reviews", last_page, driver.page_source, hotel_name, reviews_url)
+            message["snapshots"], snapshots = snapshots, []
+        result_queue.put(message)
+        if rate is not None:
+            rate.pause()  # Antes de pedir la página siguiente
+        load_started = time.perf_counter()
+
+    # La paginación terminó sin errores: marcar el hotel como completo
+    result_queue.put(ReviewBatch(
+        hotel_url=url, page=last_page, reviews=[],
+        expected_count=expected_count, completed=True, snapshots=snapshots, saved_count=saved_count
+    ))
+
+    if sent_count:
+        logging.info(f"Worker {worker_id}: {sent_count} reseñas enviadas a cola para {url}")
+    else:
+        logging.warning(f"Worker {worker_id}: 0 reseñas extraídas para {url}")
+
+def _report_page(driver, rate: Optional[RateController], started: float) -> None:
+    """
+    Informa al control de ritmo de una carga de página (latencia desde `started`).
+    Lanza `BlockedPageError` si Booking devolvió una página de bloqueo o captcha.
+    """
+    if rate is None:
+        return
+    block = detect_block(driver)
+    if block:
+        rate.record_failure(block)
+        raise BlockedPageError(f"Página de bloqueo ({block}) en {driver.current_url}")
+    rate.record_success(time.perf_counter() - started)
+
+def scrape_hotel(
+    url: str,
+    hotel_queue: HotelQueue,
+    result_queue: queue.Queue,
+    worker_id: int,
+    pool: DriverPool,
+    hash_index: Optional[ReviewHashIndex] = None,
+    fanout: Optional[FanOutTracker] = None,
+    snapshot_store: Optional[SnapshotStore] = None,
+    rate: Optional[RateController] = None,
+) -> None:
+    """
+    Procesa un hotel completo: checkpoint, navegación, modal de reseñas y paginación.
+
+    En `config.INCREMENTAL_MODE` revisita también hoteles completos: ordena por más recientes
+    y deja de paginar en la primera página cuyas reseñas ya están todas en `hash_index`.
+    Con `fanout`, los hoteles grandes no se paginan aquí: sus páginas se encolan por offset.
+    Con `snapshot_store`, el HTML del hotel y de cada página de reseñas se guarda para `src.reextract`.
+    Con `rate`, cada carga de página informa su latencia y entre páginas se respeta la pausa del control AIMD.
+    """
+    incremental = config.INCREMENTAL_MODE and hash_index is not None
+
+    # Consultar checkpoint para reanudar a mitad de paginación: desde la página siguiente a la
+    # última guardada, con las reseñas ya guardadas como offset
+    db = SessionLocal()
+    try:
+        state = get_crawl_state(db, url)
+        resuming = bool(state and state.last_page and state.saved_count is not None and not state.completed)
+        saved_page, saved_count = (state.last_page, state.saved_count) if resuming else (0, 0)
+        already_completed = bool(state and state.completed)
+        known_count = state.expected_count if state else None
+    finally:
+        db.close()
+    if incremental:
+        # Con orden por recientes, las reseñas nuevas están al principio
+        resuming, saved_page, saved_count = False, 0, 0
+    elif already_completed:
+        logging.info(f"Worker {worker_id}: {url} ya estaba completo, se omite.")
+        return
+
+    pooled = pool.acquire()
+    hotel_page = HotelPage(pooled.driver)
+    failed = blocked = False
+    try:
+        logging.info(f"Worker {worker_id} visitando: {url}")
+        load_started = time.perf_counter()
+        hotel_page.navigate(url)
+        _report_page(pooled.driver, rate, load_started)
+        expected_count = hotel_page.get_expected_review_count() or None
+        if (incremental and already_completed and config.SKIP_UNCHANGED_HOTELS
+                and review_count_unchanged(expected_count, known_count)):
+            logging.info(f"Worker {worker_id}: {url} sin reseñas nuevas ({expected_count}), se omite.")
+            return
+        snapshots = _snapshot(
+            snapshot_store, "hotel", 0, pooled.driver.page_source, hotel_page.get_name()
+        ) if snapshot_store is not None else []
+
+        # Modo fan-out: con offsets no hace falta abrir el modal ni reanudar por página
+        if fanout is not None and not incremental:
+            if _fan_out_pages(url, hotel_page, expected_count, hotel_queue, fanout, worker_id):
+                if snapshots:
+                    result_queue.put(ReviewBatch(
+                        hotel_url=url, page=0, reviews=[],
+                        expected_count=expected_count, completed=False, snapshots=snapshots, fanout=True
+                    ))
+                return
+        
+        # Reanudar: la lista por offset salta directo a la primera reseña pendiente
+        reviews_url = pooled.driver.current_url
+        if resuming and review_list_url(reviews_url, 0) is not None:
+            hotel_name = hotel_page.get_name()
+            pages = ReviewListPage(pooled.driver).iter_pages(
+                hotel_name, reviews_url, saved_count, saved_page + 1, config.MAX_REVIEWS_PER_HOTEL
+            )
+            _send_review_pages(
+                pages, url, hotel_name, reviews_url, expected_count, saved_page, saved_count,
+                snapshots, result_queue, pooled.driver, snapshot_store, rate, worker_id,
+            )
+            return
+
+        # Abrir modal de reseñas
+        reviews_modal = hotel_page.open_reviews_modal()
+        if not reviews_modal:
+            if expected_count:
+                raise HotelFailedError(f"No se pudo abrir el modal de reseñas ({expected_count} esperadas)")
+            # Sin reseñas no hay modal: el hotel está completo
+            logging.warning(f"Worker {worker_id}: {url} sin modal de reseñas ni conteo; se marca completo.")
+            result_queue.put(ReviewBatch(
+                hotel_url=url, page=max(saved_page, 1), reviews=[],
+                expected_count=expected_count, completed=True, snapshots=snapshots
+            ))
+            return
+        
+        # Solo se puede cortar en la primera página conocida si el orden es por recientes
+        is_known = None
+        if incremental:
+            if reviews_modal.sort_newest_first():
+                is_known = hash_index.__contains__
+            else:
+                logging.warning(f"Worker {worker_id}: sin orden por recientes, se recorre {url} completo.")
+
+        # Sin lista por offset se reanuda en el modal, pasando por las páginas ya guardadas
+        pages = reviews_modal.iter_review_pages(
+            config.MAX_REVIEWS_PER_HOTEL, start_page=saved_page + 1, is_known=is_known, saved_count=saved_count
+        )
+        _send_review_pages(
+            pages, url, reviews_modal.hotel_name, reviews_modal.hotel_url, expected_count, saved_page, saved_count,
+            snapshots, result_queue, pooled.driver, snapshot_store, rate, worker_id,
+        )
+    except Exception as e:
+        failed = True
+        blocked = isinstance(e, BlockedPageError)
+        raise
+    finally:
+        collect_blocked_requests(pooled.driver)
+        collect_popup_dismissals(pooled.driver)
+        pool.release(pooled, failed=failed, recycle=blocked)
+
+def _fetch_page_with_driver(
+    job: ReviewPageJob, pool: DriverPool, rate: Optional[RateController] = None
+) -> Tuple[List[ReviewData], str]:
+    """Carga una página por offset en un navegador del pool. Devuelve sus reseñas y su HTML."""
+    pooled = pool.acquire()
+    failed, blocked = True, False
+    try:
+        load_started = time.perf_counter()
+        batch = ReviewListPage(pooled.driver).fetch(job["hotel_name"], job["reviews_hotel_url"], job["offset"])
+        _report_page(pooled.driver, rate, load_started)
+        html = pooled.driver.page_source
+        failed = False
+        return batch, html
+    except BlockedPageError:
+        blocked = True
+        raise
+    finally:
+        collect_blocked_requests(pooled.driver)
+        pool.release(pooled, failed=failed, recycle=blocked)
+
+def scrape_review_page(
+    job: ReviewPageJob, result_queue: queue.Queue, pool: DriverPool, fanout: FanOutTracker,
+    http_fetcher: Optional[HttpReviewFetcher] = None, snapshot_store: Optional[SnapshotStore] = None,
+    rate: Optional[RateController] = None, jobs: Optional[JobFeeder] = None,
+) -> None:
+    """
+    Procesa una página de reseñas por offset y, si era la última del hotel, lo marca completo.
+    Con `http_fetcher` se intenta primero sin navegador; Selenium queda como respaldo.
+    Con `jobs`, la última página cierra el lease del hotel: como terminado solo si ninguna falló.
+    """
+    ok = False
+    try:
+        if rate is not None:
+            rate.pause()
+        result = None
+        if http_fetcher is not None:
+            result = http_fetcher.fetch_page_html(job["hotel_name"], job["reviews_hotel_url"], job["offset"])
+        if result is None:
+            result = _fetch_page_with_driver(job, pool, rate)
+        batch, html = result
+        if batch:
+            result_queue.put(ReviewBatch(
+                hotel_url=job["hotel_url"], page=job["page"], reviews=batch,
+                expected_count=job["expected_count"], completed=False, fanout=True,
+                snapshots=_snapshot(snapshot_store, "reviews", job["page"], html, job["hotel_name"], job["reviews_hotel_url"])
+            ))
+        ok = True
+    finally:
+        hotel_done = fanout.finish_page(job["hotel_url"], ok)
+        if hotel_done:
+            result_queue.put(ReviewBatch(
+                hotel_url=job["hotel_url"], page=job["page"], reviews=[],
+                expected_count=job["expected_count"], completed=True, fanout=True
+            ))
+        elif hotel_done is False:
+            logging.warning(f"Hotel {job['hotel_url']} terminó con páginas fallidas; queda incompleto.")
+            _record_hotel_failure(job["hotel_url"], "Páginas por offset fallidas")
+        if jobs is not None and hotel_done is not None:
+            jobs.finish(job["hotel_url"], failed=not hotel_done)
+
+def _record_hotel_failure(hotel_url: str, reason: str, blocked: bool = False) -> None:
+    """Anota el fallo en `failed_hotels` para reintentarlo con backoff (al final de esta ejecución o en la siguiente)."""
+    db = SessionLocal()
+    try:
+        record_failure(db, hotel_url, reason, blocked)
+    except Exception as e:
+        logging.error(f"No se pudo registrar el fallo de {hotel_url}: {e}")
+    finally:
+        db.close()
+
+def worker_process(
+    hotel_queue: HotelQueue,
+    result_queue: queue.Queue,
+    worker_id: int,
+    pool: DriverPool,
+    stats: WorkerStats,
+    hash_index: Optional[ReviewHashIndex] = None,
+    fanout: Optional[FanOutTracker] = None,
+    http_fetcher: Optional[HttpReviewFetcher] = None,
+    snapshot_store: Optional[SnapshotStore] = None,
+    rate: Optional[RateController] = None,
+    jobs: Optional[JobFeeder] = None,
+) -> None:
+    """
+    Función ejecutada por cada hilo worker. Toma trabajo de la cola compartida hasta vaciarla.
+
+    Cada elemento (hotel o página por offset) se procesa con un driver prestado por el pool,
+    que se encarga de reciclar navegadores inflados o con la sesión caída sin detener al worker.
     
     Args:
-        urls (List[str]): Lista de URLs de hoteles asignada a este worker.
-        result_queue (queue.Queue): Cola compartida para enviar los resultados (reseñas).
+        hotel_queue (HotelQueue): Cola compartida de hoteles y páginas pendientes.
+        result_queue (queue.Queue): Cola compartida para enviar los resultados (una página de reseñas por mensaje).
         worker_id (int): Identificador numérico del worker para logging.
-        driver_path (str): Ruta al ejecutable del driver.
+        pool (DriverPool): Pool de drivers compartido.
+        stats (WorkerStats): Métricas de este worker, actualizadas en cada elemento.
+        hash_index (ReviewHashIndex, optional): Índice compartido con el escritor (modo incremental).
+        fanout (FanOutTracker, optional): Seguimiento de páginas por offset (`config.OFFSET_PAGINATION`).
+        http_fetcher (HttpReviewFetcher, optional): Descarga sin navegador de las páginas por offset.
+        snapshot_store (SnapshotStore, optional): Almacén donde guardar el HTML de cada página.
+        rate (RateController, optional): Control AIMD compartido; limita los workers activos a la vez.
+        jobs (JobFeeder, optional): Tabla de trabajos compartida entre procesos; se cierra el lease de
+            cada hotel al terminarlo (los hoteles repartidos por offset, al terminar su última página,
+            y como fallido si alguna de sus páginas falló).
     """
-    driver = initialize_driver(executable_path=driver_path)
-    hotel_page = HotelPage(driver)
+    logging.info(f"Worker {worker_id} iniciado. {len(hotel_queue)} elementos pendientes en cola.")
     
-    logging.info(f"Worker {worker_id} iniciado. Procesando {len(urls)} URLs.")
-    
-    for url in urls:
+    while True:
+        item = hotel_queue.get()
+        if item is None:
+            break
+
+        started = time.perf_counter()
+        hotel_failed = False
         try:
-            logging.info(f"Worker {worker_id} visitando: {url}")
-            hotel_page.navigate(url)
-            
-            # Abrir modal de reseñas
-            reviews_modal = hotel_page.open_reviews_modal()
-            if not reviews_modal:
-                logging.warning(f"Worker {worker_id}: No se pudo abrir modal para {url}")
-                continue
-            
-            # Extraer reseñas
-            all_reviews = reviews_modal.extract_all_reviews(max_reviews=config.MAX_REVIEWS_PER_HOTEL)
-            
-            if all_reviews:
-                result_queue.put(all_reviews)
-                logging.info(f"Worker {worker_id}: {len(all_reviews)} reseñas enviadas a cola para {url}")
-            else:
-                logging.warning(f"Worker {worker_id}: 0 reseñas extraídas para {url}")
-                
+            with rate.slot() if rate is not None else nullcontext():
+                if isinstance(item, dict):
+                    scrape_review_page(item, result_queue, pool, fanout, http_fetcher, snapshot_store, rate, jobs)
+                    stats.pages += 1
+                else:
+                    scrape_hotel(item, hotel_queue, result_queue, worker_id, pool, hash_index, fanout, snapshot_store, rate)
+                    stats.hotels += 1
         except Exception as e:
-            logging.error(f"Worker {worker_id} error en {url}: {e}")
-            # Importante: No detener el worker por un error en un hotel, seguir con el siguiente
-            continue
+            target = item["hotel_url"] if isinstance(item, dict) else item
+            logging.error(f"Worker {worker_id} error en {target}: {e}")
+            if rate is not None and isinstance(e, TimeoutException):
+                rate.record_failure("timeout")
+            # Importante: No detener el worker por un error en un hotel, seguir con el siguiente.
+            # El hotel queda en la cola de reintentos; las páginas sueltas las contabiliza `fanout`.
+            if not isinstance(item, dict):
+                hotel_failed = True
+                _record_hotel_failure(item, f"{type(e).__name__}: {e}", isinstance(e, BlockedPageError))
+        finally:
+            hotel_queue.task_done()
+            # Los hoteles repartidos por offset los cierra su última página (`scrape_review_page`)
+            if jobs is not None and not isinstance(item, dict) and (fanout is None or item not in fanout):
+                jobs.finish(item, failed=hotel_failed)
+            stats.busy_seconds += time.perf_counter() - started
             
-    driver.quit()
     logging.info(f"Worker {worker_id} finalizado.")
 
-def run_pipeline(hotel_urls: List[str], processed_urls: Set[str] = set()) -> None:
+def log_startup_report(phases: Dict[str, float], pool: DriverPool) -> None:
+    """Tiempo de arranque por fase hasta que los workers empiezan, y arranque medio/máximo por navegador."""
+    metrics = pool.metrics
+    detail = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in phases.items())
+    logging.info(
+        f"[STARTUP] {sum(phases.values()):.1f}s hasta el primer worker ({detail}). "
+        f"{metrics.creations} navegadores en paralelo: media {metrics.avg_startup_seconds:.1f}s, "
+        f"máx {metrics.max_startup_seconds:.1f}s por navegador."
+    )
+
+def log_worker_utilisation(all_stats: List[WorkerStats], wall_seconds: float) -> None:
+    """Reporta hoteles procesados, tiempo ocupado y tiempo ocioso de cada worker."""
+    logging.info(f"--- UTILIZACIÓN DE WORKERS (duración total: {wall_seconds:.1f}s) ---")
+    for stats in all_stats:
+        idle = max(wall_seconds - stats.busy_seconds, 0.0)
+        logging.info(
+            f"   Worker {stats.worker_id}: {stats.hotels} hoteles, {stats.pages} páginas sueltas, ocupado {stats.busy_seconds:.1f}s, "
+            f"ocioso {idle:.1f}s ({stats.utilisation(wall_seconds):.0%} utilización)"
+        )
+
+def _produce_links(
+    card_batches: Iterable[List[HotelCard]], hotel_queue: Union[HotelQueue, JobFeeder],
+    processed_urls: Set[str], use_card_counts: bool = False,
+    known_counts: Optional[Dict[str, int]] = None,
+) -> None:
+    """
+    Hilo productor: encola cada hotel nuevo en cuanto la búsqueda lo encuentra
+    (en la cola local o, con `JobFeeder`, en la tabla compartida `hotel_jobs`).
+
+    Con `use_card_counts`, el número de comentarios de la tarjeta fija su prioridad (longest-job-first).
+    Para hoteles ya visitados (`known_counts`) cuenta solo la diferencia: las reseñas nuevas.
+    """
+    known_counts = known_counts or {}
+    queued = 0
+    try:
+        for batch in card_batches:
+            for card in batch:
+                url = card["url"]
+                if url in processed_urls:
+                    continue
+                priority = 0
+                if use_card_counts and card["review_count"]:
+                    priority = max(card["review_count"] - known_counts.get(url, 0), 0)
+                hotel_queue.put(url, priority)
+                queued += 1
+    except Exception as e:
+        logging.error(f"Error en la búsqueda de hoteles: {e}")
+    finally:
+        # Sin close() los workers esperarían para siempre
+        hotel_queue.close()
+        logging.info(f"Búsqueda terminada: {queued} hoteles encolados.")
+
+def _run_workers(hotel_queue: HotelQueue, all_stats: List[WorkerStats], worker_args: tuple) -> None:
+    """
+    Lanza un worker por cada `WorkerStats` sobre `hotel_queue` y espera a que terminen.
+    `worker_args` son los argumentos comunes de `worker_process`: (result_queue, pool, hash_index, ...).
+    """
+    result_queue, pool, *shared = worker_args
+    threads = []
+    for stats in all_stats:
+        t = threading.Thread(target=worker_process, args=(
+            hotel_queue, result_queue, stats.worker_id, pool, stats, *shared
+        ))
+        t.start()
+        threads.append(t)
+    for t in threads:
+        t.join()
+
+def _retry_failed_hotels(all_stats: List[WorkerStats], worker_args: tuple) -> None:
+    """
+    Rondas de reintento al final de la ejecución, con el pool aún abierto.
+
+    Los hoteles fallidos cuyo backoff ya venció se reprocesan en una cola nueva con navegadores
+    nuevos: antes de cada ronda se reciclan todos los del pool, para que un hotel que falló por
+    una sesión o huella en mal estado no se reintente en ese mismo estado. Si el
+    próximo reintento vence dentro de `config.RETRY_MAX_WAIT_IN_RUN`, se espera a él; los
+    demás quedan para la siguiente ejecución. Se hacen como mucho `config.RETRY_ROUNDS_IN_RUN`
+    rondas: un hotel que sigue fallando queda pendiente con su backoff para ejecuciones
+    posteriores, en lugar de agotar aquí todos sus intentos y acabar en dead-letter.
+    """
+    result_queue, pool, jobs = worker_args[0], worker_args[1], worker_args[-1]
+    rounds = 0
+    while rounds < config.RETRY_ROUNDS_IN_RUN:
+        # El escritor debe haber aplicado los `completed` antes de consultar qué sigue fallido
+        result_queue.join()
+        db = SessionLocal()
+        try:
+            due = load_retry_state(db).due
+            upcoming = next_retry_at(db) if not due else None
+        finally:
+            db.close()
+        if not due:
+            wait = (upcoming - utcnow()).total_seconds() if upcoming else None
+            if wait is None or wait > config.RETRY_MAX_WAIT_IN_RUN:
+                return
+            logging.info(f"[RETRY] Esperando {max(wait, 0):.0f}s al próximo reintento.")
+            time.sleep(max(wait, 0))
+            continue
+        rounds += 1
+        logging.info(f"[RETRY] Reintentando {len(due)} hoteles fallidos (ronda {rounds}/{config.RETRY_ROUNDS_IN_RUN}).")
+        pool.recycle_all("ronda de reintentos")
+        if jobs is None:
+            _run_workers(HotelQueue(due), all_stats[:len(due)], worker_args)
+            continue
+        # Con tabla de trabajos el reintento también se reclama: nunca lo hacen dos procesos a la vez
+        jobs.enqueue(due)
+        hotel_queue = HotelQueue(closed=False)
+        jobs.start(hotel_queue)
+        _run_workers(hotel_queue, all_stats, worker_args)
+
+def log_retry_summary() -> None:
+    """Resumen de la cola de reintentos al terminar: pendientes y dead-letter."""
+    db = SessionLocal()
+    try:
+        state = load_retry_state(db)
+    finally:
+        db.close()
+    pending = len(state.due) + len(state.waiting)
+    if pending or state.dead:
+        logging.warning(f"[RETRY] {pending} hoteles pendientes de reintento, {len(state.dead)} en dead-letter.")
+
+def run_pipeline(
+    hotel_urls: List[str],
+    processed_urls: Set[str] = set(),
+    expected_counts: Optional[Dict[str, int]] = None,
+    card_batches: Optional[Iterable[List[HotelCard]]] = None,
+    known_counts: Optional[Dict[str, int]] = None,
+    jobs_only: bool = False,
+) -> None:
     """
     Orquesta el proceso de scraping paralelo.
     
-    Divide las URLs en chunks, inicia los workers y el hilo escritor, y espera a que terminen.
+    Encola las URLs en una cola compartida, inicia los workers y el hilo escritor, y espera a que terminen.
+    Cada worker toma el siguiente hotel al quedar libre, de modo que la carga se reparte dinámicamente.
+    Los hoteles que fallan se reintentan al final con backoff (ver `_retry_failed_hotels`).
+    Con `config.JOB_TABLE` los hoteles pasan por la tabla `hotel_jobs`, de la que reclaman trabajo
+    todos los procesos que compartan la DB (ver `JobFeeder`).
     
     Args:
         hotel_urls (List[str]): Lista total de URLs de hoteles a procesar.
         processed_urls (Set[str], optional): Conjunto de URLs ya procesadas para omitir.
+        expected_counts (Dict[str, int], optional): Reseñas esperadas por URL (p. ej. de las tarjetas
+            de búsqueda). Con `config.LONGEST_JOB_FIRST` los hoteles más grandes se procesan primero.
+        card_batches (Iterable[List[HotelCard]], optional): Lotes de tarjetas de búsqueda que llegan
+            mientras el pipeline ya corre (búsqueda en streaming). Se consumen en un hilo productor;
+            la cola de hoteles se cierra al agotarse.
+        known_counts (Dict[str, int], optional): Conteo de reseñas de la última visita completa por URL;
+            los hoteles ya visitados se priorizan por sus reseñas nuevas estimadas.
+        jobs_only (bool): Proceso sin búsqueda propia que solo consume `hotel_jobs` (`--worker`);
+            termina tras `config.JOB_IDLE_TIMEOUT` segundos sin trabajo en la tabla.
     """
     # Filtrar URLs ya procesadas
     urls_to_process = [url for url in hotel_urls if url not in processed_urls]
+    streaming = card_batches is not None
+    distributed = config.JOB_TABLE or jobs_only
     
-    if not urls_to_process:
+    if not urls_to_process and not streaming and not distributed:
         logging.info("No hay nuevas URLs para procesar.")
         return
 
-    logging.info(f"Iniciando pipeline para {len(urls_to_process)} hoteles con {config.MAX_WORKERS} workers.")
+    logging.info(
+        f"Iniciando pipeline para {'(búsqueda en streaming) ' if streaming else ''}"
+        f"{'(tabla hotel_jobs) ' if distributed else ''}{len(urls_to_process)} hoteles "
+        f"con {config.MAX_WORKERS} navegadores x {config.TABS_PER_BROWSER} pestañas."
+    )
 
-    # Cola para comunicar workers -> escritor
-    result_queue = queue.Queue()
+    # Cola para comunicar workers -> escritor (acotada: si el escritor se atrasa, los workers esperan)
+    result_queue = queue.Queue(maxsize=config.RESULT_QUEUE_MAXSIZE)
+    
+    # Índice de hashes existentes, compartido por el escritor y (en modo incremental) los workers
+    db = SessionLocal()
+    try:
+        hash_index = ReviewHashIndex.load(db)
+        STRATEGY_STATS.load(db)
+    finally:
+        db.close()
     
     # Iniciar hilo escritor (Consumer)
     writer_thread = threading.Thread(
         target=csv_writer_listener,
-        args=(result_queue, config.RAW_REVIEWS_FILE)
+        args=(result_queue, config.RAW_REVIEWS_FILE, hash_index)
     )
     writer_thread.start()
     
-    # Dividir trabajo (URLs) entre workers
-    chunk_size = (len(urls_to_process) // config.MAX_WORKERS) + 1
-    chunks = [urls_to_process[i:i + chunk_size] for i in range(0, len(urls_to_process), chunk_size)]
+    # Cola compartida de trabajo (work stealing); abierta mientras la búsqueda siga produciendo
+    expected_counts = expected_counts if config.LONGEST_JOB_FIRST else None
+    # (con tabla de trabajos, la alimenta el `JobFeeder` con lo que este proceso reclama)
+    if distributed:
+        hotel_queue = HotelQueue(closed=False)
+    else:
+        hotel_queue = HotelQueue(urls_to_process, expected_counts, closed=not streaming)
+    # Un hilo por pestaña: MAX_WORKERS navegadores con TABS_PER_BROWSER pestañas cada uno.
+    # En streaming no se sabe cuántos hoteles habrá: se usan todos los navegadores.
+    # Con nodos remotos, el límite de navegadores es la capacidad total de los nodos.
+    tabs = config.TABS_PER_BROWSER
+    grid = create_remote_grid()
+    max_browsers = grid.capacity if grid is not None else config.MAX_WORKERS
+    if grid is not None:
+        logging.info(f"[GRID] {len(grid.nodes)} nodos remotos, capacidad total {grid.capacity} navegadores.")
+    if streaming or distributed:
+        num_browsers = max_browsers
+        num_workers = num_browsers * tabs
+    else:
+        num_browsers = min(max_browsers, -(-len(urls_to_process) // tabs))
+        num_workers = min(num_browsers * tabs, len(urls_to_process))
     
-    # Obtener ruta del driver UNA VEZ
-    driver_path = get_driver_path()
+    jobs = create_job_feeder(num_workers, producing=streaming, jobs_only=jobs_only)
+    if jobs is not None:
+        jobs.enqueue(urls_to_process, expected_counts)
 
-    threads = []
-    for i, chunk in enumerate(chunks):
-        if not chunk: continue
-        t = threading.Thread(target=worker_process, args=(chunk, result_queue, i+1, driver_path))
-        t.start()
-        threads.append(t)
-        
+    # Obtener ruta del driver UNA VEZ (solo Chrome local) y arrancar todos los navegadores en paralelo
+    startup = {}
+    phase_start = time.perf_counter()
+    driver_path = get_driver_path() if grid is None else None
+    startup["ChromeDriver"] = time.perf_counter() - phase_start
+    phase_start = time.perf_counter()
+    warm_up_driver_config()
+    startup["opciones/User-Agents"] = time.perf_counter() - phase_start
+
+    # La búsqueda arranca ya, en paralelo con el arranque de los navegadores
+    producer = None
+    if streaming:
+        producer = threading.Thread(
+            target=_produce_links,
+            args=(card_batches, jobs or hotel_queue, processed_urls | set(urls_to_process), config.LONGEST_JOB_FIRST, known_counts)
+        )
+        producer.start()
+
+    if grid is not None:
+        pool = DriverPool(num_browsers, factory=grid.create_driver, on_quit=grid.release, tabs_per_browser=tabs)
+    else:
+        pool = DriverPool(num_browsers, driver_path, tabs_per_browser=tabs)
+    phase_start = time.perf_counter()
+    pool.prewarm()
+    startup["navegadores"] = time.perf_counter() - phase_start
+    if jobs is not None:
+        jobs.start(hotel_queue)
+
+    # Seguimiento de hoteles repartidos por páginas (modo offset)
+    fanout = FanOutTracker() if config.OFFSET_PAGINATION else None
+    rate = create_rate_controller(num_workers)
+    http_fetcher = create_http_fetcher(rate) if fanout is not None else None
+    snapshot_store = create_snapshot_store()
+
+    log_startup_report(startup, pool)
+    all_stats = [WorkerStats(i + 1) for i in range(num_workers)]
+    worker_args = (result_queue, pool, hash_index, fanout, http_fetcher, snapshot_store, rate, jobs)
+    pipeline_start = time.perf_counter()
     # Esperar a que todos los workers terminen
-    for t in threads:
-        t.join()
+    _run_workers(hotel_queue, all_stats, worker_args)
+    if producer is not None:
+        producer.join()
+    _retry_failed_hotels(all_stats, worker_args)
+    pool.close()
+    if grid is not None:
+        grid.log_summary()
+    if rate is not None:
+        rate.log_summary()
+    if http_fetcher is not None:
+        http_fetcher.log_summary()
+        http_fetcher.close()
+    db = SessionLocal()
+    try:
+        STRATEGY_STATS.save(db)
+    except Exception as e:
+        logging.error(f"No se pudieron guardar las estadísticas de estrategias: {e}")
+    finally:
+        db.close()
+    log_worker_utilisation(all_stats, time.perf_counter() - pipeline_start)
+    log_blocked_summary()
+    log_dismissal_summary()
+    log_retry_summary()
         
     # Enviar señal de terminación (Poison Pill) al escritor
     result_queue.put(None)
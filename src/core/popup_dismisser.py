@@ -0,0 +1,102 @@
+import json
+import logging
+from typing import Dict
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+from src import config
+from src.core.driver import supports_cdp
+from src.booking_selectors import HotelPage as HotelPageSelectors, Reviews
+from src.utils.metrics import CounterStats
+
+# Reglas: tipo de popup (para métricas), selector, acción ('click' o 'remove') y, opcionalmente,
+# un selector que desactiva la regla mientras exista en el documento. El cierre del popup de login
+# usa aria-labels genéricos ("Cerrar") que también tiene el panel de reseñas, así que no se aplica
+# una vez abiertas las reseñas.
+POPUP_RULES = [
+    {"type": "login", "selector": HotelPageSelectors.LOGIN_POPUP_CLOSE, "action": "click", "unless": Reviews.ITEM},
+    {"type": "google_one_tap", "selector": HotelPageSelectors.GOOGLE_ONE_TAP_CONTAINER, "action": "remove"},
+    {"type": "google_one_tap", "selector": HotelPageSelectors.GOOGLE_ONE_TAP_IFRAME, "action": "remove"},
+    {"type": "cookies", "selector": HotelPageSelectors.COOKIE_BANNER_ACCEPT, "action": "click"},
+]
+
+# Se inyecta antes de cualquier script de la página. Un MutationObserver (con debounce) barre las
+# reglas cada vez que cambia el DOM y deja el conteo de cierres en window.__popupDismissals.
+POPUP_DISMISSER_JS = """
+(() => {
+    if (window.__popupDismisser) return;
+    window.__popupDismisser = true;
+    window.__popupDismissals = {};
+    const rules = %s;
+    const visible = el => el.getClientRects().length > 0;
+    const sweep = () => {
+        for (const rule of rules) {
+            if (rule.unless && document.querySelector(rule.unless)) continue;
+            document.querySelectorAll(rule.selector).forEach(el => {
+                if (el.__dismissed || (rule.action === 'click' && !visible(el))) return;
+                el.__dismissed = true;
+                if (rule.action === 'remove') el.remove(); else el.click();
+                window.__popupDismissals[rule.type] = (window.__popupDismissals[rule.type] || 0) + 1;
+            });
+        }
+    };
+    let pending = false;
+    const schedule = () => {
+        if (pending) return;
+        pending = true;
+        setTimeout(() => { pending = false; sweep(); }, 50);
+    };
+    const start = () => {
+        schedule();
+        new MutationObserver(schedule).observe(document.documentElement, {childList: true, subtree: true});
+    };
+    if (document.documentElement) start(); else document.addEventListener('DOMContentLoaded', start);
+})();
+""" % json.dumps(POPUP_RULES)
+
+# Cierres por tipo de popup en la ejecución actual
+DISMISSAL_STATS = CounterStats()
+
+def install_popup_dismisser(driver: webdriver.Chrome) -> bool:
+    """
+    Registra el auto-cierre de popups para todos los documentos futuros del driver/pestaña.
+
+    Returns:
+        bool: True si el driver tiene el script instalado (ya lo tenía o se acaba de instalar).
+    """
+    if has_popup_dismisser(driver):
+        return True
+    if not config.POPUP_AUTODISMISS or not supports_cdp(driver):
+        return False
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": POPUP_DISMISSER_JS})
+    except WebDriverException as e:
+        logging.warning(f"No se pudo instalar el auto-cierre de popups: {e}")
+        return False
+    driver._popup_dismisser = True
+    return True
+
+def has_popup_dismisser(driver: webdriver.Chrome) -> bool:
+    """True si el driver tiene instalado el auto-cierre (los popups no requieren esperas)."""
+    return getattr(driver, "_popup_dismisser", False) is True
+
+def collect_popup_dismissals(driver: webdriver.Chrome) -> Dict[str, int]:
+    """Lee y reinicia los contadores del documento actual y los suma a `DISMISSAL_STATS`."""
+    if not has_popup_dismisser(driver):
+        return {}
+    try:
+        counts = driver.execute_script(
+            "const c = window.__popupDismissals || {}; window.__popupDismissals = {}; return c;"
+        )
+    except WebDriverException:
+        return {}
+    if not isinstance(counts, dict):
+        return {}
+    DISMISSAL_STATS.add(counts)
+    return counts
+
+def log_dismissal_summary() -> None:
+    """Reporta los popups cerrados automáticamente en la ejecución, por tipo."""
+    if DISMISSAL_STATS.total():
+        logging.info(f"[POPUPS] {DISMISSAL_STATS.total()} popups cerrados automáticamente ({DISMISSAL_STATS.summary()}).")
@@ -0,0 +1,140 @@
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+from selenium.common.exceptions import WebDriverException
+
+from src import config
+from src.booking_selectors import Blocking
+from src.utils.metrics import CounterStats
+
+# Detecta una página de bloqueo/captcha en una sola llamada.
+# Argumentos: selector de captcha y lista de fragmentos de título (en minúsculas).
+DETECT_BLOCK_JS = """
+const [captchaSel, titles] = arguments;
+if (document.querySelector(captchaSel)) return 'captcha';
+const title = (document.title || '').toLowerCase();
+return titles.some(t => title.includes(t)) ? 'blocked' : null;
+"""
+
+class BlockedPageError(Exception):
+    """Booking devolvió una página de bloqueo o captcha en lugar del contenido."""
+
+def detect_block(driver) -> Optional[str]:
+    """Devuelve 'captcha' o 'blocked' si la página actual es de bloqueo, None si no."""
+    try:
+        return driver.execute_script(DETECT_BLOCK_JS, Blocking.CAPTCHA, Blocking.BLOCKED_TITLES)
+    except WebDriverException:
+        return None
+
+class RateController:
+    """
+    Control de concurrencia y ritmo AIMD (aumento aditivo, reducción multiplicativa) compartido por los workers.
+
+    Cada carga de página informa su latencia o su fallo (timeout, bloqueo). Mientras el sitio
+    responde bien, el número de workers activos sube ~1 por cada ronda de peticiones y la pausa
+    entre páginas baja poco a poco. Ante un timeout, un bloqueo/captcha o una latencia media por
+    encima del objetivo, los workers activos se multiplican por `decrease_factor` y la pausa se
+    divide por él (como mucho una reducción cada `cooldown` segundos, para que una ráfaga de
+    errores de la misma congestión no colapse el pool).
+    """
+    def __init__(
+        self,
+        max_workers: int,
+        min_workers: Optional[int] = None,
+        min_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        latency_target: Optional[float] = None,
+        decrease_factor: Optional[float] = None,
+        cooldown: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.max_workers = max_workers
+        self.min_workers = min(min_workers or config.RATE_MIN_WORKERS, max_workers)
+        self.min_delay = config.RATE_MIN_DELAY if min_delay is None else min_delay
+        self.max_delay = max_delay or config.RATE_MAX_DELAY
+        self.latency_target = latency_target or config.RATE_LATENCY_TARGET
+        self.decrease_factor = decrease_factor or config.RATE_DECREASE_FACTOR
+        self.cooldown = config.RATE_COOLDOWN if cooldown is None else cooldown
+        self._clock = clock
+        self._sleep = sleep
+
+        self.limit = float(max_workers)
+        # Pausa base y margen de jitter a partir de TIME_BETWEEN_PAGES_MIN/MAX
+        self.delay = max(config.TIME_BETWEEN_PAGES_MIN, self.min_delay)
+        self.jitter = max(config.TIME_BETWEEN_PAGES_MAX - config.TIME_BETWEEN_PAGES_MIN, 0.0)
+        self.latency_ewma: Optional[float] = None
+        self.stats = CounterStats()
+        self._active = 0
+        self._last_decrease = float("-inf")
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Ocupa un puesto de worker activo; espera mientras se esté por encima del límite actual."""
+        with self._cond:
+            while self._active >= int(self.limit):
+                self._cond.wait()
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+
+    def pause(self) -> None:
+        """Pausa entre páginas con jitter: `delay` + U(0, jitter)."""
+        with self._cond:
+            seconds = self.delay + random.uniform(0, self.jitter) if self.delay > 0 else 0.0
+        if seconds > 0:
+            self._sleep(seconds)
+
+    def record_success(self, latency: float) -> None:
+        """Una página cargó bien en `latency` segundos."""
+        self.stats.add({"ok": 1})
+        with self._cond:
+            self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+            if self.latency_ewma > self.latency_target:
+                self._decrease("latencia alta")
+                return
+            previous = int(self.limit)
+            self.limit = min(self.max_workers, self.limit + 1.0 / self.limit)
+            self.delay = max(self.min_delay, self.delay - config.RATE_DELAY_STEP / self.limit)
+            if int(self.limit) > previous:
+                logging.info(f"[AIMD] Workers activos {previous} -> {int(self.limit)} (pausa {self.delay:.1f}s).")
+                self._cond.notify_all()
+
+    def record_failure(self, kind: str) -> None:
+        """Un timeout ('timeout') o una página de bloqueo ('blocked', 'captcha')."""
+        self.stats.add({kind: 1})
+        with self._cond:
+            self._decrease(kind)
+
+    def _decrease(self, reason: str) -> None:
+        now = self._clock()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        previous_limit, previous_delay = int(self.limit), self.delay
+        self.limit = max(float(self.min_workers), self.limit * self.decrease_factor)
+        self.delay = min(self.max_delay, max(self.delay, config.TIME_BETWEEN_PAGES_MIN) / self.decrease_factor)
+        logging.warning(
+            f"[AIMD] {reason}: workers activos {previous_limit} -> {int(self.limit)}, "
+            f"pausa {previous_delay:.1f}s -> {self.delay:.1f}s."
+        )
+
+    def log_summary(self) -> None:
+        latency = f"{self.latency_ewma:.1f}s" if self.latency_ewma is not None else "-"
+        logging.info(
+            f"[AIMD] Final: {int(self.limit)}/{self.max_workers} workers activos, pausa {self.delay:.1f}s, "
+            f"latencia media {latency}. Páginas: {self.stats.summary()}"
+        )
+
+def create_rate_controller(max_workers: int) -> Optional[RateController]:
+    """Crea el controlador si está activado en config."""
+    return RateController(max_workers) if config.RATE_CONTROL else None
@@ -0,0 +1,75 @@
+import json
+import logging
+from collections import Counter
+from typing import List
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+from src import config
+from src.core.driver import supports_cdp
+from src.utils.metrics import CounterStats
+
+# Métricas de la ejecución actual (compartidas por todos los drivers)
+BLOCKED_STATS = CounterStats()
+
+def blocked_patterns(page_type: str) -> List[str]:
+    """Patrones de URL a bloquear para un tipo de página ('search', 'hotel', 'reviews')."""
+    patterns = []
+    for category in config.RESOURCE_POLICY.get(page_type, []):
+        patterns.extend(config.BLOCKED_URL_PATTERNS.get(category, []))
+    return patterns
+
+def apply_resource_policy(driver: webdriver.Chrome, page_type: str) -> None:
+    """
+    Configura vía CDP las URLs bloqueadas para el tipo de página indicado.
+
+    Solo envía comandos cuando el tipo de página cambia respecto al último aplicado en ese driver.
+    No hace nada si el bloqueo está desactivado o el driver no soporta CDP (p. ej. un nodo remoto sin CDP).
+    """
+    if not config.BLOCK_RESOURCES or not supports_cdp(driver):
+        return
+    if getattr(driver, "_resource_page_type", None) == page_type:
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_patterns(page_type)})
+        driver._resource_page_type = page_type
+    except WebDriverException as e:
+        logging.warning(f"No se pudo aplicar la política de recursos '{page_type}': {e}")
+
+def collect_blocked_requests(driver: webdriver.Chrome) -> int:
+    """
+    Vacía el performance log del driver y suma al contador global las peticiones
+    bloqueadas por la política (`Network.loadingFailed` con `blockedReason`).
+
+    Returns:
+        int: Peticiones bloqueadas desde la última recolección en este driver.
+    """
+    if not (config.BLOCK_RESOURCES and config.BLOCKED_RESOURCE_METRICS):
+        return 0
+    try:
+        entries = driver.get_log("performance")
+    except (WebDriverException, AttributeError, ValueError):
+        return 0
+
+    counts: Counter = Counter()
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, TypeError, ValueError):
+            continue
+        if message.get("method") != "Network.loadingFailed":
+            continue
+        params = message.get("params", {})
+        if params.get("blockedReason"):
+            counts[params.get("type", "Other")] += 1
+
+    BLOCKED_STATS.add(counts)
+    return sum(counts.values())
+
+def log_blocked_summary() -> None:
+    """Reporta las peticiones bloqueadas en la ejecución por tipo de recurso."""
+    if not BLOCKED_STATS.total():
+        return
+    logging.info(f"[RESOURCES] {BLOCKED_STATS.total()} peticiones bloqueadas ({BLOCKED_STATS.summary()}).")
@@ -0,0 +1,83 @@
+import logging
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from src import config
+from src.core.hotel_links import utcnow
+from src.models import FailedHotel
+
+class RetryState(NamedTuple):
+    """Hoteles fallidos según su situación respecto al backoff."""
+    due: List[str] # Se pueden reintentar ya
+    waiting: Set[str] # En backoff todavía
+    dead: Set[str] # Agotaron sus intentos (dead-letter)
+
+class HotelFailedError(Exception):
+    """El hotel no se pudo procesar por completo (sin modal, páginas fallidas...)."""
+
+def backoff_seconds(attempts: int) -> float:
+    """Espera exponencial tras `attempts` fallos: base, 2*base, 4*base... hasta `RETRY_MAX_BACKOFF`."""
+    return min(config.RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0), config.RETRY_MAX_BACKOFF)
+
+def record_failure(db: Session, hotel_url: str, reason: str, blocked: bool = False) -> FailedHotel:
+    """
+    Registra un fallo: incrementa los intentos, programa el siguiente con backoff exponencial
+    y, al llegar a `config.RETRY_MAX_ATTEMPTS`, pasa el hotel a dead-letter.
+
+    Args:
+        blocked (bool): El fallo fue una página de bloqueo. Dice poco del hotel (el control de
+            ritmo ya frena), así que no suma intento: solo se pospone con el backoff del siguiente.
+    """
+    failed = db.query(FailedHotel).filter(FailedHotel.hotel_url == hotel_url).first()
+    if failed is None:
+        failed = FailedHotel(hotel_url=hotel_url, attempts=0, dead=False)
+        db.add(failed)
+    if not blocked:
+        failed.attempts += 1
+    delay = backoff_seconds(failed.attempts if not blocked else failed.attempts + 1)
+    failed.last_error = reason[:1000]
+    failed.next_attempt_at = utcnow() + timedelta(seconds=delay)
+    failed.dead = failed.attempts >= config.RETRY_MAX_ATTEMPTS
+    db.commit()
+
+    if failed.dead:
+        logging.error(f"[DEAD-LETTER] {hotel_url} tras {failed.attempts} intentos: {failed.last_error}")
+    elif blocked:
+        logging.warning(f"[RETRY] {hotel_url} bloqueado (no cuenta como intento), se reintentará en {delay:.0f}s.")
+    else:
+        logging.warning(
+            f"[RETRY] {hotel_url} falló (intento {failed.attempts}/{config.RETRY_MAX_ATTEMPTS}), "
+            f"se reintentará en {delay:.0f}s."
+        )
+    return failed
+
+def clear_failure(db: Session, hotel_url: str) -> None:
+    """El hotel terminó bien: sale de la cola de reintentos."""
+    if db.query(FailedHotel).filter(FailedHotel.hotel_url == hotel_url).delete(synchronize_session=False):
+        db.commit()
+        logging.info(f"[RETRY] {hotel_url} completado tras reintento.")
+
+def load_retry_state(db: Session, now: Optional[datetime] = None) -> RetryState:
+    """Clasifica los hoteles fallidos en reintentables ya, en backoff y dead-letter."""
+    now = now or utcnow()
+    due, waiting, dead = [], set(), set()
+    for failed in db.query(FailedHotel).order_by(FailedHotel.next_attempt_at).all():
+        if failed.dead:
+            dead.add(failed.hotel_url)
+        elif failed.next_attempt_at <= now:
+            due.append(failed.hotel_url)
+        else:
+            waiting.add(failed.hotel_url)
+    return RetryState(due, waiting, dead)
+
+def next_retry_at(db: Session) -> Optional[datetime]:
+    """Momento del próximo reintento pendiente (None si no hay)."""
+    failed = (
+        db.query(FailedHotel)
+        .filter(FailedHotel.dead.is_(False))
+        .order_by(FailedHotel.next_attempt_at)
+        .first()
+    )
+    return failed.next_attempt_at if failed else None
@@ -0,0 +1,112 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from src import config
+from src.core.hotel_links import HotelCard
+
+SearchFn = Callable[[str], Iterable[List[HotelCard]]]
+
+def with_partition(search_url: str, partition: str) -> str:
+    """Añade los filtros de una partición (query string, p. ej. `nflt=class%3D4`) a una URL de búsqueda."""
+    parts = urlsplit(search_url)
+    query = parse_qsl(parts.query, keep_blank_values=True) + parse_qsl(partition, keep_blank_values=True)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), parts.fragment))
+
+def build_search_urls(search_urls: List[str], partitions: Optional[List[str]] = None) -> List[str]:
+    """
+    Frontera inicial: cada región por cada partición de filtros. Las particiones sirven para
+    quedar por debajo del tope de resultados que Booking muestra por búsqueda.
+    """
+    urls = []
+    for search_url in search_urls:
+        for partition in partitions or [""]:
+            url = with_partition(search_url, partition) if partition else search_url
+            if url not in urls:
+                urls.append(url)
+    return urls
+
+class RegionStats:
+    """Progreso de una URL de búsqueda (región o partición)."""
+    def __init__(self, search_url: str):
+        self.search_url = search_url
+        self.cards = 0 # Tarjetas encontradas en esta búsqueda
+        self.new_cards = 0 # ... que no había encontrado otra región antes
+        self.batches = 0
+        self.seconds = 0.0
+        self.error: Optional[str] = None
+        self.done = False
+
+class SearchFrontier:
+    """
+    Recorre varias búsquedas en paralelo y entrega un único flujo de tarjetas sin duplicados.
+
+    Cada URL de búsqueda se consume con `search_fn` (un generador de lotes de tarjetas, p. ej. un
+    `SearchPage` por navegador) en un pool de `parallelism` hilos. Los lotes se entregan en cuanto
+    llegan, deduplicados por URL canónica entre todas las regiones. Si el consumidor deja de
+    iterar, las búsquedas en curso se detienen tras su lote actual.
+    """
+    def __init__(self, search_urls: List[str], search_fn: SearchFn, parallelism: Optional[int] = None):
+        self.search_urls = search_urls
+        self.search_fn = search_fn
+        self.parallelism = max(1, min(parallelism or config.SEARCH_PARALLELISM, len(search_urls) or 1))
+        self.stats: Dict[str, RegionStats] = {url: RegionStats(url) for url in search_urls}
+        self._batches: queue.Queue = queue.Queue()
+        self._stop = threading.Event()
+
+    def _run_region(self, search_url: str) -> None:
+        stats = self.stats[search_url]
+        start = time.perf_counter()
+        batches = self.search_fn(search_url)
+        try:
+            for cards in batches:
+                if self._stop.is_set():
+                    break
+                stats.batches += 1
+                stats.cards += len(cards)
+                self._batches.put((search_url, cards))
+        except Exception as e:
+            stats.error = str(e)
+            logging.error(f"[REGION] Error en {search_url}: {e}")
+        finally:
+            close = getattr(batches, "close", None)
+            if close:
+                close() # Libera el navegador de la búsqueda si se detuvo antes de tiempo
+            stats.seconds = time.perf_counter() - start
+            stats.done = True
+            self._batches.put((search_url, None)) # Fin de esta región
+
+    def __iter__(self) -> Iterator[List[HotelCard]]:
+        seen = set()
+        pending = len(self.search_urls)
+        executor = ThreadPoolExecutor(max_workers=self.parallelism, thread_name_prefix="search")
+        for url in self.search_urls:
+            executor.submit(self._run_region, url)
+        try:
+            while pending:
+                search_url, cards = self._batches.get()
+                if cards is None:
+                    pending -= 1
+                    self._log_region(self.stats[search_url], len(self.search_urls) - pending)
+                    continue
+                fresh = [card for card in cards if card["url"] not in seen]
+                seen.update(card["url"] for card in fresh)
+                self.stats[search_url].new_cards += len(fresh)
+                if fresh:
+                    yield fresh
+        finally:
+            # Consumidor cerrado antes de tiempo: las regiones pendientes no arrancan
+            self._stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+        logging.info(f"[FRONTIER] {len(seen)} hoteles únicos en {len(self.search_urls)} búsquedas.")
+
+    def _log_region(self, stats: RegionStats, finished: int) -> None:
+        status = f"ERROR ({stats.error})" if stats.error else "OK"
+        logging.info(
+            f"[REGION {finished}/{len(self.search_urls)}] {status} {stats.search_url}: "
+            f"{stats.cards} hoteles ({stats.new_cards} nuevos) en {stats.seconds:.1f}s"
+        )
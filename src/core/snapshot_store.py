@@ -0,0 +1,105 @@
+import hashlib
+import logging
+import os
+import tempfile
+from typing import List, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from src import config
+from src.models import PageSnapshot
+
+try:
+    import zstandard
+except ImportError:  # Sin zstandard no se guardan snapshots
+    zstandard = None
+
+class SnapshotStore:
+    """
+    Almacén de HTML crudo direccionado por contenido y comprimido con zstd.
+
+    Cada página se guarda en `<root>/<2 primeros hex>/<sha256>.html.zst`. Las páginas idénticas
+    (p. ej. al reanudar) se guardan una sola vez. Las escrituras son atómicas (archivo temporal +
+    `os.replace`), así que varios hilos o procesos pueden compartir el directorio.
+    """
+    def __init__(self, root: Optional[str] = None, level: Optional[int] = None):
+        if zstandard is None:
+            raise ImportError("zstandard es necesario para el almacén de snapshots.")
+        self.root = root or config.SNAPSHOT_DIR
+        self.level = level or config.SNAPSHOT_ZSTD_LEVEL
+        os.makedirs(self.root, exist_ok=True)
+
+    def path_for(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], f"{digest}.html.zst")
+
+    def put(self, html: str) -> str:
+        """Guarda el HTML (si no existía) y devuelve su hash de contenido."""
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest)
+        if os.path.exists(path):
+            return digest
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Los compresores de zstandard no son thread-safe: uno por escritura
+        compressed = zstandard.ZstdCompressor(level=self.level).compress(data)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+        return digest
+
+    def get(self, digest: str) -> str:
+        with open(self.path_for(digest), "rb") as f:
+            return zstandard.ZstdDecompressor().decompress(f.read()).decode("utf-8")
+
+def create_snapshot_store() -> Optional[SnapshotStore]:
+    """Crea el almacén si está activado en config y zstandard está instalado."""
+    if not config.SNAPSHOT_STORE:
+        return None
+    if zstandard is None:
+        logging.warning("[SNAPSHOT] zstandard no está instalado; no se guardará el HTML de las páginas.")
+        return None
+    return SnapshotStore()
+
+def record_snapshot(
+    db: Session, hotel_url: str, kind: str, page: int, content_hash: str,
+    hotel_name: Optional[str] = None, reviews_hotel_url: Optional[str] = None,
+) -> None:
+    """
+    Registra (upsert) el snapshot más reciente de una página de un hotel.
+
+    Args:
+        hotel_url (str): URL encolada del hotel (clave del checkpoint).
+        reviews_hotel_url (str, optional): `hotel_url` que llevan las reseñas de la página
+            (`driver.current_url` tras redirecciones); `src.reextract` lo usa para que las filas
+            re-extraídas coincidan con las escritas en vivo.
+    """
+    values = {"hotel_url": hotel_url, "kind": kind, "page": page, "content_hash": content_hash}
+    if hotel_name:
+        values["hotel_name"] = hotel_name
+    if reviews_hotel_url:
+        values["reviews_hotel_url"] = reviews_hotel_url
+
+    stmt = sqlite_insert(PageSnapshot.__table__).values(**values)
+    updates = {key: stmt.excluded[key] for key in values if key not in ("hotel_url", "kind", "page")}
+    updates["updated_at"] = func.now()
+    db.execute(stmt.on_conflict_do_update(index_elements=["hotel_url", "kind", "page"], set_=updates))
+    db.commit()
+
+def load_snapshots(db: Session, kind: str, hotel_urls: Optional[List[str]] = None) -> List[PageSnapshot]:
+    """
+    Snapshots de un tipo, opcionalmente filtrados por hotel (URL encolada o la de sus reseñas),
+    ordenados por hotel y página.
+    """
+    query = db.query(PageSnapshot).filter(PageSnapshot.kind == kind)
+    if hotel_urls:
+        query = query.filter(or_(PageSnapshot.hotel_url.in_(hotel_urls), PageSnapshot.reviews_hotel_url.in_(hotel_urls)))
+    return query.order_by(PageSnapshot.hotel_url, PageSnapshot.page).all()
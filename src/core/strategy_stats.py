@@ -0,0 +1,83 @@
+import logging
+import threading
+from typing import Dict, List, Tuple
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from src.models import SelectorStat
+
+Strategy = Tuple[str, str]  # (By, selector)
+
+def strategy_key(strategy: Strategy) -> str:
+    by, selector = strategy
+    return f"{by}:{selector}"
+
+class StrategyStats:
+    """
+    Estadísticas de acierto de las estrategias para abrir reseñas, compartidas por todos los workers.
+
+    Se cargan de la DB al iniciar el pipeline, se actualizan en memoria y se guardan al final.
+    Se guardan solo los intentos nuevos y se suman a los de la DB, así varios procesos que
+    comparten la DB no se pisan los contadores.
+    """
+    def __init__(self):
+        self._counts: Dict[str, List[int]] = {}  # key -> [attempts, hits], para ordenar
+        self._unsaved: Dict[str, List[int]] = {}  # key -> [attempts, hits] aún no guardados
+        self._lock = threading.Lock()
+
+    def load(self, db: Session) -> None:
+        rows = db.query(SelectorStat.strategy, SelectorStat.attempts, SelectorStat.hits).all()
+        with self._lock:
+            self._counts = {key: [attempts or 0, hits or 0] for key, attempts, hits in rows}
+        logging.info(f"[STRATEGY] Estadísticas cargadas para {len(rows)} estrategias.")
+
+    def hit_rate(self, strategy: Strategy) -> float:
+        """Tasa de acierto suavizada (Laplace): las estrategias sin historial parten de 0.5."""
+        with self._lock:
+            attempts, hits = self._counts.get(strategy_key(strategy), (0, 0))
+        return (hits + 1) / (attempts + 2)
+
+    def order(self, strategies: List[Strategy]) -> List[Strategy]:
+        """Ordena por tasa de acierto descendente; en empate se respeta el orden original."""
+        return sorted(strategies, key=self.hit_rate, reverse=True)
+
+    def record(self, strategy: Strategy, hit: bool) -> None:
+        key = strategy_key(strategy)
+        with self._lock:
+            for counts in (self._counts.setdefault(key, [0, 0]), self._unsaved.setdefault(key, [0, 0])):
+                counts[0] += 1
+                if hit:
+                    counts[1] += 1
+
+    def save(self, db: Session) -> None:
+        """Suma a la DB los intentos registrados desde el último guardado."""
+        with self._lock:
+            unsaved, self._unsaved = self._unsaved, {}
+        rows = [{"strategy": key, "attempts": a, "hits": h} for key, (a, h) in unsaved.items()]
+        if not rows:
+            return
+        table = SelectorStat.__table__
+        stmt = sqlite_insert(table).values(rows)
+        try:
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=["strategy"],
+                set_={
+                    "attempts": table.c.attempts + stmt.excluded.attempts,
+                    "hits": table.c.hits + stmt.excluded.hits,
+                    "updated_at": func.now(),
+                },
+            ))
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:  # Conservarlos para el próximo guardado
+                for key, (a, h) in unsaved.items():
+                    counts = self._unsaved.setdefault(key, [0, 0])
+                    counts[0] += a
+                    counts[1] += h
+            raise
+
+# Instancia del proceso (la usa HotelPage; el pipeline la carga y la guarda)
+STRATEGY_STATS = StrategyStats()
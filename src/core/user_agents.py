@@ -0,0 +1,80 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import List, Optional
+
+from src import config
+
+FALLBACK_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+_pool: Optional[List[str]] = None
+_lock = threading.Lock()
+
+def _read_cache(path: str, ttl_hours: float) -> Optional[List[str]]:
+    """User-Agents de la caché en disco si existe y tiene menos de `ttl_hours`."""
+    try:
+        if time.time() - os.path.getmtime(path) > ttl_hours * 3600:
+            return None
+        with open(path, encoding="utf-8") as f:
+            agents = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return agents if isinstance(agents, list) and agents else None
+
+def _generate(size: int) -> List[str]:
+    """Muestra `size` User-Agents distintos de fake_useragent (carga su dataset una vez)."""
+    from fake_useragent import UserAgent  # Solo si la caché no sirve: cargar el dataset es lo costoso
+    ua = UserAgent()
+    agents: List[str] = []
+    for _ in range(size * 5):
+        agent = ua.random
+        if agent not in agents:
+            agents.append(agent)
+        if len(agents) >= size:
+            break
+    return agents
+
+def _write_cache(path: str, agents: List[str]) -> None:
+    """Escritura atómica: otro proceso nunca lee un JSON a medias."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(agents, f, indent=1)
+    os.replace(tmp, path)
+
+def load_user_agent_pool(path: Optional[str] = None, size: Optional[int] = None, ttl_hours: Optional[float] = None) -> List[str]:
+    """
+    Pool de User-Agents: desde la caché en disco si está vigente; si no, generado con
+    fake_useragent y guardado para las siguientes ejecuciones. Si todo falla, el User-Agent por defecto.
+    """
+    path = path or config.USER_AGENT_CACHE_FILE
+    ttl_hours = config.USER_AGENT_CACHE_TTL_HOURS if ttl_hours is None else ttl_hours
+    cached = _read_cache(path, ttl_hours)
+    if cached:
+        return cached
+    try:
+        agents = _generate(size or config.USER_AGENT_POOL_SIZE)
+    except Exception as e:
+        logging.warning(f"⚠️ Falló fake-useragent ({e}), usando default.")
+        return [FALLBACK_USER_AGENT]
+    try:
+        _write_cache(path, agents)
+    except OSError as e:
+        logging.warning(f"No se pudo guardar la caché de User-Agents: {e}")
+    return agents
+
+def user_agent_pool() -> List[str]:
+    """Pool del proceso: se carga una sola vez, aunque lo pidan varios hilos a la vez."""
+    global _pool
+    with _lock:
+        if _pool is None:
+            started = time.perf_counter()
+            _pool = load_user_agent_pool()
+            logging.info(f"🎭 {len(_pool)} User-Agents cargados en {time.perf_counter() - started:.2f}s.")
+        return _pool
+
+def random_user_agent() -> str:
+    return random.choice(user_agent_pool())
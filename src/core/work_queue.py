@@ -0,0 +1,86 @@
+import heapq
+import itertools
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple, TypedDict, Union
+
+class ReviewPageJob(TypedDict):
+    """Una página de reseñas de un hotel, direccionada por offset (modo fan-out)."""
+    hotel_url: str # URL encolada (clave del checkpoint)
+    reviews_hotel_url: str # URL del hotel tal como la vio el navegador (va en cada reseña)
+    hotel_name: str
+    page: int
+    offset: int
+    expected_count: Optional[int]
+
+WorkItem = Union[str, ReviewPageJob]
+
+# Las páginas de hoteles ya empezados van antes que cualquier hotel nuevo
+PAGE_JOB_PRIORITY = float("-inf")
+
+class HotelQueue:
+    """
+    Cola compartida de trabajo de la que cada worker toma el siguiente elemento al quedar libre.
+
+    Sustituye el reparto estático en chunks: ningún worker se queda ocioso mientras
+    quede trabajo pendiente. Opcionalmente ordena por número de reseñas esperado
+    (longest-job-first) para que los hoteles grandes empiecen primero y el tiempo total
+    quede acotado por el hotel más lento y no por el chunk más lento.
+
+    Los elementos son URLs de hoteles o páginas de reseñas (`ReviewPageJob`) que un worker
+    encola al abrir un hotel grande. Por eso `get()` no devuelve None mientras haya elementos
+    en proceso: cada `get()` debe cerrarse con `task_done()`.
+
+    Con `closed=False` la cola queda abierta para un productor externo (la búsqueda encola
+    hoteles mientras los workers ya trabajan): `get()` espera hasta que el productor llame a `close()`.
+    """
+    def __init__(self, urls: Iterable[str] = (), expected_counts: Optional[Dict[str, int]] = None, closed: bool = True):
+        self._heap: List[Tuple[float, int, WorkItem]] = []
+        self._counter = itertools.count()  # Desempate estable (FIFO) entre prioridades iguales
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._closed = closed
+        expected_counts = expected_counts or {}
+        for url in urls:
+            self.put(url, expected_counts.get(url, 0))
+
+    def _push(self, priority: float, item: WorkItem) -> None:
+        with self._cond:
+            heapq.heappush(self._heap, (priority, next(self._counter), item))
+            self._cond.notify()
+
+    def put(self, url: str, expected_reviews: int = 0) -> None:
+        """Encola un hotel. Mayor `expected_reviews` = se procesa antes."""
+        self._push(-expected_reviews, url)
+
+    def put_page(self, job: ReviewPageJob) -> None:
+        """Encola una página de reseñas; se atiende antes que los hoteles pendientes."""
+        self._push(PAGE_JOB_PRIORITY, job)
+
+    def get(self) -> Optional[WorkItem]:
+        """
+        Devuelve el siguiente elemento. Si la cola está vacía pero hay elementos en proceso
+        (que podrían encolar páginas) o sigue abierta, espera. Devuelve None cuando no queda trabajo.
+        """
+        with self._cond:
+            while not self._heap:
+                if self._in_flight == 0 and self._closed:
+                    return None
+                self._cond.wait()
+            self._in_flight += 1
+            return heapq.heappop(self._heap)[2]
+
+    def task_done(self) -> None:
+        """Marca como terminado un elemento obtenido con `get()`."""
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def close(self) -> None:
+        """El productor externo terminó: ya no llegarán más hoteles."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._heap)
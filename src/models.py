@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Text, Date, DateTime
+from sqlalchemy import Column, Integer, String, Float, Text, Date, DateTime, Boolean, UniqueConstraint
 from src.core.database import Base
 from sqlalchemy.sql import func
 
@@ -27,3 +27,108 @@ class Review(Base):
     sentiment_score_neu = Column(Float, default=0.0)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class HotelCrawlState(Base):
+    """Progreso de scraping por hotel, para reanudar a mitad de la paginación."""
+    __tablename__ = "hotel_crawl_state"
+    __table_args__ = {'extend_existing': True}
+
+    id = Column(Integer, primary_key=True, index=True)
+    hotel_url = Column(String, unique=True, index=True)
+    last_page = Column(Integer, default=0) # Última página cuyas reseñas se guardaron
+    last_review_hash = Column(String, nullable=True)
+    saved_count = Column(Integer, nullable=True) # Reseñas extraídas hasta `last_page` (offset desde el que reanudar)
+    expected_count = Column(Integer, nullable=True) # Conteo de reseñas mostrado por Booking
+    completed = Column(Boolean, default=False) # True solo si la paginación terminó
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class SelectorStat(Base):
+    """Aciertos por estrategia para abrir la pestaña de reseñas (ordena las estrategias por tasa de éxito)."""
+    __tablename__ = "selector_stats"
+    __table_args__ = {'extend_existing': True}
+
+    strategy = Column(String, primary_key=True) # "<by>:<selector>"
+    attempts = Column(Integer, default=0)
+    hits = Column(Integer, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class PageSnapshot(Base):
+    """Índice del almacén de HTML crudo: qué snapshot corresponde a cada página de cada hotel."""
+    __tablename__ = "page_snapshots"
+    __table_args__ = (
+        UniqueConstraint("hotel_url", "kind", "page", name="uq_page_snapshot"),
+        {'extend_existing': True},
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    hotel_url = Column(String, index=True)
+    hotel_name = Column(String, nullable=True)
+    reviews_hotel_url = Column(String, nullable=True) # `hotel_url` de las reseñas de la página (URL tras redirecciones)
+    kind = Column(String) # "hotel" (página del hotel, page=0) o "reviews"
+    page = Column(Integer)
+    content_hash = Column(String) # SHA-256 del HTML, nombre del archivo en el almacén
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class HotelLink(Base):
+    """Hotel descubierto en la búsqueda, con los datos de su tarjeta (caché de la Fase 1)."""
+    __tablename__ = "hotel_links"
+    __table_args__ = {'extend_existing': True}
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String, unique=True, index=True)
+    search_url = Column(String, index=True) # Última búsqueda en la que apareció
+    name = Column(String, nullable=True)
+    review_count = Column(Integer, nullable=True) # Reseñas mostradas en la tarjeta
+    score = Column(Float, nullable=True)
+    discovered_at = Column(DateTime) # Primera vez que se vio (UTC)
+    last_seen_at = Column(DateTime, index=True) # Última búsqueda que lo encontró (UTC)
+
+
+class LinkSearch(Base):
+    """Última búsqueda completa por URL de búsqueda: determina si la caché de enlaces sigue vigente."""
+    __tablename__ = "link_searches"
+    __table_args__ = {'extend_existing': True}
+
+    search_url = Column(String, primary_key=True)
+    started_at = Column(DateTime) # UTC
+    completed_at = Column(DateTime, nullable=True) # None si la búsqueda no terminó
+    hotel_count = Column(Integer, default=0)
+
+
+class FailedHotel(Base):
+    """Hoteles cuyo scraping falló: cola de reintentos persistente con backoff y estado dead-letter."""
+    __tablename__ = "failed_hotels"
+    __table_args__ = {'extend_existing': True}
+
+    id = Column(Integer, primary_key=True, index=True)
+    hotel_url = Column(String, unique=True, index=True)
+    attempts = Column(Integer, default=0)
+    last_error = Column(Text, nullable=True)
+    next_attempt_at = Column(DateTime, index=True) # UTC; no se reintenta antes
+    dead = Column(Boolean, default=False) # True tras RETRY_MAX_ATTEMPTS fallos: ya no se reintenta
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class HotelJob(Base):
+    """Cola de hoteles compartida entre procesos: cada proceso reclama hoteles con un lease que renueva (heartbeat)."""
+    __tablename__ = "hotel_jobs"
+    __table_args__ = {'extend_existing': True}
+
+    id = Column(Integer, primary_key=True, index=True)
+    hotel_url = Column(String, unique=True, index=True)
+    priority = Column(Integer, default=0) # Reseñas esperadas: mayor = antes
+    status = Column(String, default="pending", index=True) # pending | leased | done | failed
+    owner = Column(String, nullable=True) # "<host>:<pid>" del proceso que tiene el lease
+    lease_expires_at = Column(DateTime, nullable=True) # UTC; vencido = otro proceso puede reclamarlo
+    attempts = Column(Integer, default=0) # Veces reclamado
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
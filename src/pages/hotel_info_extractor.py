@@ -4,6 +4,54 @@ from selenium.webdriver.common.by import By
 from selenium.common.exceptions import NoSuchElementException
 from src.booking_selectors import HotelPage as HotelPageSelectors
 
+try:
+    import lxml.html
+except ImportError:  # Solo necesario para extraer desde HTML guardado (src.reextract)
+    lxml = None
+
+LODGING_TYPES = ["Hotel", "LodgingBusiness", "Resort", "Hostel"]
+
+def _name_from_title(title: str) -> str:
+    return title.split("Booking.com")[0].replace("Updated Prices", "").strip().rstrip("-").strip()
+
+def _name_from_json_ld(content: str) -> str:
+    if "Hotel" in content or "LodgingBusiness" in content:
+        data = json.loads(content)
+        if isinstance(data, dict): data = [data]
+        for item in data:
+            if item.get("@type") in LODGING_TYPES:
+                name = item.get("name")
+                if name: return name
+    return ""
+
+def extract_name_from_html(html: str) -> str:
+    """
+    Mismas estrategias que `HotelInfoExtractor.get_name`, sobre HTML guardado (requiere lxml).
+    """
+    document = lxml.html.fromstring(html)
+
+    for script in document.xpath(HotelPageSelectors.NAME_JSON_LD[1]):
+        try:
+            name = _name_from_json_ld(script.text or "")
+            if name: return name
+        except json.JSONDecodeError: pass
+
+    og_title = document.cssselect(HotelPageSelectors.NAME_OG_TITLE[1])
+    if og_title and og_title[0].get("content"):
+        return og_title[0].get("content").split(",")[0].strip()
+
+    id_name = document.get_element_by_id(HotelPageSelectors.NAME_ID[1], None)
+    if id_name is not None and id_name.text_content().strip():
+        return id_name.text_content().strip()
+
+    for sel in HotelPageSelectors.NAME_VISUAL_SELECTORS:
+        elements = document.cssselect(sel)
+        if elements and elements[0].text_content().strip():
+            return elements[0].text_content().strip()
+
+    title = document.findtext(".//title")
+    return _name_from_title(title) if title else "Nombre_Desconocido"
+
 class HotelInfoExtractor:
     """
     Clase auxiliar para extraer información estática del hotel (nombre, etc.)
@@ -20,14 +68,8 @@ class HotelInfoExtractor:
         try:
             scripts = driver.find_elements(*HotelPageSelectors.NAME_JSON_LD)
             for script in scripts:
-                content = script.get_attribute("innerHTML")
-                if "Hotel" in content or "LodgingBusiness" in content:
-                    data = json.loads(content)
-                    if isinstance(data, dict): data = [data]
-                    for item in data:
-                        if item.get("@type") in ["Hotel", "LodgingBusiness", "Resort", "Hostel"]:
-                            name = item.get("name")
-                            if name: return name
+                name = _name_from_json_ld(script.get_attribute("innerHTML"))
+                if name: return name
         except (NoSuchElementException, json.JSONDecodeError): pass
 
         # ESTRATEGIA 2: OpenGraph
@@ -51,6 +93,6 @@ class HotelInfoExtractor:
 
         # ESTRATEGIA 5: Title
         try:
-            return driver.title.split("Booking.com")[0].replace("Updated Prices", "").strip().rstrip("-").strip()
+            return _name_from_title(driver.title)
         except Exception:
             return "Nombre_Desconocido"
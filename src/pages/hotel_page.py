@@ -1,4 +1,5 @@
 import logging
+import time
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -6,7 +7,11 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
 
+from src import config
 from src.booking_selectors import HotelPage as HotelPageSelectors, Reviews
+from src.core.popup_dismisser import has_popup_dismisser, install_popup_dismisser
+from src.core.resource_policy import apply_resource_policy
+from src.core.strategy_stats import STRATEGY_STATS
 from src.pages.reviews_modal import ReviewsModal
 
 from src.pages.hotel_info_extractor import HotelInfoExtractor
@@ -17,6 +22,29 @@ import re
 RE_REVIEW_COUNT_PARENS = re.compile(r'\((\d+[\.,]?\d*)\)')
 RE_REVIEW_COUNT_SIMPLE = re.compile(r'(\d+[\.,]?\d*)')
 
+# Sondeo combinado (un round trip por sondeo): cierra el popup de Booking si está visible y
+# devuelve el primer disparador de reseñas visible según el orden de estrategias recibido.
+# Argumentos: selector CSS del cierre del popup, lista de [By, selector].
+PROBE_REVIEW_TRIGGERS_JS = """
+const [popupSel, strategies] = arguments;
+const visible = el => el && el.getClientRects().length > 0 && !el.disabled;
+let popupClosed = false;
+const popupBtn = popupSel ? document.querySelector(popupSel) : null;
+if (visible(popupBtn)) { popupBtn.click(); popupClosed = true; }
+const find = (by, sel) => {
+    if (by === 'css selector') return document.querySelector(sel);
+    if (by === 'id') return document.getElementById(sel);
+    if (by === 'xpath') return document.evaluate(sel, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    if (by === 'partial link text') return Array.from(document.querySelectorAll('a')).find(a => (a.innerText || '').includes(sel)) || null;
+    return null;
+};
+for (let i = 0; i < strategies.length; i++) {
+    const el = find(strategies[i][0], strategies[i][1]);
+    if (visible(el)) return {index: i, element: el, popupClosed: popupClosed};
+}
+return popupClosed ? {index: -1, element: null, popupClosed: true} : null;
+"""
+
 class HotelPage:
     """
     Page Object para la página de detalles del hotel.
@@ -26,11 +54,15 @@ class HotelPage:
         self.info_extractor = HotelInfoExtractor(driver)
 
     def navigate(self, url: str):
+        install_popup_dismisser(self.driver)
+        apply_resource_policy(self.driver, "hotel")
         self.driver.get(url)
         try:
             WebDriverWait(self.driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
         except TimeoutException:
+            # Se propaga para que el control de ritmo cuente el timeout y el hotel se reintente
             logging.error(f"Timeout cargando la página del hotel: {url}")
+            raise
 
     def get_name(self) -> str:
         """Delegado al extractor."""
@@ -80,42 +112,83 @@ class HotelPage:
         except Exception:
             pass
 
+    def _probe_review_trigger(self, strategies, popup_selector):
+        """Un sondeo: cierra el popup de Booking si aparece y devuelve (índice, elemento) o False."""
+        result = self.driver.execute_script(
+            PROBE_REVIEW_TRIGGERS_JS,
+            popup_selector,
+            [[by, selector] for by, selector in strategies]
+        )
+        if not result:
+            return False
+        if result.get("popupClosed"):
+            logging.info("      [POPUP] Popup de Booking cerrado.")
+        if result.get("index", -1) < 0:
+            return False
+        return result["index"], result["element"]
+
     def open_reviews_modal(self) -> ReviewsModal:
-        """Cierra popups y abre el modal de reseñas."""
+        """
+        Cierra popups y abre el modal de reseñas.
+
+        En lugar de esperar cada popup y cada estrategia por separado, hace una sola espera que
+        sondea a la vez el popup de Booking y todos los disparadores de reseñas, ordenados por su
+        tasa de acierto histórica (`STRATEGY_STATS`). Si el driver tiene el auto-cierre de popups
+        inyectado, no se hace ningún trabajo reactivo de popups.
+        """
         driver = self.driver
+        phase_start = time.perf_counter()
+        autodismiss = has_popup_dismisser(driver)
+        popup_selector = None if autodismiss else HotelPageSelectors.LOGIN_POPUP_CLOSE
         
-        # 1. Intentar cerrar Google One Tap primero (suele bloquear otros clicks)
-        self.close_google_one_tap()
-        
-        # 2. Cerrar popups de Booking (Genius, Login, Encuestas)
-        try:
-            # Usar execute_script para evitar ElementClickInterceptedException
-            close_btn = WebDriverWait(driver, 3).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, HotelPageSelectors.LOGIN_POPUP_CLOSE))
-            )
-            driver.execute_script("arguments[0].click();", close_btn)
-            logging.info("      [POPUP] Popup de Booking cerrado.")
-        except (TimeoutException, NoSuchElementException, ElementClickInterceptedException): 
-            pass
+        # 1. Intentar cerrar Google One Tap primero (suele bloquear otros clicks).
+        #    Sin iframe presente no hay espera.
+        if not autodismiss:
+            self.close_google_one_tap()
+        popups_seconds = time.perf_counter() - phase_start
 
-        # Abrir pestaña reseñas
+        # 2. Espera combinada: popup de Booking + todas las estrategias en cada sondeo
         logging.info("      -> Intentando abrir panel de reseñas...")
+        candidates = STRATEGY_STATS.order(HotelPageSelectors.OPEN_REVIEWS_STRATEGIES)
+        probe_seconds = 0.0
+        open_seconds = 0.0
         reviews_opened = False
-        for by, selector in HotelPageSelectors.OPEN_REVIEWS_STRATEGIES:
+        while candidates and not reviews_opened:
+            probe_start = time.perf_counter()
+            try:
+                index, elem = WebDriverWait(driver, config.REVIEWS_TRIGGER_TIMEOUT, poll_frequency=0.25).until(
+                    lambda d: self._probe_review_trigger(candidates, popup_selector)
+                )
+            except TimeoutException:
+                probe_seconds += time.perf_counter() - probe_start
+                break
+            probe_seconds += time.perf_counter() - probe_start
+
+            strategy = candidates[index]
+            open_start = time.perf_counter()
             try:
-                elem = WebDriverWait(driver, 2).until(EC.element_to_be_clickable((by, selector)))
                 driver.execute_script("arguments[0].click();", elem)
                 WebDriverWait(driver, 5).until(
                     EC.presence_of_element_located((By.CSS_SELECTOR, Reviews.ITEM))
                 )
                 reviews_opened = True
-                logging.info(f"      [OK] Panel abierto usando: {selector}")
-                break
+                logging.info(f"      [OK] Panel abierto usando: {strategy[1]}")
             except (TimeoutException, ElementClickInterceptedException):
-                continue
+                # El disparador existía pero no abrió el panel: probar con los restantes
+                candidates = candidates[:index] + candidates[index + 1:]
+            open_seconds += time.perf_counter() - open_start
+            STRATEGY_STATS.record(strategy, reviews_opened)
+
+        logging.info(
+            f"      [TIMING] popups: {popups_seconds:.1f}s, búsqueda de disparador: {probe_seconds:.1f}s, "
+            f"apertura del panel: {open_seconds:.1f}s"
+        )
         
         if not reviews_opened:
             logging.warning("No se pudo abrir la pestaña de reseñas.")
             return None
+
+        # La paginación del modal solo necesita el HTML de las reseñas
+        apply_resource_policy(driver, "reviews")
             
         return ReviewsModal(driver, self.get_name(), driver.current_url)
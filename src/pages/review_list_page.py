@@ -0,0 +1,89 @@
+import logging
+import re
+from typing import Iterator, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from selenium import webdriver
+
+from src import config
+from src.core.resource_policy import apply_resource_policy
+from src.pages.reviews_modal import ReviewsModal, ReviewData
+
+# /hotel/<código de país>/<pagename>[.<idioma>].html
+RE_HOTEL_PATH = re.compile(r'/hotel/([a-z]{2})/([^/.?#]+)')
+
+def review_list_url(
+    hotel_url: str, offset: int, rows: Optional[int] = None, newest_first: bool = False,
+    base_url: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Construye la URL de la lista de reseñas de un hotel a partir de un offset.
+
+    Returns:
+        str: URL de `base_url` (por defecto `config.REVIEW_LIST_URL`), o None si la URL del hotel no tiene el formato esperado.
+    """
+    match = RE_HOTEL_PATH.search(hotel_url)
+    if not match:
+        return None
+    country, pagename = match.groups()
+    params = {
+        "cc1": country, "pagename": pagename, "type": "total",
+        "rows": rows or config.REVIEW_LIST_ROWS, "offset": offset,
+    }
+    if newest_first:
+        params["sort"] = "f_recent_desc"
+    return f"{base_url or config.REVIEW_LIST_URL}?{urlencode(params)}"
+
+def page_offsets(expected_count: int, max_reviews: int, rows: Optional[int] = None) -> List[int]:
+    """Offsets de todas las páginas necesarias para cubrir `min(expected_count, max_reviews)` reseñas."""
+    rows = rows or config.REVIEW_LIST_ROWS
+    return list(range(0, min(expected_count, max_reviews), rows))
+
+class ReviewListPage:
+    """
+    Page Object de la lista de reseñas direccionada por offset.
+
+    Cada página se carga directamente por URL (sin modal ni clicks en "siguiente"), así que las
+    páginas de un mismo hotel pueden repartirse entre workers o pestañas.
+    """
+    def __init__(self, driver: webdriver.Chrome):
+        self.driver = driver
+
+    def fetch(self, hotel_name: str, hotel_url: str, offset: int) -> List[ReviewData]:
+        """Carga la página con el offset dado y extrae sus reseñas (vacío si no hay)."""
+        url = review_list_url(hotel_url, offset)
+        if url is None:
+            return []
+        apply_resource_policy(self.driver, "reviews")
+        self.driver.get(url)
+        # La lista usa los mismos contenedores de reseña que el modal
+        return ReviewsModal(self.driver, hotel_name, hotel_url).extract_current_page()
+
+    def iter_pages(
+        self, hotel_name: str, hotel_url: str, offset: int, start_page: int, max_reviews: int = 1000,
+    ) -> Iterator[Tuple[int, List[ReviewData]]]:
+        """
+        Reanuda un hotel desde un offset cargando cada página por URL, sin abrir el modal ni
+        recorrer las páginas ya guardadas. Entrega `(número de página, reseñas)` como
+        `ReviewsModal.iter_review_pages`; las reseñas anteriores a `offset` cuentan para `max_reviews`.
+
+        Args:
+            offset (int): Reseñas ya guardadas (checkpoint); primera reseña a extraer.
+            start_page (int): Número con el que se entrega la primera página.
+        """
+        rows = config.REVIEW_LIST_ROWS
+        total = min(offset, max_reviews)
+        page = start_page
+        logging.info(f"      [RESUME] Reanudando por offset desde la reseña {offset} (página {page}).")
+        while total < max_reviews:
+            batch = self.fetch(hotel_name, hotel_url, offset)
+            if not batch:
+                logging.info("      [END] Fin de la paginación.")
+                return
+            batch = batch[:max_reviews - total]
+            total += len(batch)
+            logging.info(f"      [PAGE] Pág {page}: {len(batch)} reseñas extraídas. Total: {total}")
+            yield page, batch
+            offset += rows
+            page += 1
+        logging.info(f"      [LIMIT] Límite de {max_reviews} reseñas alcanzado.")
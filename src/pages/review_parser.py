@@ -0,0 +1,112 @@
+from typing import Dict, List, Optional, TYPE_CHECKING
+
+from src.booking_selectors import Reviews
+from src.utils.cleaning import extract_score_from_text, normalize_whitespace
+
+try:
+    import lxml.html
+    from lxml.cssselect import CSSSelector
+except ImportError:  # Sin lxml solo está disponible la extracción con Selenium
+    lxml = None
+
+if TYPE_CHECKING:
+    from src.pages.reviews_modal import ReviewData
+
+# Elementos que `innerText` separa del texto contiguo (salto de línea); `br` también
+BLOCK_TAGS = frozenset({
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "figcaption", "figure",
+    "footer", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "p",
+    "pre", "section", "table", "td", "th", "tr", "ul",
+})
+# Elementos cuyo contenido no forma parte de `innerText`
+SKIPPED_TAGS = frozenset({"script", "style", "template", "noscript"})
+
+def build_review(raw: Dict[str, str], hotel_name: str, hotel_url: str) -> "ReviewData":
+    """
+    Normaliza los textos crudos de una reseña (título, puntaje, positivo, negativo, cuerpo y fecha)
+    al formato `ReviewData`. Compartido por las extracciones de Selenium (JS y por elemento) y el
+    parser HTML; los textos se llevan a la forma canónica de `normalize_whitespace` para que
+    todas den el mismo `review_hash`.
+    """
+    text = {field: normalize_whitespace(raw.get(field)) for field in ("title", "score", "positive", "negative", "body", "date")}
+    pos, neg = text["positive"], text["negative"]
+    if not pos and not neg:
+        pos = text["body"]
+    return {
+        "hotel_name": hotel_name, "hotel_url": hotel_url,
+        "title": text["title"], "score": extract_score_from_text(text["score"]),
+        "positive": pos, "negative": neg,
+        "date": text["date"]
+    }
+
+def is_available() -> bool:
+    """Indica si lxml (y cssselect) están instalados."""
+    return lxml is not None
+
+def _collect_text(element, parts: List[str]) -> None:
+    if not isinstance(element.tag, str) or element.tag in SKIPPED_TAGS:  # Comentarios, scripts...
+        return
+    block = element.tag in BLOCK_TAGS
+    if block:
+        parts.append(" ")
+    if element.text:
+        parts.append(element.text)
+    for child in element:
+        _collect_text(child, parts)
+        if child.tail:
+            parts.append(child.tail)
+    if block:
+        parts.append(" ")
+
+def _element_text(element) -> str:
+    """
+    Texto de un elemento como lo daría `innerText`, en forma canónica: `br` y los elementos de
+    bloque separan palabras y los espacios se colapsan (ver `normalize_whitespace`).
+    """
+    parts: List[str] = []
+    _collect_text(element, parts)
+    return normalize_whitespace("".join(parts))
+
+class ReviewHtmlParser:
+    """
+    Parser de páginas de reseñas con lxml, usando los mismos selectores CSS que Selenium.
+    Los selectores se compilan una sola vez por instancia.
+    """
+    def __init__(self):
+        if lxml is None:
+            raise ImportError("lxml y cssselect son necesarios para el parser HTML de reseñas.")
+        self._item = CSSSelector(Reviews.ITEM)
+        self._fields = {
+            "title": CSSSelector(Reviews.TITLE),
+            "score": CSSSelector(Reviews.SCORE),
+            "positive": CSSSelector(Reviews.POSITIVE),
+            "negative": CSSSelector(Reviews.NEGATIVE),
+            "body": CSSSelector(Reviews.BODY_FALLBACK),
+            "date": CSSSelector(Reviews.DATE),
+        }
+
+    def _first_text(self, element, selector: "CSSSelector") -> str:
+        matches = selector(element)
+        return _element_text(matches[0]) if matches else ""
+
+    def parse(self, html: str, hotel_name: str, hotel_url: str) -> List["ReviewData"]:
+        """Extrae las reseñas de una página HTML, sin duplicados y en orden de aparición."""
+        if not html or not html.strip():
+            return []
+        document = lxml.html.fromstring(html)
+        reviews = []
+        for element in self._item(document):
+            raw = {field: self._first_text(element, selector) for field, selector in self._fields.items()}
+            data = build_review(raw, hotel_name, hotel_url)
+            if data not in reviews:
+                reviews.append(data)
+        return reviews
+
+_parser: Optional[ReviewHtmlParser] = None
+
+def parse_reviews_html(html: str, hotel_name: str, hotel_url: str) -> List["ReviewData"]:
+    """Atajo con un parser compartido (los selectores compilados son de solo lectura)."""
+    global _parser
+    if _parser is None:
+        _parser = ReviewHtmlParser()
+    return _parser.parse(html, hotel_name, hotel_url)
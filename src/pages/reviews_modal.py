@@ -1,13 +1,15 @@
 import logging
-from typing import List, Dict
+from typing import List, Dict, Iterator, Tuple, Callable, Optional
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException, WebDriverException
 
+from src import config
 from src.booking_selectors import Reviews
-from src.utils.cleaning import extract_score_from_text
+from src.pages.review_parser import build_review
+from src.utils.hashing import compute_review_hash
 from tenacity import retry, stop_after_attempt, wait_fixed, retry_if_exception_type
 
 # Importar TypedDict desde pipeline (o moverlo a models/types si fuera mejor, pero por ahora aquí)
@@ -26,14 +28,34 @@ class ReviewData(TypedDict):
     negative: str
     date: str
 
+# Extrae todas las reseñas visibles en un único round trip de WebDriver.
+# Argumentos: selectores de contenedor, título, puntaje, positivo, negativo, cuerpo de respaldo y fecha.
+EXTRACT_REVIEWS_JS = """
+const [itemSel, titleSel, scoreSel, posSel, negSel, bodySel, dateSel] = arguments;
+const text = (root, sel) => {
+    const el = root.querySelector(sel);
+    // Misma forma canónica que `normalize_whitespace` (y que el parser lxml)
+    return el ? (el.innerText || el.textContent || '').replace(/\s+/g, ' ').trim() : '';
+};
+return Array.from(document.querySelectorAll(itemSel)).map(el => ({
+    title: text(el, titleSel),
+    score: text(el, scoreSel),
+    positive: text(el, posSel),
+    negative: text(el, negSel),
+    body: text(el, bodySel),
+    date: text(el, dateSel)
+}));
+"""
+
 class ReviewsModal:
     """
     Page Object para el modal/pestaña de reseñas.
     """
-    def __init__(self, driver: webdriver.Chrome, hotel_name: str, hotel_url: str):
+    def __init__(self, driver: webdriver.Chrome, hotel_name: str, hotel_url: str, js_extraction: Optional[bool] = None):
         self.driver = driver
         self.hotel_name = hotel_name
         self.hotel_url = hotel_url
+        self.js_extraction = config.JS_EXTRACTION if js_extraction is None else js_extraction
 
     def _get_safe_text(self, element, selector: str) -> str:
         try:
@@ -41,30 +63,31 @@ class ReviewsModal:
         except NoSuchElementException:
             return ""
 
+    def _still_loading(self) -> bool:
+        """
+        True si el documento no terminó de cargar. Distingue una espera agotada por carga lenta
+        (timeout que debe llegar al control de ritmo) de una página que simplemente no tiene el elemento.
+        """
+        try:
+            return self.driver.execute_script("return document.readyState") != "complete"
+        except WebDriverException:
+            return False
+
     def _extract_review_data(self, review_element) -> ReviewData:
         """
         Extrae datos de un elemento de reseña individual.
         """
         try:
-            title = self._get_safe_text(review_element, Reviews.TITLE)
-            raw_score = self._get_safe_text(review_element, Reviews.SCORE)
-            score = extract_score_from_text(raw_score)
-            
-            pos = self._get_safe_text(review_element, Reviews.POSITIVE)
-            neg = self._get_safe_text(review_element, Reviews.NEGATIVE)
-            
-            if not pos and not neg:
-                body = self._get_safe_text(review_element, Reviews.BODY_FALLBACK)
-                if body: pos = body
-
-            date = self._get_safe_text(review_element, Reviews.DATE)
-
-            return {
-                "hotel_name": self.hotel_name, "hotel_url": self.hotel_url, 
-                "title": title, "score": score,
-                "positive": pos, "negative": neg, 
-                "date": date
+            raw = {
+                "title": self._get_safe_text(review_element, Reviews.TITLE),
+                "score": self._get_safe_text(review_element, Reviews.SCORE),
+                "positive": self._get_safe_text(review_element, Reviews.POSITIVE),
+                "negative": self._get_safe_text(review_element, Reviews.NEGATIVE),
+                "date": self._get_safe_text(review_element, Reviews.DATE),
             }
+            if not raw["positive"] and not raw["negative"]:
+                raw["body"] = self._get_safe_text(review_element, Reviews.BODY_FALLBACK)
+            return build_review(raw, self.hotel_name, self.hotel_url)
         except StaleElementReferenceException:
             logging.warning("Stale element encountered while extracting review data.")
             return {} # type: ignore
@@ -72,18 +95,53 @@ class ReviewsModal:
             logging.warning(f"Error extracting review data: {e}")
             return {} # type: ignore
 
+    def _extract_page_js(self) -> Optional[List[ReviewData]]:
+        """
+        Extrae todas las reseñas de la página con un solo `execute_script`.
+        Devuelve None si el script falla, para recurrir a la extracción por elemento.
+        """
+        try:
+            raw_reviews = self.driver.execute_script(
+                EXTRACT_REVIEWS_JS,
+                Reviews.ITEM, Reviews.TITLE, Reviews.SCORE, Reviews.POSITIVE,
+                Reviews.NEGATIVE, Reviews.BODY_FALLBACK, Reviews.DATE
+            )
+        except WebDriverException as e:
+            logging.warning(f"Extracción JS falló, usando extracción por elemento: {e}")
+            return None
+        if not isinstance(raw_reviews, list):
+            return None
+
+        reviews = [build_review(raw, self.hotel_name, self.hotel_url) for raw in raw_reviews]
+        return reviews
+
     def extract_current_page(self) -> List[ReviewData]:
-        """Extrae las reseñas visibles en la página actual del modal."""
+        """
+        Extrae las reseñas visibles en la página actual del modal.
+        Si la página sigue cargando al agotarse la espera, el `TimeoutException` se propaga.
+        """
         try:
             # Esperar presencia inicial
             WebDriverWait(self.driver, 10).until(
                 EC.presence_of_all_elements_located((By.CSS_SELECTOR, Reviews.ITEM))
             )
         except TimeoutException:
+            if self._still_loading():
+                logging.warning("Timeout de carga buscando reseñas en esta página.")
+                raise
             logging.info("Tiempo de espera agotado buscando reseñas en esta página (posible fin).")
             return []
 
-        # Obtener elementos y procesar iterando directamente
+        if self.js_extraction:
+            js_reviews = self._extract_page_js()
+            if js_reviews is not None:
+                page_reviews = []
+                for data in js_reviews:
+                    if data not in page_reviews:
+                        page_reviews.append(data)
+                return page_reviews
+
+        # Fallback: obtener elementos y procesar iterando directamente
         review_elements = self.driver.find_elements(By.CSS_SELECTOR, Reviews.ITEM)
         page_reviews = []
         
@@ -95,48 +153,118 @@ class ReviewsModal:
         return page_reviews
 
     def next_page(self) -> bool:
-        """Intenta ir a la siguiente página de reseñas."""
-        try:
-            # Obtener referencia al primer elemento actual para esperar que desaparezca (staleness)
-            current_reviews = self.driver.find_elements(By.CSS_SELECTOR, Reviews.ITEM)
-            first_review = current_reviews[0] if current_reviews else None
+        """
+        Intenta ir a la siguiente página de reseñas.
+
+        Devuelve False solo cuando no hay botón "Siguiente" (no hay más páginas). Si la página
+        sigue cargando sin botón, o la siguiente no carga tras el clic, el `TimeoutException` se
+        propaga: el hotel no debe marcarse como completo, sino reanudarse después desde su checkpoint.
+        """
+        # Obtener referencia al primer elemento actual para esperar que desaparezca (staleness)
+        current_reviews = self.driver.find_elements(By.CSS_SELECTOR, Reviews.ITEM)
+        first_review = current_reviews[0] if current_reviews else None
 
+        try:
             next_btn = WebDriverWait(self.driver, 5).until(
                 EC.element_to_be_clickable((By.CSS_SELECTOR, Reviews.NEXT_PAGE))
             )
+        except (TimeoutException, NoSuchElementException) as e:
+            if isinstance(e, TimeoutException) and self._still_loading():
+                logging.warning("Timeout de carga esperando el botón de página siguiente.")
+                raise
+            logging.info("      [END] Fin de la paginación.")
+            return False
+
+        try:
             self.driver.execute_script("arguments[0].click();", next_btn)
-            
             if first_review:
                 WebDriverWait(self.driver, 10).until(EC.staleness_of(first_review))
-            
             # Esperar a que carguen los nuevos
             WebDriverWait(self.driver, 10).until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, Reviews.ITEM))
             )
             return True
-        except (TimeoutException, NoSuchElementException):
-            logging.info("      [END] Fin de la paginación.")
-            return False
         except Exception as e:
             logging.error(f"Error al intentar cambiar de página: {e}")
+            raise
+
+    def sort_newest_first(self) -> bool:
+        """Ordena las reseñas por más recientes. Devuelve False si no se pudo."""
+        try:
+            current_reviews = self.driver.find_elements(By.CSS_SELECTOR, Reviews.ITEM)
+            first_review = current_reviews[0] if current_reviews else None
+
+            trigger = WebDriverWait(self.driver, 5).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, Reviews.SORT_TRIGGER))
+            )
+            self.driver.execute_script("arguments[0].click();", trigger)
+            option = WebDriverWait(self.driver, 5).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, Reviews.SORT_NEWEST_FIRST))
+            )
+            self.driver.execute_script(
+                "arguments[0].selected = true; arguments[0].click();"
+                "if (arguments[0].parentElement) arguments[0].parentElement.dispatchEvent(new Event('change', {bubbles: true}));",
+                option
+            )
+
+            if first_review:
+                WebDriverWait(self.driver, 10).until(EC.staleness_of(first_review))
+            WebDriverWait(self.driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, Reviews.ITEM))
+            )
+            logging.info("      [SORT] Reseñas ordenadas por más recientes.")
+            return True
+        except (TimeoutException, NoSuchElementException):
+            logging.warning("      [SORT] No se pudo ordenar por más recientes.")
             return False
 
-    def extract_all_reviews(self, max_reviews: int = 1000) -> List[ReviewData]:
+    def iter_review_pages(
+        self,
+        max_reviews: int = 1000,
+        start_page: int = 1,
+        is_known: Optional[Callable[[str], bool]] = None,
+        saved_count: int = 0,
+    ) -> Iterator[Tuple[int, List[ReviewData]]]:
         """
-        Extrae todas las reseñas disponibles paginando hasta alcanzar max_reviews.
+        Recorre la paginación y entrega `(número de página, reseñas)` a medida que se extraen.
+
+        Permite que el consumidor persista cada página de inmediato: la memoria por worker
+        queda limitada a una página y el progreso parcial sobrevive a un fallo a mitad de hotel.
+        Si el generador se agota sin excepción, la paginación terminó (sin más páginas o límite
+        alcanzado). Al reanudar, las `saved_count` reseñas ya guardadas cuentan para `max_reviews`.
+        Reanudar aquí obliga a pasar por las páginas anteriores; si la URL del hotel admite la
+        lista por offset es mejor `ReviewListPage.iter_pages`.
+
+        Args:
+            max_reviews (int): Límite de reseñas a extraer en esta pasada.
+            start_page (int): Página desde la que reanudar; las anteriores se saltan sin extraerse.
+            saved_count (int): Reseñas ya guardadas de las páginas anteriores a `start_page` (checkpoint).
+            is_known (Callable[[str], bool], optional): Modo incremental. Recibe el `review_hash`
+                de cada reseña; la paginación se detiene en la primera página cuyas reseñas ya
+                son todas conocidas. Requiere que el modal esté ordenado por más recientes.
         """
-        all_reviews = []
         page = 1
-        
+        while page < start_page and self.next_page():
+            page += 1
+        if page > 1:
+            logging.info(f"      [RESUME] Reanudando desde la página {page}.")
+
+        total = min(saved_count, max_reviews)
         while True:
             logging.info(f"      [PAGE] Procesando página {page}...")
             batch = self.extract_current_page()
             
-            if batch:
-                all_reviews.extend(batch)
-                logging.info(f"      [PAGE] Pág {page}: {len(batch)} reseñas extraídas. Total: {len(all_reviews)}")
+            if batch and is_known and all(is_known(compute_review_hash(r)) for r in batch):
+                logging.info(f"      [INCREMENTAL] Pág {page} sin reseñas nuevas. Fin de la paginación.")
+                break
+
+            if batch and total < max_reviews:
+                batch = batch[:max_reviews - total]
+                total += len(batch)
+                logging.info(f"      [PAGE] Pág {page}: {len(batch)} reseñas extraídas. Total: {total}")
+                yield page, batch
             
-            if len(all_reviews) >= max_reviews:
+            if total >= max_reviews:
                 logging.info(f"      [LIMIT] Límite de {max_reviews} reseñas alcanzado.")
                 break
             
@@ -144,5 +272,12 @@ class ReviewsModal:
                 break
                 
             page += 1
-            
-        return all_reviews[:max_reviews]
+
+    def extract_all_reviews(self, max_reviews: int = 1000) -> List[ReviewData]:
+        """
+        Extrae todas las reseñas disponibles paginando hasta alcanzar max_reviews.
+        """
+        all_reviews = []
+        for _, batch in self.iter_review_pages(max_reviews):
+            all_reviews.extend(batch)
+        return all_reviews
@@ -1,6 +1,7 @@
 import logging
 import csv
-from typing import List
+import re
+from typing import Iterator, List, Optional, Tuple
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -9,6 +10,45 @@ from selenium.common.exceptions import TimeoutException
 
 from src import config
 from src.booking_selectors import SearchResults
+from src.core.hotel_links import HotelCard, canonical_hotel_url
+from src.core.popup_dismisser import install_popup_dismisser
+from src.core.resource_policy import apply_resource_policy
+
+# Enlace, nombre y texto de puntuación de cada tarjeta en una sola llamada.
+# Argumentos: selectores de tarjeta, enlace, título y bloque de puntuación.
+COLLECT_CARDS_JS = """
+const [cardSel, linkSel, titleSel, scoreSel] = arguments;
+const text = (root, sel) => {
+    const el = root.querySelector(sel);
+    return el ? (el.innerText || el.textContent || '').trim() : '';
+};
+const cards = [];
+const seen = new Set();
+document.querySelectorAll(cardSel).forEach(card => {
+    const link = card.querySelector(linkSel);
+    if (!link || !link.href || seen.has(link.href)) return;
+    seen.add(link.href);
+    cards.push({url: link.href, name: text(card, titleSel), review_text: text(card, scoreSel)});
+});
+// Enlaces fuera de tarjetas (maquetas antiguas): sin metadatos
+document.querySelectorAll(linkSel).forEach(a => {
+    if (!a.href || seen.has(a.href)) return;
+    seen.add(a.href);
+    cards.push({url: a.href, name: '', review_text: ''});
+});
+return cards;
+"""
+
+RE_CARD_REVIEW_COUNT = re.compile(r'(\d[\d.,]*)\s*(?:comentarios|reseñas|opiniones|reviews)', re.IGNORECASE)
+RE_CARD_SCORE = re.compile(r'\b(\d{1,2}[.,]\d)\b')
+
+def parse_card_review_text(text: str) -> Tuple[Optional[int], Optional[float]]:
+    """Número de comentarios y puntuación a partir del texto del bloque de puntuación de una tarjeta."""
+    count_match = RE_CARD_REVIEW_COUNT.search(text)
+    review_count = int(re.sub(r'[.,]', '', count_match.group(1))) if count_match else None
+    score_match = RE_CARD_SCORE.search(text)
+    score = float(score_match.group(1).replace(',', '.')) if score_match else None
+    return review_count, score
 
 class SearchPage:
     """
@@ -20,6 +60,8 @@ class SearchPage:
     def load_results(self, url: str) -> bool:
         """Navega a la URL y espera a que carguen los resultados."""
         logging.info(f"Navegando a: {url}")
+        install_popup_dismisser(self.driver)
+        apply_resource_policy(self.driver, "search")
         self.driver.get(url)
         try:
             WebDriverWait(self.driver, config.MAX_WAIT_TIME).until(
@@ -30,9 +72,40 @@ class SearchPage:
             logging.error("Los resultados iniciales no cargaron. Abortando.")
             return False
 
-    def scroll_and_load_all(self):
-        """Maneja el scroll infinito y el botón 'Cargar más'."""
+    def _current_cards(self) -> List[HotelCard]:
+        """Tarjetas cargadas, en orden y sin duplicados por URL canónica (un solo round trip)."""
+        raw_cards = self.driver.execute_script(
+            COLLECT_CARDS_JS, SearchResults.PROPERTY_CARD[1], SearchResults.HOTEL_LINKS,
+            SearchResults.CARD_TITLE, SearchResults.CARD_REVIEW_SCORE
+        ) or []
+        cards = []
+        seen = set()
+        for raw in raw_cards:
+            review_count, score = parse_card_review_text(raw.get("review_text", ""))
+            url = canonical_hotel_url(raw["url"])
+            if url in seen:
+                continue
+            seen.add(url)
+            cards.append(HotelCard(url=url, name=raw.get("name", ""), review_count=review_count, score=score))
+        return cards
+
+    def iter_new_cards(self) -> Iterator[List[HotelCard]]:
+        """
+        Maneja el scroll infinito y el botón 'Cargar más', devolviendo tras cada carga solo las
+        tarjetas nuevas. Permite encolar hoteles mientras la búsqueda sigue cargando resultados.
+        """
         logging.info("Cargando lista completa (Scroll + Botón 'Cargar más')...")
+        seen = set()
+
+        def new_cards() -> List[HotelCard]:
+            fresh = [card for card in self._current_cards() if card["url"] not in seen]
+            seen.update(card["url"] for card in fresh)
+            return fresh
+
+        initial = new_cards()
+        if initial:
+            yield initial
+
         scroll_attempts = 0
         max_attempts = 3
         
@@ -54,18 +127,30 @@ class SearchPage:
                 scroll_attempts = 0
             except TimeoutException:
                 new_height = self.driver.execute_script("return document.body.scrollHeight")
-                new_cards = len(self.driver.find_elements(*SearchResults.PROPERTY_CARD))
+                card_count = len(self.driver.find_elements(*SearchResults.PROPERTY_CARD))
                 
-                if new_height == last_height and new_cards == current_cards:
+                if new_height == last_height and card_count == current_cards:
                     scroll_attempts += 1
                     logging.info(f"   [WAIT] No se detectaron cambios. Intento {scroll_attempts}/{max_attempts}")
                 else:
                     scroll_attempts = 0
 
+            # El scroll infinito también puede cargar tarjetas sin pulsar el botón
+            fresh = new_cards()
+            if fresh:
+                logging.info(f"   -> {len(fresh)} hoteles nuevos ({len(seen)} en total).")
+                yield fresh
+
+        logging.info(f"TOTAL HOTELES ENCONTRADOS: {len(seen)}")
+
+    def scroll_and_load_all(self):
+        """Maneja el scroll infinito y el botón 'Cargar más' hasta agotar los resultados."""
+        for _ in self.iter_new_cards():
+            pass
+
     def get_hotel_links(self) -> List[str]:
         """Extrae los enlaces de los hoteles encontrados."""
         logging.info("Extrayendo enlaces finales...")
-        elements = self.driver.find_elements(By.CSS_SELECTOR, SearchResults.HOTEL_LINKS)
-        links = list(dict.fromkeys([e.get_attribute("href") for e in elements if e.get_attribute("href")]))
+        links = [card["url"] for card in self._current_cards()]
         logging.info(f"TOTAL HOTELES ENCONTRADOS: {len(links)}")
         return links
@@ -0,0 +1,119 @@
+"""
+Re-extracción offline de reseñas desde el almacén de snapshots (`config.SNAPSHOT_STORE`).
+
+Vuelve a ejecutar la extracción (mismos selectores de `booking_selectors`, parseados con lxml)
+sobre el HTML guardado, repartiendo las páginas entre procesos, y hace upsert en la DB.
+Útil tras corregir un selector: no hace falta volver a navegar por Booking.
+
+Uso:
+    python -m src.reextract [--hotel URL ...] [--workers N] [--replace]
+"""
+import argparse
+import logging
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from src import config
+from src.core.database import Base, SessionLocal, engine
+from src.core.pipeline import upsert_reviews_batch
+from src.core.snapshot_store import SnapshotStore, load_snapshots
+from src.models import Review
+from src.pages.hotel_info_extractor import extract_name_from_html
+from src.pages.review_parser import parse_reviews_html
+from src.utils.logging_config import setup_logging
+
+# Tarea por snapshot: (directorio del almacén, hash de contenido, nombre del hotel, URL del hotel).
+# En las páginas de reseñas la URL es la que llevan sus reseñas (`reviews_hotel_url`), no la encolada.
+SnapshotTask = Tuple[str, str, Optional[str], str]
+
+def _extract_hotel_name(task: SnapshotTask) -> Tuple[str, str]:
+    root, digest, _, hotel_url = task
+    return hotel_url, extract_name_from_html(SnapshotStore(root).get(digest))
+
+def _extract_reviews(task: SnapshotTask) -> Tuple[str, list]:
+    root, digest, hotel_name, hotel_url = task
+    return hotel_url, parse_reviews_html(SnapshotStore(root).get(digest), hotel_name or "", hotel_url)
+
+def reextract(hotel_urls: Optional[List[str]] = None, workers: Optional[int] = None,
+              replace: bool = False, root: Optional[str] = None) -> Dict[str, int]:
+    """
+    Re-extrae las reseñas guardadas y las escribe en la DB.
+
+    Args:
+        hotel_urls (List[str], optional): Limitar a estos hoteles.
+        workers (int, optional): Procesos de extracción (por defecto, uno por núcleo).
+        replace (bool): Borrar antes las reseñas de cada hotel re-extraído (por el `hotel_url` de
+            sus reseñas, que puede diferir de la URL encolada). Úsese solo si sus
+            snapshots cubren todas sus páginas; si no, se perderían las reseñas sin snapshot.
+        root (str, optional): Directorio del almacén (por defecto `config.SNAPSHOT_DIR`).
+
+    Returns:
+        Dict[str, int]: Reseñas escritas por hotel.
+    """
+    root = root or config.SNAPSHOT_DIR
+    db = SessionLocal()
+    try:
+        hotel_snapshots = load_snapshots(db, "hotel", hotel_urls)
+        review_snapshots = load_snapshots(db, "reviews", hotel_urls)
+    finally:
+        db.close()
+    if not review_snapshots:
+        logging.warning("[REEXTRACT] No hay snapshots de reseñas que procesar.")
+        return {}
+
+    start = time.perf_counter()
+    written: Dict[str, int] = {}
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        # 1. Nombres de hotel desde la página del hotel (si se guardó)
+        names = {s.hotel_url: s.hotel_name for s in review_snapshots}
+        names.update(executor.map(
+            _extract_hotel_name,
+            [(root, s.content_hash, s.hotel_name, s.hotel_url) for s in hotel_snapshots],
+        ))
+
+        # 2. Reseñas de cada página, agrupadas por el `hotel_url` con el que se guardaron en vivo
+        tasks = [
+            (root, s.content_hash, names.get(s.hotel_url), s.reviews_hotel_url or s.hotel_url)
+            for s in review_snapshots
+        ]
+        reviews_by_hotel = defaultdict(list)
+        for hotel_url, reviews in executor.map(_extract_reviews, tasks, chunksize=16):
+            reviews_by_hotel[hotel_url].extend(reviews)
+
+    # 3. Upsert, una transacción por hotel
+    db = SessionLocal()
+    try:
+        for hotel_url, reviews in reviews_by_hotel.items():
+            try:
+                if replace:
+                    db.query(Review).filter(Review.hotel_url == hotel_url).delete(synchronize_session=False)
+                written[hotel_url] = upsert_reviews_batch(db, reviews)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logging.error(f"[REEXTRACT] Error guardando {hotel_url}: {e}")
+    finally:
+        db.close()
+
+    logging.info(
+        f"[REEXTRACT] {len(review_snapshots)} páginas de {len(reviews_by_hotel)} hoteles, "
+        f"{sum(written.values())} reseñas escritas en {time.perf_counter() - start:.1f}s."
+    )
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-extrae reseñas desde los snapshots de HTML guardados.")
+    parser.add_argument("--hotel", action="append", dest="hotels", help="URL de hotel a re-extraer (repetible).")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos de extracción (por defecto, uno por núcleo).")
+    parser.add_argument("--replace", action="store_true", help="Borrar antes las reseñas de cada hotel re-extraído.")
+    args = parser.parse_args()
+
+    setup_logging()
+    Base.metadata.create_all(bind=engine)
+    reextract(args.hotels, args.workers, args.replace)
+
+if __name__ == "__main__":
+    main()
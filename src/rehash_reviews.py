@@ -0,0 +1,71 @@
+"""
+Migración: recalcula `review_hash` de las reseñas guardadas con la forma canónica del texto.
+
+Desde que los textos se normalizan con `normalize_whitespace` (mismo hash para Selenium y lxml),
+una reseña guardada antes con saltos de línea o espacios dobles tendría otro hash y se volvería a
+insertar. Esta migración normaliza título, positivo, negativo y fecha de cada fila, recalcula su
+hash y borra las filas que coinciden con otra (se conserva la más antigua). Es idempotente.
+
+Uso:
+    python -m src.rehash_reviews
+"""
+import logging
+from typing import Dict, List, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from src.core.database import Base, SessionLocal, engine
+from src.models import Review
+from src.utils.cleaning import normalize_whitespace
+from src.utils.hashing import compute_review_hash
+from src.utils.logging_config import setup_logging
+
+HASHED_FIELDS = ("title", "positive", "negative", "date")
+
+def rehash_reviews(db: Session, batch_size: int = 1000) -> Tuple[int, int]:
+    """
+    Normaliza y recalcula el hash de todas las reseñas, borrando las duplicadas.
+
+    Args:
+        db (Session): Sesión de base de datos.
+        batch_size (int): Filas leídas por lote.
+
+    Returns:
+        Tuple[int, int]: (filas actualizadas, filas duplicadas borradas).
+    """
+    kept: Dict[str, int] = {}  # hash nuevo -> id de la fila que se conserva
+    duplicates: List[int] = []
+    changes: List[dict] = []
+    columns = [Review.id, Review.hotel_url, Review.review_hash] + [getattr(Review, f) for f in HASHED_FIELDS]
+    for row in db.query(*columns).order_by(Review.id).yield_per(batch_size):
+        item = {"hotel_url": row.hotel_url}
+        item.update({field: normalize_whitespace(getattr(row, field)) for field in HASHED_FIELDS})
+        new_hash = compute_review_hash(item)
+        if new_hash in kept:
+            duplicates.append(row.id)
+            continue
+        kept[new_hash] = row.id
+        if new_hash != row.review_hash or any(item[f] != (getattr(row, f) or "") for f in HASHED_FIELDS):
+            changes.append({"id": row.id, "review_hash": new_hash, **{f: item[f] for f in HASHED_FIELDS}})
+
+    # Primero los borrados: liberan los hashes que van a tomar las filas conservadas
+    for start in range(0, len(duplicates), batch_size):
+        db.query(Review).filter(Review.id.in_(duplicates[start:start + batch_size])).delete(synchronize_session=False)
+    if changes:
+        db.execute(update(Review), changes)
+    db.commit()
+    return len(changes), len(duplicates)
+
+def main():
+    setup_logging()
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        updated, removed = rehash_reviews(db)
+    finally:
+        db.close()
+    logging.info(f"[REHASH] {updated} reseñas normalizadas, {removed} duplicadas borradas.")
+
+if __name__ == "__main__":
+    main()
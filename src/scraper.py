@@ -1,15 +1,21 @@
-import csv
+import argparse
 import logging
-import os
-from typing import List
-
-import pandas as pd
-from selenium import webdriver
+from typing import Dict, Iterable, Iterator, List, Optional, Set
 
 from src import config
-from src.core.database import engine, Base
+from src.core.database import engine, Base, SessionLocal
+from src.core.crawl_state import (
+    load_completion_map, load_known_review_counts, load_processed_urls, review_count_unchanged
+)
 from src.core.driver import initialize_driver
+from src.core.hotel_links import (
+    HotelCard, complete_search, export_links_csv, load_cached_cards, save_hotel_cards, start_search
+)
 from src.core.pipeline import run_pipeline
+from src.core.retry_queue import load_retry_state
+from src.core.search_frontier import SearchFrontier, build_search_urls
+from src.core.popup_dismisser import collect_popup_dismissals
+from src.core.resource_policy import collect_blocked_requests
 from src.pages.search_page import SearchPage
 from src.utils.logging_config import setup_logging
 
@@ -20,52 +26,168 @@ from src.utils.logging_config import setup_logging
 # Usamos 'lang=es' para asegurar que la interfaz cargue en español
 # Variables importadas de config.py
 
-def get_all_hotel_links(driver: webdriver.Chrome, url: str) -> List[str]:
-    """
-    Fase 1: Obtener enlaces de todos los hoteles en la búsqueda usando POM.
+def search_hotel_cards(url: str) -> Iterator[List[HotelCard]]:
     """
-    search_page = SearchPage(driver)
-    
-    if not search_page.load_results(url):
-        return []
+    Fase 1: recorre la búsqueda y devuelve las tarjetas nuevas tras cada carga de resultados.
 
-    search_page.scroll_and_load_all()
-    return search_page.get_hotel_links()
+    Cada lote se guarda en `hotel_links` en cuanto llega; la búsqueda solo cuenta como caché
+    válida (y se vuelca a `config.LINKS_FILE`) si llega hasta el final. El driver de búsqueda
+    se cierra al agotarse (o cerrarse) el generador.
+    """
+    driver = initialize_driver()
+    db = SessionLocal()
+    found = 0
+    try:
+        start_search(db, url)
+        search_page = SearchPage(driver)
+        if not search_page.load_results(url):
+            return
+        for cards in search_page.iter_new_cards():
+            save_hotel_cards(db, url, cards)
+            found += len(cards)
+            yield cards
+        complete_search(db, url, found)
+        export_links_csv(db, config.LINKS_FILE)
+    finally:
+        db.close()
+        collect_blocked_requests(driver)
+        collect_popup_dismissals(driver)
+        driver.quit()
 
+def discover_hotel_cards(url: str, refresh: bool = False) -> Iterator[List[HotelCard]]:
+    """
+    Tarjetas de hoteles de la búsqueda: desde la caché si la última búsqueda completa tiene menos
+    de `config.LINKS_CACHE_TTL_HOURS` (y no se pidió `refresh`), si no, navegando.
+    """
+    if not refresh:
+        db = SessionLocal()
+        try:
+            cached = load_cached_cards(db, url, config.LINKS_CACHE_TTL_HOURS)
+        finally:
+            db.close()
+        if cached:
+            logging.info(f"[CACHE] {len(cached)} hoteles desde la caché de enlaces (TTL {config.LINKS_CACHE_TTL_HOURS}h). Búsqueda omitida.")
+            yield cached
+            return
+    yield from search_hotel_cards(url)
+
+def pending_card_batches(
+    card_batches: Iterable[List[HotelCard]], processed_urls: Set[str],
+    known_counts: Optional[Dict[str, int]] = None, limit: Optional[int] = None,
+) -> Iterator[List[HotelCard]]:
+    """
+    Filtra los hoteles ya procesados y respeta `limit` (por defecto `config.HOTEL_VISIT_LIMIT`),
+    deteniendo la búsqueda al alcanzarlo.
 
+    Con `known_counts` (modo incremental) omite también los hoteles cuya tarjeta muestra el mismo
+    número de reseñas que en su última visita completa: no hay nada nuevo que extraer.
+    """
+    limit = config.HOTEL_VISIT_LIMIT if limit is None else limit
+    known_counts = known_counts or {}
+    sent = 0
+    unchanged = 0
+    for cards in card_batches:
+        pending = []
+        for c in cards:
+            if c["url"] in processed_urls:
+                continue
+            if review_count_unchanged(c["review_count"], known_counts.get(c["url"])):
+                unchanged += 1
+                continue
+            pending.append(c)
+        if limit > 0:
+            pending = pending[:limit - sent]
+        sent += len(pending)
+        if pending:
+            yield pending
+        if limit > 0 and sent >= limit:
+            logging.info(f"[TEST MODE] Límite de {limit} hoteles alcanzado, se detiene la búsqueda.")
+            break
+    if unchanged:
+        logging.info(f"[INCREMENTAL] {unchanged} hoteles sin reseñas nuevas según su tarjeta, omitidos.")
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Scraper de reseñas de hoteles de Booking.")
+    parser.add_argument(
+        "--refresh-links", action="store_true",
+        help="Ignorar la caché de enlaces y volver a recorrer la búsqueda."
+    )
+    parser.add_argument(
+        "--worker", action="store_true",
+        help="No buscar: solo procesar hoteles de la tabla hotel_jobs que encola otro proceso (JOB_TABLE)."
+    )
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
 
-def main():
     # Configurar Logging
     setup_logging()
 
     # Crear tablas si no existen
     Base.metadata.create_all(bind=engine)
 
-    # Lógica de Reanudación
-    processed_urls = set()
-    if os.path.isfile(config.RAW_REVIEWS_FILE):
-        try:
-            df = pd.read_csv(config.RAW_REVIEWS_FILE)
-            processed_urls = set(df['hotel_url'].unique())
-            logging.info(f"[RESUME] Lógica de reanudación activada. {len(processed_urls)} hoteles ya procesados.")
-        except (pd.errors.EmptyDataError, KeyError):
-             logging.warning(f"[WARN] Archivo de reseñas vacío o inválido. Iniciando desde cero.")
-             pass
-
-    # Fase 1: Obtener Links (Secuencial, un solo driver)
-    logging.info("--- FASE 1: BÚSQUEDA DE HOTELES ---")
-    driver = initialize_driver()
+    if args.worker:
+        # Proceso adicional (en esta u otra máquina con la misma DB): reclama hoteles de hotel_jobs
+        logging.info("--- MODO WORKER: PROCESANDO HOTELES DE LA TABLA hotel_jobs ---")
+        run_pipeline([], jobs_only=True)
+        return
+
+    # Lógica de Reanudación (desde la DB: checkpoints + hoteles con reseñas guardadas).
+    # Un hotel con checkpoint solo se omite si su paginación terminó; los que quedaron a medias
+    # se reanudan desde su última página.
+    db = SessionLocal()
     try:
-        links = get_all_hotel_links(driver, config.SEARCH_URL)
+        processed_urls = load_processed_urls(db)
+        completion = load_completion_map(db)
+        known_counts = load_known_review_counts(db)
+        retries = load_retry_state(db)
     finally:
-        driver.quit()
+        db.close()
+    if config.INCREMENTAL_MODE:
+        # En modo incremental se revisitan todos los hoteles buscando solo reseñas nuevas
+        logging.info("[INCREMENTAL] Se revisitarán todos los hoteles (solo páginas con reseñas nuevas).")
+        processed_urls = set()
+    if not (config.INCREMENTAL_MODE and config.SKIP_UNCHANGED_HOTELS):
+        known_counts = {}
+    if processed_urls:
+        logging.info(f"[RESUME] Lógica de reanudación activada. {len(processed_urls)} hoteles ya procesados.")
+    # Hoteles fallidos: los vencidos se reintentan primero; los que están en backoff o en dead-letter se omiten
+    processed_urls |= retries.waiting | retries.dead
+    if retries.due or retries.waiting or retries.dead:
+        logging.info(
+            f"[RETRY] {len(retries.due)} hoteles fallidos a reintentar, {len(retries.waiting)} en espera, "
+            f"{len(retries.dead)} en dead-letter."
+        )
+    pending_resume = [url for url, completed in completion.items() if not completed]
+    if pending_resume:
+        logging.info(f"[RESUME] {len(pending_resume)} hoteles incompletos se reanudarán desde su última página.")
+
+    # Todas las regiones/particiones en paralelo, deduplicadas, en un único flujo de tarjetas
+    search_urls = build_search_urls(config.SEARCH_URLS, config.SEARCH_PARTITIONS)
+    logging.info(f"[FRONTIER] {len(search_urls)} búsquedas, {config.SEARCH_PARALLELISM} en paralelo.")
+    card_batches = SearchFrontier(search_urls, lambda url: discover_hotel_cards(url, refresh=args.refresh_links))
+    if config.STREAM_SEARCH_LINKS:
+        # Fases 1 y 2 solapadas: la búsqueda alimenta la cola mientras los workers procesan
+        logging.info("--- FASES 1+2: BÚSQUEDA EN STREAMING + PROCESAMIENTO PARALELO ---")
+        run_pipeline(
+            retries.due, processed_urls,
+            card_batches=pending_card_batches(card_batches, processed_urls, known_counts),
+            known_counts=known_counts,
+        )
+        return
+
+    # Fase 1: Obtener Links (completa antes de empezar la Fase 2)
+    logging.info("--- FASE 1: BÚSQUEDA DE HOTELES ---")
+    found = [card for batch in card_batches for card in batch]
         
-    if not links:
+    if not found:
         logging.error("[ERROR] No se encontraron hoteles.")
         return
 
-    # Filtrar ya procesados
-    links_to_process = [l for l in links if l not in processed_urls]
+    # Filtrar ya procesados (y, en modo incremental, los que no cambiaron)
+    cards = [card for batch in pending_card_batches([found], processed_urls, known_counts, limit=0) for card in batch]
+    links_to_process = [card["url"] for card in cards]
     
     if config.HOTEL_VISIT_LIMIT > 0:
         logging.info(f"[TEST MODE] Procesando solo los primeros {config.HOTEL_VISIT_LIMIT} hoteles.")
@@ -73,12 +195,19 @@ def main():
     else:
         logging.info(f"[FULL MODE] Procesando {len(links_to_process)} hoteles pendientes.")
 
+    links_to_process = retries.due + [url for url in links_to_process if url not in retries.due]
+
     if not links_to_process:
         logging.info("[INFO] No hay hoteles nuevos para procesar.")
         return
 
     # Fase 2: Procesamiento Paralelo (Delegado al Pipeline)
-    run_pipeline(links_to_process)
+    # Prioridad por reseñas nuevas estimadas (todas, si el hotel nunca se completó)
+    expected_counts = {
+        card["url"]: max(card["review_count"] - known_counts.get(card["url"], 0), 0)
+        for card in cards if card["review_count"]
+    }
+    run_pipeline(links_to_process, expected_counts=expected_counts)
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,5 @@
 import re
-import pandas as pd
-from typing import Optional, Union
+from typing import Any, Optional, Union
 
 # Compiled Regex Patterns
 RE_SPACES = re.compile(r'\s+')
@@ -25,6 +24,26 @@ def clean_text_basic(text: Union[str, float, None]) -> str:
     text = RE_SPACES.sub(' ', text).strip()
     return text
 
+def normalize_whitespace(text: Optional[str]) -> str:
+    """
+    Forma canónica de los textos de una reseña: cualquier secuencia de espacios, tabuladores o
+    saltos de línea se reduce a un espacio. Así Selenium (`innerText`) y lxml producen el mismo
+    texto, y por tanto el mismo `review_hash`, para la misma reseña.
+    """
+    return RE_SPACES.sub(' ', text).strip() if text else ""
+
+def _is_missing(val: Any) -> bool:
+    """
+    Equivalente a `pd.isna` para escalares, sin importar pandas (el scraper no lo necesita).
+    Cubre None, NaN y `pd.NA` (cuya comparación lanza TypeError).
+    """
+    if val is None:
+        return True
+    try:
+        return bool(val != val)
+    except TypeError:
+        return True
+
 def fix_score_value(val: Union[str, float, int, None]) -> Optional[float]:
     """
     Limpia y normaliza el puntaje de una reseña.
@@ -36,7 +55,7 @@ def fix_score_value(val: Union[str, float, int, None]) -> Optional[float]:
     Returns:
         float: El puntaje normalizado (0-10) o None si no es válido.
     """
-    if pd.isna(val): return None
+    if _is_missing(val): return None
     s = str(val).replace(',', '.').strip()
     match = RE_SCORE_VAL.search(s)
     if match:
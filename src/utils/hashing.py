@@ -0,0 +1,19 @@
+import hashlib
+from typing import Mapping
+
+
+def compute_review_hash(item: Mapping[str, str]) -> str:
+    """
+    Genera el hash único de una reseña basado en sus campos clave.
+
+    Es el mismo hash que se guarda en `reviews.review_hash`, por lo que cualquier
+    componente que necesite saber si una reseña ya existe debe usar esta función.
+
+    Args:
+        item: Diccionario con los datos de la reseña (ReviewData).
+
+    Returns:
+        str: Hash MD5 en hexadecimal.
+    """
+    unique_str = f"{item.get('hotel_url')}{item.get('date')}{item.get('title')}{item.get('positive')}{item.get('negative')}"
+    return hashlib.md5(unique_str.encode('utf-8')).hexdigest()
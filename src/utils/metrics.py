@@ -0,0 +1,26 @@
+import threading
+from collections import Counter
+from typing import Dict
+
+class CounterStats:
+    """Contador por categoría, thread-safe, para métricas agregadas de la ejecución."""
+    def __init__(self):
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, counts: Dict[str, int]) -> None:
+        with self._lock:
+            self._counts.update(counts)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def total(self) -> int:
+        with self._lock:
+            return sum(self._counts.values())
+
+    def summary(self) -> str:
+        """Texto 'tipo: n, ...' ordenado de mayor a menor."""
+        counts = self.snapshot()
+        return ", ".join(f"{kind}: {n}" for kind, n in sorted(counts.items(), key=lambda kv: -kv[1]))
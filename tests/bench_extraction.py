@@ -0,0 +1,100 @@
+"""
+Benchmark de extracción de reseñas: un `execute_script` por página vs. un `find_element` por campo.
+
+Usa un driver simulado donde cada comando WebDriver cuesta `--latency-ms` (round trip HTTP
+a ChromeDriver), así que mide el número de round trips y no el DOM real.
+
+    python tests/bench_extraction.py --pages 20 --reviews 25 --latency-ms 2
+"""
+import argparse
+import sys
+import os
+import time
+sys.path.append(os.getcwd())
+
+from selenium.common.exceptions import NoSuchElementException
+
+from src.booking_selectors import Reviews
+from src.pages.reviews_modal import ReviewsModal
+
+FIELDS = {
+    Reviews.TITLE: "Excelente estancia",
+    Reviews.SCORE: "Puntuación 9,5",
+    Reviews.POSITIVE: "Todo muy limpio y ordenado.",
+    Reviews.NEGATIVE: "Nada que objetar.",
+    Reviews.DATE: "20 de octubre de 2023",
+}
+
+class MockDriver:
+    """Driver simulado que cuenta comandos y duerme `latency` segundos por cada uno."""
+    def __init__(self, reviews_per_page: int, latency: float):
+        self.reviews_per_page = reviews_per_page
+        self.latency = latency
+        self.commands = 0
+
+    def _roundtrip(self):
+        self.commands += 1
+        time.sleep(self.latency)
+
+    def find_elements(self, by, selector):
+        self._roundtrip()
+        return [MockElement(self, i) for i in range(self.reviews_per_page)]
+
+    def execute_script(self, script, *args):
+        self._roundtrip()
+        return [
+            {"title": FIELDS[Reviews.TITLE] + str(i), "score": FIELDS[Reviews.SCORE],
+             "positive": FIELDS[Reviews.POSITIVE], "negative": FIELDS[Reviews.NEGATIVE],
+             "body": "", "date": FIELDS[Reviews.DATE]}
+            for i in range(self.reviews_per_page)
+        ]
+
+class MockElement:
+    def __init__(self, driver: MockDriver, index: int):
+        self.driver = driver
+        self.index = index
+
+    def find_element(self, by, selector):
+        self.driver._roundtrip()
+        if selector not in FIELDS:
+            raise NoSuchElementException(selector)
+        return MockText(self.driver, FIELDS[selector] + (str(self.index) if selector == Reviews.TITLE else ""))
+
+class MockText:
+    def __init__(self, driver: MockDriver, value: str):
+        self.driver = driver
+        self.value = value
+
+    @property
+    def text(self) -> str:
+        self.driver._roundtrip()  # `.text` también es un comando WebDriver
+        return self.value
+
+def run(js_extraction: bool, pages: int, reviews: int, latency: float):
+    driver = MockDriver(reviews, latency)
+    modal = ReviewsModal(driver, "Hotel Bench", "http://bench", js_extraction=js_extraction)
+    # Saltar la espera inicial de Selenium: medimos solo la extracción
+    extract = modal._extract_page_js if js_extraction else (
+        lambda: [modal._extract_review_data(e) for e in driver.find_elements(None, Reviews.ITEM)]
+    )
+    start = time.perf_counter()
+    extracted = 0
+    for _ in range(pages):
+        extracted += len(extract())
+    return time.perf_counter() - start, driver.commands, extracted
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--reviews", type=int, default=25)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    args = parser.parse_args()
+    latency = args.latency_ms / 1000
+
+    for label, js in (("por elemento", False), ("execute_script", True)):
+        elapsed, commands, extracted = run(js, args.pages, args.reviews, latency)
+        print(f"{label:>15}: {elapsed:7.3f}s | {commands:6d} comandos WebDriver | "
+              f"{extracted} reseñas | {commands / args.pages:.0f} comandos/página")
+
+if __name__ == "__main__":
+    main()
@@ -54,5 +54,29 @@ class TestDatabase(unittest.TestCase):
         with self.assertRaises(IntegrityError):
             self.session.commit()
 
+    def test_rehash_migration_merges_pre_normalization_duplicates(self):
+        from src.pages.review_parser import build_review
+        from src.rehash_reviews import rehash_reviews
+        from src.utils.hashing import compute_review_hash
+
+        # Fila guardada antes de normalizar (texto de Selenium `.text`) y la misma reseña ya normalizada
+        old = {"hotel_url": "u1", "title": "Muy  bien", "positive": "Linea uno\nLinea dos", "negative": "", "date": "2024"}
+        new = build_review({**old, "score": "9"}, "H1", "u1")
+        for item in (old, new):
+            self.session.add(Review(hotel_name="H1", review_hash=compute_review_hash(item), score=9.0,
+                                    **{k: item[k] for k in ("hotel_url", "title", "positive", "negative", "date")}))
+        self.session.add(Review(hotel_name="H1", hotel_url="u1", title="Otra", positive="", negative="", date="2024",
+                                review_hash=compute_review_hash({"hotel_url": "u1", "title": "Otra", "positive": "",
+                                                                 "negative": "", "date": "2024"})))
+        self.session.commit()
+
+        self.assertEqual(rehash_reviews(self.session), (1, 1))
+        self.assertEqual(rehash_reviews(self.session), (0, 0))  # Idempotente
+
+        rows = self.session.query(Review).order_by(Review.id).all()
+        self.assertEqual([r.title for r in rows], ["Muy bien", "Otra"])
+        self.assertEqual(rows[0].positive, "Linea uno Linea dos")
+        self.assertEqual(rows[0].review_hash, compute_review_hash(new))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+from unittest.mock import MagicMock
+
+from selenium.common.exceptions import InvalidSessionIdException
+from selenium.webdriver.remote.command import Command
+
+from src.core.driver import DriverPool
+
+class TestDriverPool(unittest.TestCase):
+    def setUp(self):
+        self.created = []
+
+    def make_pool(self, size: int, max_uses: int = 10, tabs: int = 1) -> DriverPool:
+        def factory():
+            driver = MagicMock()
+            self.created.append(driver)
+            return driver
+        return DriverPool(size, max_uses=max_uses, max_rss_mb=0, factory=factory, tabs_per_browser=tabs)
+
+    def test_prewarm_creates_all_drivers(self):
+        pool = self.make_pool(3)
+        pool.prewarm()
+        self.assertEqual(len(self.created), 3)
+        self.assertEqual(pool.metrics.creations, 3)
+
+    def test_reuses_then_recycles_after_max_uses(self):
+        pool = self.make_pool(1, max_uses=2)
+        first = pool.acquire()
+        pool.release(first)
+        self.assertIs(pool.acquire(), first)
+        pool.release(first)
+
+        self.assertEqual(pool.metrics.recycles, 1)
+        first.driver.quit.assert_called_once()
+        self.assertIsNot(pool.acquire().driver, first.driver)
+
+    def test_replaces_dead_session(self):
+        pool = self.make_pool(1)
+        pooled = pool.acquire()
+        pooled.driver.execute_script.side_effect = InvalidSessionIdException("dead")
+        pool.release(pooled, failed=True)
+
+        replacement = pool.acquire()
+        self.assertIsNot(replacement.driver, pooled.driver)
+        self.assertEqual(pool.metrics.failures, 1)
+
+    def test_recycles_blocked_browser_with_live_session(self):
+        pool = self.make_pool(1)
+        pooled = pool.acquire()
+        pool.release(pooled, failed=True, recycle=True)
+
+        pooled.driver.quit.assert_called_once()
+        self.assertEqual(pool.metrics.recycles, 1)
+        self.assertIsNot(pool.acquire().driver, pooled.driver)
+
+    def test_close_quits_drivers(self):
+        pool = self.make_pool(2)
+        pool.prewarm()
+        pool.close()
+        for driver in self.created:
+            driver.quit.assert_called_once()
+
+class FakeDriver:
+    """Driver mínimo con `execute` real, necesario para las copias por pestaña."""
+    def __init__(self):
+        self.commands = []  # Compartida por las copias superficiales de cada pestaña
+        self.current_window_handle = "tab-0"
+        self.quit = MagicMock()
+        self.switch_to = MagicMock()
+        handles = iter(["tab-1", "tab-2", "tab-3"])
+        self.switch_to.new_window.side_effect = lambda kind: setattr(self, "current_window_handle", next(handles))
+
+    def execute(self, command, params=None):
+        self.commands.append((command, params))
+        return {"value": 1}
+
+    def execute_script(self, script, *args):
+        return self.execute("executeScript", {"script": script})["value"]
+
+class TestDriverPoolTabs(unittest.TestCase):
+    def setUp(self):
+        self.created = []
+
+    def make_pool(self, max_uses: int = 10, tabs: int = 2) -> DriverPool:
+        factory = lambda: self.created.append(FakeDriver()) or self.created[-1]
+        return DriverPool(1, max_uses=max_uses, max_rss_mb=0, factory=factory, tabs_per_browser=tabs)
+
+    def test_one_browser_serves_several_tabs(self):
+        pool = self.make_pool(tabs=3)
+        tabs = [pool.acquire() for _ in range(3)]
+
+        self.assertEqual(len(self.created), 1)
+        self.assertEqual(len({id(t.driver) for t in tabs}), 3)
+        self.assertTrue(all(t.browser is tabs[0].browser for t in tabs))
+
+    def test_tab_commands_switch_window_first(self):
+        pool = self.make_pool(tabs=2)
+        tab_a, tab_b = pool.acquire(), pool.acquire()
+        commands = self.created[0].commands
+        commands.clear()
+
+        tab_a.driver.execute_script("return 1")
+        tab_a.driver.execute_script("return 2")
+        tab_b.driver.execute_script("return 3")
+
+        # Solo cambia de ventana cuando la tenía otra pestaña
+        switches = [params["handle"] for command, params in commands if command == Command.SWITCH_TO_WINDOW]
+        self.assertEqual(switches, ["tab-0", "tab-1"])
+        self.assertEqual(len(commands), 5)
+
+    def test_browser_recycled_after_last_tab_returns(self):
+        pool = self.make_pool(max_uses=2, tabs=2)
+        tab_a, tab_b = pool.acquire(), pool.acquire()
+
+        pool.release(tab_a)
+        pool.release(tab_b) # Segundo hotel del navegador: se marca para reciclar
+        self.assertEqual(pool.metrics.recycles, 1)
+        self.created[0].quit.assert_not_called() # tab_a sigue en la cola
+
+        pool.acquire() # Descarta tab_a (navegador retirado), cierra y crea uno nuevo
+        self.created[0].quit.assert_called_once()
+        self.assertEqual(len(self.created), 2)
+
+if __name__ == '__main__':
+    unittest.main()
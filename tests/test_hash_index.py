@@ -0,0 +1,40 @@
+import unittest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.core.database import Base
+from src.core.hash_index import ReviewHashIndex
+from src.models import Review
+from src.utils.hashing import compute_review_hash
+
+class TestReviewHashIndex(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine('sqlite:///:memory:')
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+
+    def tearDown(self):
+        self.session.close()
+        Base.metadata.drop_all(self.engine)
+
+    def test_load_from_db(self):
+        known = compute_review_hash({"hotel_url": "u1", "title": "t1"})
+        self.session.add(Review(hotel_name="H1", hotel_url="u1", title="t1", review_hash=known))
+        self.session.commit()
+
+        index = ReviewHashIndex.load(self.session)
+
+        self.assertEqual(len(index), 1)
+        self.assertIn(known, index)
+        self.assertNotIn(compute_review_hash({"hotel_url": "u1", "title": "t2"}), index)
+
+    def test_add(self):
+        index = ReviewHashIndex()
+        new_hash = compute_review_hash({"hotel_url": "u2", "title": "t"})
+        self.assertNotIn(new_hash, index)
+
+        index.add(new_hash)
+        self.assertIn(new_hash, index)
+
+if __name__ == '__main__':
+    unittest.main()
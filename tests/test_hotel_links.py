@@ -0,0 +1,91 @@
+import csv
+import os
+import tempfile
+import unittest
+from datetime import timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.core.database import Base
+from src.core.hotel_links import (
+    canonical_hotel_url, complete_search, export_links_csv, load_cached_cards, save_hotel_cards, start_search
+)
+from src.models import HotelLink, LinkSearch
+
+SEARCH_URL = "https://www.booking.com/searchresults.html?ss=Tlaxcala"
+
+def card(url: str, review_count=None) -> dict:
+    return {"url": url, "name": f"Hotel {url}", "review_count": review_count, "score": 8.5}
+
+class TestHotelLinksCache(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine('sqlite:///:memory:')
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+
+    def tearDown(self):
+        self.session.close()
+        Base.metadata.drop_all(self.engine)
+
+    def run_search(self, cards):
+        start_search(self.session, SEARCH_URL)
+        save_hotel_cards(self.session, SEARCH_URL, cards)
+        complete_search(self.session, SEARCH_URL, len(cards))
+
+    def test_completed_search_is_cached(self):
+        self.run_search([card("a", 10), card("b")])
+
+        cached = load_cached_cards(self.session, SEARCH_URL, ttl_hours=24)
+        self.assertEqual([c["url"] for c in cached], ["a", "b"])
+        self.assertEqual(cached[0]["review_count"], 10)
+
+    def test_unfinished_search_is_not_cached(self):
+        start_search(self.session, SEARCH_URL)
+        save_hotel_cards(self.session, SEARCH_URL, [card("a")])
+
+        self.assertIsNone(load_cached_cards(self.session, SEARCH_URL, ttl_hours=24))
+
+    def test_expired_cache(self):
+        self.run_search([card("a")])
+        search = self.session.get(LinkSearch, SEARCH_URL)
+        search.completed_at -= timedelta(hours=25)
+        self.session.commit()
+
+        self.assertIsNone(load_cached_cards(self.session, SEARCH_URL, ttl_hours=24))
+
+    def test_new_search_drops_vanished_hotels_and_keeps_discovery_time(self):
+        self.run_search([card("a"), card("gone")])
+        first_seen = self.session.query(HotelLink).filter_by(url="a").one().discovered_at
+        self.session.query(HotelLink).update({"last_seen_at": HotelLink.last_seen_at - timedelta(minutes=1)})
+        self.session.commit()
+        search = self.session.get(LinkSearch, SEARCH_URL)
+        search.started_at -= timedelta(minutes=1)
+        self.session.commit()
+
+        self.run_search([card("a", 50)])
+
+        cached = load_cached_cards(self.session, SEARCH_URL, ttl_hours=24)
+        self.assertEqual([(c["url"], c["review_count"]) for c in cached], [("a", 50)])
+        self.session.expire_all()
+        self.assertEqual(self.session.query(HotelLink).filter_by(url="a").one().discovered_at, first_seen)
+
+    def test_export_links_csv(self):
+        self.run_search([card("a", 10)])
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "links.csv")
+            self.assertEqual(export_links_csv(self.session, filename), 1)
+            with open(filename, encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+
+        self.assertEqual(rows[0]["url"], "a")
+        self.assertEqual(rows[0]["review_count"], "10")
+
+    def test_canonical_hotel_url(self):
+        self.assertEqual(
+            canonical_hotel_url("https://WWW.booking.com/hotel/mx/casa-azul.es.html?aid=1&srpvid=x#tab-reviews"),
+            "https://www.booking.com/hotel/mx/casa-azul.es.html",
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("lxml")
+pytest.importorskip("cssselect")
+
+from src.core.http_fetcher import HttpReviewFetcher
+from src.pages.review_parser import build_review, parse_reviews_html
+from src.utils.hashing import compute_review_hash
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+HOTEL_URL = "https://www.booking.com/hotel/mx/casa-azul.es.html"
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    """Sirve `review_list.html` para offset=0 y una página sin reseñas para el resto."""
+    def do_GET(self):
+        if "offset=0" in self.path:
+            self.path = "/review_list.html"
+        elif "offset=25" in self.path:
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(b"<html><body><div id='app'></div></body></html>")
+            return
+        else:
+            self.send_error(503)
+            return
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def fixture_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(FixtureHandler, directory=FIXTURES_DIR))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/reviewlist.es.html"
+    server.shutdown()
+    server.server_close()
+
+def test_parse_reviews_html_matches_selenium_format():
+    with open(os.path.join(FIXTURES_DIR, "review_list.html"), encoding="utf-8") as f:
+        reviews = parse_reviews_html(f.read(), "Casa Azul", HOTEL_URL)
+
+    assert len(reviews) == 2
+    assert reviews[0]["title"] == "Excelente estancia"
+    assert reviews[0]["score"] == "9.5"
+    assert reviews[0]["negative"] == "Nada"
+    # Sin positivo ni negativo se usa el cuerpo de respaldo
+    assert reviews[1]["positive"] == "Solo cuerpo, sin positivo ni negativo"
+    assert reviews[0]["positive"] == "La ubicación y el desayuno."
+
+def test_lxml_and_inner_text_give_same_hash():
+    html = """<div data-testid="review">
+      <h3 data-testid="review-title">  Muy
+        bien </h3>
+      <div data-testid="review-score">8</div>
+      <div data-testid="review-positive-text"><p>Linea uno<br>Linea dos</p><p>Otra</p></div>
+      <span data-testid="review-date">Comentó: 3 de marzo de 2024</span>
+    </div>"""
+    # Lo que devuelve `innerText` en Chrome para los mismos elementos
+    inner_text = {
+        "title": "Muy bien", "score": "8", "positive": "Linea uno\nLinea dos\n\nOtra",
+        "negative": "", "body": "", "date": "Comentó: 3 de marzo de 2024",
+    }
+
+    [parsed] = parse_reviews_html(html, "Casa Azul", HOTEL_URL)
+    selenium = build_review(inner_text, "Casa Azul", HOTEL_URL)
+
+    assert parsed["positive"] == "Linea uno Linea dos Otra"
+    assert compute_review_hash(parsed) == compute_review_hash(selenium)
+
+def test_fetch_page_from_fixture_server(fixture_server):
+    fetcher = HttpReviewFetcher(max_connections=2, timeout=5, base_url=fixture_server)
+    try:
+        reviews = fetcher.fetch_page("Casa Azul", HOTEL_URL, 0)
+    finally:
+        fetcher.close()
+
+    assert [r["title"] for r in reviews] == ["Excelente estancia", "Regular"]
+    assert all(r["hotel_url"] == HOTEL_URL for r in reviews)
+    assert fetcher.stats.snapshot() == {"ok": 1}
+
+def test_fetch_page_falls_back_without_reviews(fixture_server):
+    fetcher = HttpReviewFetcher(max_connections=2, timeout=5, base_url=fixture_server)
+    try:
+        assert fetcher.fetch_page("Casa Azul", HOTEL_URL, 25) is None
+    finally:
+        fetcher.close()
+
+    assert fetcher.stats.snapshot() == {"fallback": 1}
+
+def test_fetch_page_rejects_unknown_hotel_url(fixture_server):
+    fetcher = HttpReviewFetcher(base_url=fixture_server)
+    assert fetcher.fetch_page("X", "https://example.com/otro", 0) is None
@@ -0,0 +1,147 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+import unittest
+from datetime import timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.core.database import Base
+from src.core.hotel_links import utcnow
+from src.core.job_table import (
+    DONE, PENDING, JobFeeder, claim_jobs, count_outstanding, enqueue_jobs, finish_job, renew_leases
+)
+from src.core.work_queue import HotelQueue
+from src.models import HotelJob
+
+def claim_all(db_path: str, owner: str, results) -> None:
+    """Proceso independiente: reclama de uno en uno hasta vaciar la tabla."""
+    engine = create_engine(f"sqlite:///{db_path}")
+    session = sessionmaker(bind=engine)()
+    claimed = []
+    while True:
+        urls = claim_jobs(session, owner, 1, lease_seconds=60)
+        if not urls:
+            break
+        claimed += urls
+    session.close()
+    results.put(claimed)
+
+class TestJobTable(unittest.TestCase):
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        self.engine = create_engine(f"sqlite:///{self.db_path}")
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.session = self.Session()
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+        os.remove(self.db_path)
+
+    def job(self, url: str) -> HotelJob:
+        self.session.expire_all()
+        return self.session.query(HotelJob).filter(HotelJob.hotel_url == url).one()
+
+    def test_claims_by_priority(self):
+        enqueue_jobs(self.session, ["a", "b", "c"], {"b": 500, "c": 20})
+
+        self.assertEqual(claim_jobs(self.session, "p1", 2, lease_seconds=60), ["b", "c"])
+        self.assertEqual(claim_jobs(self.session, "p2", 5, lease_seconds=60), ["a"])
+        self.assertEqual(claim_jobs(self.session, "p2", 5, lease_seconds=60), [])
+
+    def test_expired_lease_is_reclaimed(self):
+        enqueue_jobs(self.session, ["a"])
+        claim_jobs(self.session, "muerto", 1, lease_seconds=60)
+
+        later = utcnow() + timedelta(seconds=61)
+        self.assertEqual(claim_jobs(self.session, "vivo", 1, lease_seconds=60, now=later), ["a"])
+        self.assertEqual(self.job("a").owner, "vivo")
+        self.assertEqual(self.job("a").attempts, 2)
+
+    def test_heartbeat_only_renews_own_leases(self):
+        enqueue_jobs(self.session, ["a", "b"])
+        claim_jobs(self.session, "p1", 1, lease_seconds=60)
+        claim_jobs(self.session, "p2", 1, lease_seconds=60)
+
+        self.assertEqual(renew_leases(self.session, "p1", ["a", "b"], lease_seconds=600), {"a"})
+        self.assertGreater(self.job("a").lease_expires_at, utcnow() + timedelta(seconds=500))
+
+    def test_finish_and_requeue_on_next_run(self):
+        enqueue_jobs(self.session, ["a"])
+        claim_jobs(self.session, "p1", 1, lease_seconds=60)
+        finish_job(self.session, "a", "otro")  # No es suyo: no cambia
+        self.assertEqual(count_outstanding(self.session), 1)
+
+        finish_job(self.session, "a", "p1")
+        self.assertEqual((self.job("a").status, count_outstanding(self.session)), (DONE, 0))
+
+        enqueue_jobs(self.session, ["a"])
+        self.assertEqual(self.job("a").status, PENDING)
+
+    def test_enqueue_does_not_steal_active_lease(self):
+        enqueue_jobs(self.session, ["a"])
+        claim_jobs(self.session, "p1", 1, lease_seconds=60)
+
+        enqueue_jobs(self.session, ["a"], {"a": 10})
+        self.assertEqual(self.job("a").owner, "p1")
+        self.assertEqual(claim_jobs(self.session, "p2", 1, lease_seconds=60), [])
+
+    def test_processes_never_claim_the_same_hotel(self):
+        urls = [f"hotel-{i}" for i in range(60)]
+        enqueue_jobs(self.session, urls)
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=claim_all, args=(self.db_path, f"p{i}", results)) for i in range(3)
+        ]
+        for p in processes:
+            p.start()
+        claimed = [url for _ in processes for url in results.get(timeout=30)]
+        for p in processes:
+            p.join(timeout=10)
+
+        self.assertEqual(sorted(claimed), sorted(urls))
+
+    def test_feeder_drains_table_and_closes_queue(self):
+        enqueue_jobs(self.session, ["a", "b", "c"])
+        feeder = JobFeeder(
+            prefetch=2, owner="p1", lease_seconds=60, heartbeat=60, poll_interval=0.05, session_factory=self.Session
+        )
+        hotel_queue = HotelQueue(closed=False)
+        done = []
+
+        def worker():
+            while (url := hotel_queue.get()) is not None:
+                done.append(url)
+                hotel_queue.task_done()
+                feeder.finish(url)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        feeder.start(hotel_queue).join(timeout=5)
+        thread.join(timeout=5)
+
+        self.assertEqual(sorted(done), ["a", "b", "c"])
+        self.assertEqual(count_outstanding(self.session), 0)
+
+    def test_feeder_waits_for_local_producer(self):
+        feeder = JobFeeder(owner="p1", producing=True, poll_interval=0.05, session_factory=self.Session)
+        hotel_queue = HotelQueue(closed=False)
+        thread = feeder.start(hotel_queue)
+
+        feeder.put("a", 10)
+        feeder.close()
+        self.assertEqual(hotel_queue.get(), "a")
+        hotel_queue.task_done()
+        feeder.finish("a")
+        thread.join(timeout=5)
+
+        self.assertFalse(thread.is_alive())
+        self.assertIsNone(hotel_queue.get())
+
+if __name__ == '__main__':
+    unittest.main()
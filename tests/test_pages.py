@@ -1,5 +1,5 @@
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 import sys
 import os
 
@@ -7,7 +7,8 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
 from pages.hotel_page import HotelPage
-from selenium.common.exceptions import NoSuchElementException
+from pages.search_page import SearchPage, parse_card_review_text
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
 
 class TestHotelPage(unittest.TestCase):
     def setUp(self):
@@ -34,5 +35,49 @@ class TestHotelPage(unittest.TestCase):
         count = self.hotel_page.get_expected_review_count()
         self.assertEqual(count, 1234)
 
+    def test_open_reviews_modal_single_probe(self):
+        trigger = MagicMock()
+        probe_result = {"index": 0, "element": trigger, "popupClosed": True}
+        self.mock_driver.find_elements.return_value = [] # Sin Google One Tap ni JSON-LD
+        self.mock_driver.execute_script.side_effect = [probe_result, None, None]
+        self.mock_driver.title = "Hotel California - Booking.com"
+        self.mock_driver.current_url = "http://test.com/hotel"
+
+        modal = self.hotel_page.open_reviews_modal()
+
+        self.assertIsNotNone(modal)
+        # Primer execute_script = sondeo combinado, segundo = click en el disparador encontrado
+        self.mock_driver.execute_script.assert_any_call("arguments[0].click();", trigger)
+
+class TestSearchPageCards(unittest.TestCase):
+    def test_parse_card_review_text(self):
+        self.assertEqual(parse_card_review_text("Puntuación 8,7\nFabuloso\n1.234 comentarios"), (1234, 8.7))
+        self.assertEqual(parse_card_review_text(""), (None, None))
+
+    def test_current_cards_parses_metadata(self):
+        driver = MagicMock()
+        driver.execute_script.return_value = [
+            {"url": "http://a", "name": "Hotel A", "review_text": "9,1 Fantástico 56 comentarios"},
+            {"url": "http://b", "name": "", "review_text": ""},
+        ]
+
+        cards = SearchPage(driver)._current_cards()
+
+        self.assertEqual(cards[0], {"url": "http://a", "name": "Hotel A", "review_count": 56, "score": 9.1})
+        self.assertIsNone(cards[1]["review_count"])
+
+    def test_iter_new_cards_survives_load_more_timeout(self):
+        a = {"url": "http://a", "name": "A", "review_count": None, "score": None}
+        b = {"url": "http://b", "name": "B", "review_count": None, "score": None}
+        page = SearchPage(MagicMock())
+        # El scroll infinito trae "b" aunque el botón "Cargar más" nunca aparezca
+        page._current_cards = MagicMock(side_effect=[[a], [a, b], [a, b], [a, b]])
+
+        with patch("pages.search_page.WebDriverWait") as wait:
+            wait.return_value.until.side_effect = TimeoutException("sin botón")
+            batches = list(page.iter_new_cards())
+
+        self.assertEqual(batches, [[a], [b]])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,254 @@
+import os
+import queue
+import tempfile
+import threading
+import unittest
+from unittest.mock import ANY, MagicMock, patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.core.database import Base
+from src.core.crawl_state import (
+    get_crawl_state, load_completion_map, load_known_review_counts, load_processed_urls,
+    record_page_progress, review_count_unchanged,
+)
+from src.core.pipeline import (
+    FanOutTracker, _create_csv_with_header, _produce_links, insert_reviews_batch, scrape_hotel, scrape_review_page
+)
+from src.core.work_queue import HotelQueue
+from src.models import HotelCrawlState, Review
+from src.pages.review_list_page import ReviewListPage, page_offsets, review_list_url
+
+def make_review(title: str, url: str = "http://test.com") -> dict:
+    return {
+        "hotel_name": "Test Hotel", "hotel_url": url, "title": title,
+        "score": "9,5", "positive": "Bien", "negative": "", "date": "2023-01-01"
+    }
+
+class TestInsertReviewsBatch(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine('sqlite:///:memory:')
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+
+    def tearDown(self):
+        self.session.close()
+        Base.metadata.drop_all(self.engine)
+
+    def test_inserts_new_rows(self):
+        batch = [make_review("A"), make_review("B")]
+        new_rows = insert_reviews_batch(self.session, batch)
+
+        self.assertEqual(new_rows, batch)
+        self.assertEqual(self.session.query(Review).count(), 2)
+        self.assertEqual(self.session.query(Review).first().score, 9.5)
+
+    def test_returns_only_new_rows(self):
+        insert_reviews_batch(self.session, [make_review("A")])
+
+        batch = [make_review("A"), make_review("B"), make_review("B")]
+        new_rows = insert_reviews_batch(self.session, batch)
+
+        self.assertEqual([r["title"] for r in new_rows], ["B"])
+        self.assertEqual(self.session.query(Review).count(), 2)
+
+    def test_empty_batch(self):
+        self.assertEqual(insert_reviews_batch(self.session, []), [])
+
+class TestCrawlState(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine('sqlite:///:memory:')
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+
+    def tearDown(self):
+        self.session.close()
+        Base.metadata.drop_all(self.engine)
+
+    def test_progress_is_upserted(self):
+        record_page_progress(self.session, "http://h1", 1, last_review_hash="h-1", expected_count=120)
+        record_page_progress(self.session, "http://h1", 2, last_review_hash="h-2", saved_count=17)
+
+        state = get_crawl_state(self.session, "http://h1")
+        self.assertEqual(state.last_page, 2)
+        self.assertEqual(state.last_review_hash, "h-2")
+        self.assertEqual(state.expected_count, 120) # Se conserva si no se informa
+        self.assertEqual(state.saved_count, 17)
+        self.assertFalse(state.completed)
+
+    def test_offset_pages_do_not_move_last_page(self):
+        record_page_progress(self.session, "http://h1", 3, last_review_hash="h-3")
+        record_page_progress(self.session, "http://h1", None, expected_count=500)  # Página por offset
+
+        state = get_crawl_state(self.session, "http://h1")
+        self.assertEqual((state.last_page, state.last_review_hash, state.expected_count), (3, "h-3", 500))
+
+    def test_completion_map(self):
+        record_page_progress(self.session, "http://h1", 5, completed=True)
+        record_page_progress(self.session, "http://h2", 3)
+
+        self.assertEqual(load_completion_map(self.session), {"http://h1": True, "http://h2": False})
+
+    def test_processed_urls(self):
+        # h1 completo, h2 a medias, h3 con reseñas de una ejecución sin checkpoint
+        record_page_progress(self.session, "http://h1", 5, completed=True)
+        record_page_progress(self.session, "http://h2", 3)
+        insert_reviews_batch(self.session, [make_review("A", "http://h2"), make_review("B", "http://h3")])
+
+        self.assertEqual(load_processed_urls(self.session), {"http://h1", "http://h3"})
+
+    def test_known_review_counts_only_for_completed_hotels(self):
+        record_page_progress(self.session, "http://h1", 5, expected_count=120, completed=True)
+        record_page_progress(self.session, "http://h2", 3, expected_count=80)
+        record_page_progress(self.session, "http://h3", 1, completed=True)
+
+        self.assertEqual(load_known_review_counts(self.session), {"http://h1": 120})
+
+    def test_review_count_unchanged(self):
+        self.assertTrue(review_count_unchanged(120, 120))
+        self.assertFalse(review_count_unchanged(125, 120))
+        self.assertFalse(review_count_unchanged(None, 120))
+        self.assertFalse(review_count_unchanged(120, None))
+
+class TestFanOutTracker(unittest.TestCase):
+    def test_completes_after_last_page(self):
+        tracker = FanOutTracker()
+        tracker.start("http://h", 3)
+
+        self.assertIsNone(tracker.finish_page("http://h", True))
+        self.assertIsNone(tracker.finish_page("http://h", True))
+        self.assertTrue(tracker.finish_page("http://h", True))
+
+    def test_failed_page_leaves_hotel_incomplete(self):
+        tracker = FanOutTracker()
+        tracker.start("http://h", 2)
+
+        self.assertIsNone(tracker.finish_page("http://h", False))
+        self.assertFalse(tracker.finish_page("http://h", True))
+
+    def test_job_closed_as_failed_only_after_last_page(self):
+        tracker = FanOutTracker()
+        tracker.start("http://h", 2)
+        jobs = MagicMock()
+        fetcher = MagicMock()
+        fetcher.fetch_page_html.side_effect = [RuntimeError("sin respuesta"), ([], "<html></html>")]
+        pages = [
+            {"hotel_url": "http://h", "reviews_hotel_url": "http://h", "hotel_name": "H",
+             "page": page, "offset": (page - 1) * 25, "expected_count": 50}
+            for page in (1, 2)
+        ]
+
+        with patch("src.core.pipeline._record_hotel_failure"):
+            with self.assertRaises(RuntimeError):
+                scrape_review_page(pages[0], queue.Queue(), None, tracker, fetcher, jobs=jobs)
+            jobs.finish.assert_not_called()
+            scrape_review_page(pages[1], queue.Queue(), None, tracker, fetcher, jobs=jobs)
+
+        jobs.finish.assert_called_once_with("http://h", failed=True)
+
+class TestResume(unittest.TestCase):
+    HOTEL_URL = "https://www.booking.com/hotel/mx/casa-azul.es.html"
+
+    def test_review_list_resumes_at_offset(self):
+        page = ReviewListPage(MagicMock())
+        page.fetch = MagicMock(side_effect=[[{"title": f"r{i}"} for i in range(25)], [{"title": "r25"}], []])
+
+        with patch("src.pages.review_list_page.config.REVIEW_LIST_ROWS", 25):
+            batches = list(page.iter_pages("H", self.HOTEL_URL, 40, 5, max_reviews=100))
+
+        self.assertEqual([(n, len(batch)) for n, batch in batches], [(5, 25), (6, 1)])
+        self.assertEqual([c.args[2] for c in page.fetch.call_args_list], [40, 65, 90])
+
+    def test_review_list_counts_saved_reviews_toward_limit(self):
+        page = ReviewListPage(MagicMock())
+        page.fetch = MagicMock(return_value=[{"title": f"r{i}"} for i in range(25)])
+
+        batches = list(page.iter_pages("H", self.HOTEL_URL, 90, 5, max_reviews=100))
+
+        self.assertEqual([(n, len(batch)) for n, batch in batches], [(5, 10)])
+
+    def test_scrape_hotel_jumps_to_checkpoint_without_modal(self):
+        state = HotelCrawlState(hotel_url=self.HOTEL_URL, last_page=4, saved_count=40, completed=False)
+        pool = MagicMock()
+        pool.acquire.return_value.driver.current_url = self.HOTEL_URL
+        result_queue = queue.Queue()
+
+        with patch("src.core.pipeline.SessionLocal"), \
+                patch("src.core.pipeline.get_crawl_state", return_value=state), \
+                patch("src.core.pipeline.HotelPage") as hotel_page, \
+                patch("src.core.pipeline.ReviewListPage") as review_list, \
+                patch("src.core.pipeline.config.INCREMENTAL_MODE", False):
+            hotel_page.return_value.get_expected_review_count.return_value = 100
+            hotel_page.return_value.get_name.return_value = "Casa Azul"
+            review_list.return_value.iter_pages.return_value = iter([(5, [make_review("A")])])
+            scrape_hotel(self.HOTEL_URL, HotelQueue(), result_queue, 1, pool)
+
+        hotel_page.return_value.open_reviews_modal.assert_not_called()
+        review_list.return_value.iter_pages.assert_called_once_with("Casa Azul", self.HOTEL_URL, 40, 5, ANY)
+        messages = [result_queue.get_nowait() for _ in range(result_queue.qsize())]
+        self.assertEqual([(m["page"], m["saved_count"], m["completed"]) for m in messages], [(5, 41, False), (5, 41, True)])
+
+class TestCsvHeader(unittest.TestCase):
+    def test_header_written_once_by_concurrent_writers(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "reviews.csv")
+            threads = [threading.Thread(target=_create_csv_with_header, args=(path, ["a", "b"])) for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(f.read().splitlines(), ["a,b"])
+            self.assertEqual(os.listdir(tmp), ["reviews.csv"])
+
+class TestReviewListUrl(unittest.TestCase):
+    def test_builds_offset_url(self):
+        url = review_list_url("https://www.booking.com/hotel/mx/casa-azul.es.html?aid=1", 50, rows=25)
+
+        self.assertIn("cc1=mx", url)
+        self.assertIn("pagename=casa-azul", url)
+        self.assertIn("offset=50", url)
+
+    def test_rejects_unknown_url(self):
+        self.assertIsNone(review_list_url("https://example.com/otro", 0))
+
+    def test_page_offsets_capped_by_max_reviews(self):
+        self.assertEqual(page_offsets(120, 60, rows=25), [0, 25, 50])
+
+def card(url: str, review_count=None) -> dict:
+    return {"url": url, "name": url.upper(), "review_count": review_count, "score": None}
+
+class TestProduceLinks(unittest.TestCase):
+    def test_queues_new_links_and_closes(self):
+        q = HotelQueue(closed=False)
+        cards = [[card("a", 10), card("done", 500)], [card("b", 100)]]
+        _produce_links(iter(cards), q, {"done"}, use_card_counts=True)
+
+        self.assertEqual([q.get(), q.get()], ["b", "a"])
+        q.task_done()
+        q.task_done()
+        self.assertIsNone(q.get())
+
+    def test_known_hotels_prioritised_by_new_reviews(self):
+        q = HotelQueue(closed=False)
+        cards = [[card("old-big", 900), card("new", 50), card("old-grown", 400)]]
+        _produce_links(iter(cards), q, set(), use_card_counts=True, known_counts={"old-big": 895, "old-grown": 300})
+
+        self.assertEqual([q.get(), q.get(), q.get()], ["old-grown", "new", "old-big"])
+
+    def test_closes_queue_when_search_fails(self):
+        def failing_search():
+            yield [card("a")]
+            raise RuntimeError("navegador caído")
+
+        q = HotelQueue(closed=False)
+        _produce_links(failing_search(), q, set())
+
+        self.assertEqual(q.get(), "a")
+        q.task_done()
+        self.assertIsNone(q.get())
+
+if __name__ == '__main__':
+    unittest.main()
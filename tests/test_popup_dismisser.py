@@ -0,0 +1,48 @@
+import unittest
+from unittest.mock import MagicMock
+
+from src.core import popup_dismisser
+from src.core.popup_dismisser import (
+    POPUP_DISMISSER_JS, collect_popup_dismissals, has_popup_dismisser, install_popup_dismisser
+)
+from src.booking_selectors import HotelPage as HotelPageSelectors
+from src.utils.metrics import CounterStats
+
+class TestPopupDismisser(unittest.TestCase):
+    def setUp(self):
+        popup_dismisser.DISMISSAL_STATS = CounterStats()
+
+    def test_script_uses_hotel_page_selectors(self):
+        self.assertIn(HotelPageSelectors.GOOGLE_ONE_TAP_IFRAME, POPUP_DISMISSER_JS)
+        self.assertIn("MutationObserver", POPUP_DISMISSER_JS)
+
+    def test_install_once_per_driver(self):
+        driver = MagicMock()
+        driver._popup_dismisser = False
+
+        self.assertTrue(install_popup_dismisser(driver))
+        self.assertTrue(install_popup_dismisser(driver))
+
+        driver.execute_cdp_cmd.assert_called_once_with(
+            "Page.addScriptToEvaluateOnNewDocument", {"source": POPUP_DISMISSER_JS}
+        )
+        self.assertTrue(has_popup_dismisser(driver))
+
+    def test_collect_accumulates_counts(self):
+        driver = MagicMock()
+        driver._popup_dismisser = True
+        driver.execute_script.side_effect = [{"login": 1, "google_one_tap": 2}, {"login": 1}]
+
+        collect_popup_dismissals(driver)
+        collect_popup_dismissals(driver)
+
+        self.assertEqual(popup_dismisser.DISMISSAL_STATS.snapshot(), {"login": 2, "google_one_tap": 2})
+
+    def test_collect_skips_drivers_without_script(self):
+        driver = MagicMock()
+        driver._popup_dismisser = False
+        self.assertEqual(collect_popup_dismissals(driver), {})
+        driver.execute_script.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from selenium.common.exceptions import WebDriverException
+
+from src.core.rate_control import RateController, detect_block
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def make_controller(max_workers: int = 8, **kwargs) -> RateController:
+    params = dict(
+        min_workers=1, min_delay=0.0, max_delay=30.0, latency_target=10.0,
+        decrease_factor=0.5, cooldown=5.0, clock=FakeClock(), sleep=MagicMock(),
+    )
+    params.update(kwargs)
+    return RateController(max_workers, **params)
+
+class TestRateController(unittest.TestCase):
+    def test_multiplicative_decrease_on_block(self):
+        rate = make_controller()
+        delay = rate.delay
+
+        rate.record_failure("captcha")
+
+        self.assertEqual(int(rate.limit), 4)
+        self.assertAlmostEqual(rate.delay, delay * 2)
+        self.assertEqual(rate.stats.snapshot(), {"captcha": 1})
+
+    def test_cooldown_absorbs_bursts(self):
+        clock = FakeClock()
+        rate = make_controller(clock=clock)
+
+        rate.record_failure("timeout")
+        rate.record_failure("timeout")
+        self.assertEqual(int(rate.limit), 4)
+
+        clock.now = 6.0
+        rate.record_failure("timeout")
+        self.assertEqual(int(rate.limit), 2)
+
+    def test_never_below_min_workers(self):
+        clock = FakeClock()
+        rate = make_controller(clock=clock, min_workers=2)
+        for i in range(5):
+            clock.now = i * 10.0
+            rate.record_failure("blocked")
+
+        self.assertEqual(int(rate.limit), 2)
+
+    def test_additive_increase_on_success(self):
+        rate = make_controller()
+        rate.record_failure("blocked")  # 8 -> 4
+        delay = rate.delay
+
+        for _ in range(5):
+            rate.record_success(1.0)
+
+        self.assertEqual(int(rate.limit), 5)  # ~+1 por ronda de `limit` páginas
+        self.assertLess(rate.delay, delay)
+
+    def test_high_latency_counts_as_congestion(self):
+        rate = make_controller()
+        rate.record_success(25.0)
+
+        self.assertEqual(int(rate.limit), 4)
+
+    def test_slot_limits_active_workers(self):
+        rate = make_controller(max_workers=2)
+        rate.record_failure("blocked")  # 2 -> 1
+        entered = []
+
+        with rate.slot():
+            waiter = threading.Thread(target=lambda: rate.slot().__enter__() or entered.append(True))
+            waiter.start()
+            waiter.join(timeout=0.2)
+            self.assertEqual(entered, [])  # Bloqueado mientras el único puesto está ocupado
+        waiter.join(timeout=2)
+
+        self.assertEqual(entered, [True])
+
+    def test_pause_uses_current_delay(self):
+        sleep = MagicMock()
+        rate = make_controller(sleep=sleep)
+        rate.jitter = 0.0
+
+        rate.pause()
+
+        sleep.assert_called_once_with(rate.delay)
+
+class TestDetectBlock(unittest.TestCase):
+    def test_returns_script_verdict(self):
+        driver = MagicMock()
+        driver.execute_script.return_value = "captcha"
+        self.assertEqual(detect_block(driver), "captcha")
+
+    def test_driver_error_is_not_a_block(self):
+        driver = MagicMock()
+        driver.execute_script.side_effect = WebDriverException("sesión caída")
+        self.assertIsNone(detect_block(driver))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,179 @@
+import itertools
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from src.core import user_agents
+from src.core.driver import DriverPool, RemoteGrid, supports_cdp
+
+class StandInNode(ThreadingHTTPServer):
+    """
+    Nodo WebDriver mínimo (W3C): crear/cerrar sesión, `execute/sync` y ventana actual.
+    CDP opcional: `goog/cdp/execute` (`cdp_http`) o solo la capability `se:cdp` (`se_cdp`).
+    """
+    ids = itertools.count(1)
+
+    def __init__(self, cdp_http: bool = False, se_cdp: bool = False):
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.cdp_http = cdp_http
+        self.se_cdp = se_cdp
+        self.sessions = set()
+        self.url = f"http://127.0.0.1:{self.server_address[1]}"
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status: int, value) -> None:
+        body = json.dumps({"value": value}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        parts = self.path.strip("/").split("/")
+        if parts == ["session"]:
+            session_id = f"s{next(StandInNode.ids)}"
+            self.server.sessions.add(session_id)
+            capabilities = {"browserName": "chrome"}
+            if self.server.se_cdp:
+                capabilities["se:cdp"] = f"ws://grid/session/{session_id}/se/cdp"
+            return self.reply(200, {"sessionId": session_id, "capabilities": capabilities})
+        if parts[0] == "session" and parts[2:] == ["execute", "sync"] and parts[1] in self.server.sessions:
+            return self.reply(200, 1)
+        if parts[2:] == ["goog", "cdp", "execute"] and self.server.cdp_http:
+            return self.reply(200, {"product": "Chrome/126"})
+        self.reply(404, {"error": "unknown command", "message": self.path, "stacktrace": ""})
+
+    def do_GET(self):
+        if self.path.strip("/").split("/")[2:] == ["window"]:
+            return self.reply(200, "TARGET-1")
+        self.reply(404, {"error": "unknown command", "message": self.path, "stacktrace": ""})
+
+    def do_DELETE(self):
+        self.server.sessions.discard(self.path.strip("/").split("/")[-1])
+        self.reply(200, None)
+
+class FakeCdpSocket:
+    """WebSocket CDP de un navegador: responde a cada comando, precedido de un evento."""
+    def __init__(self, url, timeout=None):
+        self.url = url
+        self.sent = []
+        self._replies = []
+
+    def send(self, data):
+        message = json.loads(data)
+        self.sent.append(message)
+        result = {"sessionId": "cdp-1"} if message["method"] == "Target.attachToTarget" else {}
+        self._replies += [{"method": "Network.loadingFinished"}, {"id": message["id"], "result": result}]
+
+    def recv(self):
+        return json.dumps(self._replies.pop(0))
+
+    def close(self):
+        pass
+
+class TestRemoteGrid(unittest.TestCase):
+    def setUp(self):
+        self.nodes = [StandInNode(), StandInNode()]
+        user_agents_pool = patch.object(user_agents, "_pool", ["ua-test"])  # Sin tocar la caché en data/
+        user_agents_pool.start()
+        self.addCleanup(user_agents_pool.stop)
+
+    def tearDown(self):
+        for node in self.nodes:
+            node.shutdown()
+            node.server_close()
+
+    def test_balances_browsers_by_free_slots(self):
+        big, small = self.nodes
+        grid = RemoteGrid([{"url": big.url, "capacity": 3}, {"url": small.url, "capacity": 1}])
+        pool = DriverPool(grid.capacity, factory=grid.create_driver, on_quit=grid.release, max_rss_mb=0, tabs_per_browser=1)
+
+        pool.prewarm()
+
+        self.assertEqual((len(big.sessions), len(small.sessions)), (3, 1))
+        pooled = pool.acquire()
+        self.assertEqual(pooled.driver.execute_script("return 1"), 1)
+        pool.release(pooled)
+        pool.close()
+        self.assertEqual((len(big.sessions), len(small.sessions)), (0, 0))
+        self.assertTrue(all(node.in_use == 0 for node in grid.nodes))
+
+    def test_recycled_browser_goes_to_node_with_free_slot(self):
+        first, second = self.nodes
+        grid = RemoteGrid([{"url": first.url, "capacity": 1}, {"url": second.url, "capacity": 1}])
+        pool = DriverPool(1, factory=grid.create_driver, on_quit=grid.release, max_uses=1, max_rss_mb=0, tabs_per_browser=1)
+
+        pooled = pool.acquire()
+        pool.release(pooled)  # Reciclado tras 1 hotel: libera su hueco
+        pool.acquire()
+
+        self.assertEqual([node.sessions for node in grid.nodes], [1, 1])
+        pool.close()
+
+    def test_unreachable_node_falls_back_to_next(self):
+        dead = StandInNode()
+        dead.shutdown()
+        dead.server_close()
+        grid = RemoteGrid([{"url": dead.url, "capacity": 5}, {"url": self.nodes[0].url, "capacity": 1}])
+
+        driver = grid.create_driver()
+
+        self.assertEqual(grid.nodes[0].failures, 1)
+        self.assertEqual(grid.nodes[0].in_use, 0)
+        self.assertEqual(len(self.nodes[0].sessions), 1)
+        driver.quit()
+
+    def test_node_without_cdp_disables_cdp_features(self):
+        grid = RemoteGrid([{"url": self.nodes[0].url, "capacity": 2}])
+
+        drivers = [grid.create_driver(), grid.create_driver()]
+
+        self.assertFalse(grid.nodes[0].cdp)
+        self.assertFalse(any(supports_cdp(driver) for driver in drivers))
+        for driver in drivers:
+            driver.quit()
+
+    def test_node_forwarding_goog_cdp_keeps_cdp_features(self):
+        node = StandInNode(cdp_http=True)
+        self.addCleanup(node.server_close)
+        self.addCleanup(node.shutdown)
+        grid = RemoteGrid([{"url": node.url, "capacity": 1}])
+
+        driver = grid.create_driver()
+
+        self.assertTrue(grid.nodes[0].cdp)
+        self.assertTrue(supports_cdp(driver))
+        self.assertEqual(driver.execute_cdp_cmd("Browser.getVersion", {}), {"product": "Chrome/126"})
+        driver.quit()
+
+    def test_grid_se_cdp_websocket_used_when_goog_cdp_missing(self):
+        node = StandInNode(se_cdp=True)
+        self.addCleanup(node.server_close)
+        self.addCleanup(node.shutdown)
+        grid = RemoteGrid([{"url": node.url, "capacity": 1}])
+
+        with patch("websocket.create_connection", FakeCdpSocket):
+            driver = grid.create_driver()
+        driver.execute_cdp_cmd("Network.enable", {})
+
+        self.assertTrue(grid.nodes[0].cdp)
+        self.assertTrue(supports_cdp(driver))
+        sent = driver._se_cdp._ws.sent
+        self.assertEqual(driver._se_cdp._ws.url, driver.caps["se:cdp"])
+        self.assertEqual(
+            [(m["method"], m.get("sessionId")) for m in sent],
+            [("Target.attachToTarget", None), ("Browser.getVersion", "cdp-1"), ("Network.enable", "cdp-1")],
+        )
+        self.assertEqual(sent[0]["params"], {"targetId": "TARGET-1", "flatten": True})
+        driver.quit()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import json
+import unittest
+from unittest.mock import MagicMock
+
+from src import config
+from src.core import resource_policy
+from src.core.resource_policy import apply_resource_policy, blocked_patterns, collect_blocked_requests
+from src.utils.metrics import CounterStats
+
+def perf_entry(method: str, **params) -> dict:
+    return {"message": json.dumps({"message": {"method": method, "params": params}})}
+
+class TestResourcePolicy(unittest.TestCase):
+    def setUp(self):
+        resource_policy.BLOCKED_STATS = CounterStats()
+
+    def test_apply_policy_only_when_page_type_changes(self):
+        driver = MagicMock()
+        driver._resource_page_type = None
+
+        apply_resource_policy(driver, "hotel")
+        apply_resource_policy(driver, "hotel")
+
+        driver.execute_cdp_cmd.assert_any_call("Network.setBlockedURLs", {"urls": blocked_patterns("hotel")})
+        self.assertEqual(driver.execute_cdp_cmd.call_count, 2) # enable + setBlockedURLs una sola vez
+
+    def test_patterns_follow_policy(self):
+        patterns = blocked_patterns("search")
+        for category in config.RESOURCE_POLICY["search"]:
+            for pattern in config.BLOCKED_URL_PATTERNS[category]:
+                self.assertIn(pattern, patterns)
+        self.assertEqual(blocked_patterns("desconocido"), [])
+
+    def test_collect_counts_only_blocked_failures(self):
+        driver = MagicMock()
+        driver.get_log.return_value = [
+            perf_entry("Network.loadingFailed", type="Image", blockedReason="inspector"),
+            perf_entry("Network.loadingFailed", type="Image", blockedReason="inspector"),
+            perf_entry("Network.loadingFailed", type="Font", blockedReason="inspector"),
+            perf_entry("Network.loadingFailed", type="XHR", errorText="net::ERR_ABORTED"),
+            perf_entry("Network.requestWillBeSent"),
+        ]
+
+        self.assertEqual(collect_blocked_requests(driver), 3)
+        self.assertEqual(resource_policy.BLOCKED_STATS.snapshot(), {"Image": 2, "Font": 1})
+
+if __name__ == '__main__':
+    unittest.main()
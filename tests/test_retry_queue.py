@@ -0,0 +1,120 @@
+import queue
+import unittest
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.core.database import Base
+from src.core.driver import DriverPool
+from src.core.hotel_links import utcnow
+from src.core.pipeline import _record_hotel_failure, _retry_failed_hotels
+from src.core.retry_queue import backoff_seconds, clear_failure, load_retry_state, next_retry_at, record_failure
+from src.models import FailedHotel
+
+class TestRetryQueue(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine('sqlite:///:memory:')
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.session = self.Session()
+        self.config = patch.multiple(
+            "src.core.retry_queue.config", RETRY_MAX_ATTEMPTS=3, RETRY_BASE_DELAY=60.0, RETRY_MAX_BACKOFF=200.0,
+            RETRY_ROUNDS_IN_RUN=1,
+        )
+        self.config.start()
+
+    def tearDown(self):
+        self.config.stop()
+        self.session.close()
+        Base.metadata.drop_all(self.engine)
+
+    def test_exponential_backoff_is_capped(self):
+        self.assertEqual([backoff_seconds(n) for n in (1, 2, 3, 4)], [60.0, 120.0, 200.0, 200.0])
+
+    def test_failure_is_recorded_with_reason_and_attempts(self):
+        record_failure(self.session, "a", "TimeoutException: sin respuesta")
+        failed = record_failure(self.session, "a", "HotelFailedError: sin modal")
+
+        self.assertEqual(failed.attempts, 2)
+        self.assertEqual(failed.last_error, "HotelFailedError: sin modal")
+        self.assertFalse(failed.dead)
+        self.assertGreater(failed.next_attempt_at, utcnow() + timedelta(seconds=100))
+
+    def test_dead_letter_after_max_attempts(self):
+        for _ in range(3):
+            record_failure(self.session, "a", "error")
+
+        state = load_retry_state(self.session)
+        self.assertEqual(state.dead, {"a"})
+        self.assertIsNone(next_retry_at(self.session))
+
+    def test_blocked_page_does_not_count_toward_dead_letter(self):
+        for _ in range(5):
+            failed = record_failure(self.session, "a", "BlockedPageError: captcha", blocked=True)
+
+        self.assertEqual(failed.attempts, 0)
+        self.assertFalse(failed.dead)
+        self.assertGreater(failed.next_attempt_at, utcnow() + timedelta(seconds=50))
+
+    def test_failing_hotel_still_pending_after_one_run(self):
+        def always_fail(hotel_queue, stats, worker_args):
+            while (url := hotel_queue.get()) is not None:
+                _record_hotel_failure(url, "error")
+                hotel_queue.task_done()
+
+        # Sin espera de backoff: sin límite de rondas agotaría los 3 intentos en esta ejecución
+        with patch("src.core.retry_queue.config.RETRY_BASE_DELAY", 0.0), \
+                patch("src.core.pipeline.SessionLocal", self.Session), \
+                patch("src.core.pipeline._run_workers", side_effect=always_fail) as run_workers:
+            record_failure(self.session, "a", "error")  # Fallo durante la ejecución
+            _retry_failed_hotels([None], (queue.Queue(), MagicMock(), None))
+
+        run_workers.assert_called_once()
+        self.session.expire_all()
+        failed = self.session.query(FailedHotel).one()
+        self.assertEqual((failed.attempts, failed.dead), (2, False))
+
+    def test_retry_round_uses_a_fresh_browser(self):
+        pool = DriverPool(1, max_uses=10, max_rss_mb=0, factory=MagicMock, tabs_per_browser=1)
+        failing = pool.acquire()
+        pool.release(failing, failed=True)  # Sesión viva: el pool la conservaría
+        retried_on = []
+
+        def retry(hotel_queue, stats, worker_args):
+            while (url := hotel_queue.get()) is not None:
+                pooled = pool.acquire()
+                retried_on.append(pooled.driver)
+                pool.release(pooled)
+                hotel_queue.task_done()
+
+        with patch("src.core.retry_queue.config.RETRY_BASE_DELAY", 0.0), \
+                patch("src.core.pipeline.SessionLocal", self.Session), \
+                patch("src.core.pipeline._run_workers", side_effect=retry):
+            record_failure(self.session, "a", "error")
+            _retry_failed_hotels([None], (queue.Queue(), pool, None))
+
+        self.assertEqual(len(retried_on), 1)
+        self.assertIsNot(retried_on[0], failing.driver)
+        failing.driver.quit.assert_called_once()
+        pool.close()
+
+    def test_state_splits_due_and_waiting(self):
+        record_failure(self.session, "a", "error")
+        record_failure(self.session, "b", "error")
+
+        later = load_retry_state(self.session, now=utcnow() + timedelta(seconds=61))
+        self.assertEqual(sorted(later.due), ["a", "b"])
+        now = load_retry_state(self.session)
+        self.assertEqual((now.due, now.waiting), ([], {"a", "b"}))
+
+    def test_success_clears_failure(self):
+        record_failure(self.session, "a", "error")
+        clear_failure(self.session, "a")
+        clear_failure(self.session, "sin-fallos")
+
+        self.assertEqual(self.session.query(FailedHotel).count(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
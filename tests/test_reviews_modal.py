@@ -82,3 +82,109 @@ def test_extract_current_page(reviews_modal, mock_driver):
     assert r2['score'] == "4.0" # extract_score_from_text convierte "4,0" a "4.0"
     assert r2['positive'] == "No me gustó el ruido." # Fallback body
     assert r2['negative'] == ""
+
+def test_iter_review_pages_streams_and_respects_limit(reviews_modal):
+    pages = [
+        [{"title": "a"}, {"title": "b"}],
+        [{"title": "c"}, {"title": "d"}],
+        [{"title": "e"}],
+    ]
+    reviews_modal.extract_current_page = MagicMock(side_effect=pages)
+    reviews_modal.next_page = MagicMock(return_value=True)
+
+    batches = list(reviews_modal.iter_review_pages(max_reviews=3))
+
+    assert batches == [(1, [{"title": "a"}, {"title": "b"}]), (2, [{"title": "c"}])]
+    assert reviews_modal.next_page.call_count == 1
+
+def test_iter_review_pages_resumes_from_start_page(reviews_modal):
+    reviews_modal.extract_current_page = MagicMock(side_effect=[[{"title": "p3"}]])
+    reviews_modal.next_page = MagicMock(side_effect=[True, True, False])
+
+    batches = list(reviews_modal.iter_review_pages(max_reviews=100, start_page=3))
+
+    # Las páginas 1 y 2 se saltan sin extraerse
+    assert batches == [(3, [{"title": "p3"}])]
+    assert reviews_modal.extract_current_page.call_count == 1
+
+def test_iter_review_pages_resume_counts_saved_pages_toward_limit(reviews_modal):
+    page = [{"title": f"r{i}"} for i in range(10)]
+    reviews_modal.extract_current_page = MagicMock(side_effect=[page, page])
+    reviews_modal.next_page = MagicMock(return_value=True)
+
+    # Páginas 1-2 ya guardadas con 18 reseñas (checkpoint): con límite 25 solo faltan 7
+    batches = list(reviews_modal.iter_review_pages(max_reviews=25, start_page=3, saved_count=18))
+
+    assert [(n, len(batch)) for n, batch in batches] == [(3, 7)]
+
+def test_next_page_without_button_ends_pagination(reviews_modal, mock_driver, monkeypatch):
+    from selenium.common.exceptions import TimeoutException
+    import src.pages.reviews_modal as module
+    wait = MagicMock()
+    wait.return_value.until.side_effect = TimeoutException("sin botón")
+    monkeypatch.setattr(module, "WebDriverWait", wait)
+    mock_driver.execute_script.return_value = "complete"
+
+    assert reviews_modal.next_page() is False
+
+def test_extract_current_page_load_timeout_propagates(reviews_modal, mock_driver, monkeypatch):
+    from selenium.common.exceptions import TimeoutException
+    import src.pages.reviews_modal as module
+    wait = MagicMock()
+    wait.return_value.until.side_effect = TimeoutException("sin reseñas")
+    monkeypatch.setattr(module, "WebDriverWait", wait)
+
+    mock_driver.execute_script.return_value = "complete"
+    assert reviews_modal.extract_current_page() == []
+
+    mock_driver.execute_script.return_value = "loading"
+    with pytest.raises(TimeoutException):
+        reviews_modal.extract_current_page()
+
+def test_next_page_load_timeout_after_click_propagates(reviews_modal, mock_driver, monkeypatch):
+    from selenium.common.exceptions import TimeoutException
+    import src.pages.reviews_modal as module
+    wait = MagicMock()
+    wait.return_value.until.side_effect = [MagicMock(), TimeoutException("no cargó")]
+    monkeypatch.setattr(module, "WebDriverWait", wait)
+
+    with pytest.raises(TimeoutException):
+        reviews_modal.next_page()
+
+def test_iter_review_pages_incremental_stops_at_known_page(reviews_modal):
+    from src.utils.hashing import compute_review_hash
+    known_page = [{"hotel_url": "http://test.com", "title": "old"}]
+    reviews_modal.extract_current_page = MagicMock(side_effect=[[{"hotel_url": "http://test.com", "title": "new"}], known_page])
+    reviews_modal.next_page = MagicMock(return_value=True)
+    known = {compute_review_hash(known_page[0])}
+
+    batches = list(reviews_modal.iter_review_pages(max_reviews=100, is_known=known.__contains__))
+
+    assert [page for page, _ in batches] == [1]
+    assert reviews_modal.next_page.call_count == 1
+
+def test_extract_current_page_js(reviews_modal, mock_driver):
+    mock_driver.execute_script.return_value = [
+        {"title": "Excelente estancia", "score": "9,5", "positive": "Limpio", "negative": "", "body": "", "date": "20 Oct 2023"},
+        {"title": "Malo", "score": "4", "positive": "", "negative": "", "body": "No me gustó el ruido.", "date": "10 Jan 2023"},
+    ]
+    reviews_modal.js_extraction = True
+
+    reviews = reviews_modal.extract_current_page()
+
+    assert mock_driver.execute_script.call_count == 1
+    assert reviews[0]["score"] == "9.5"
+    assert reviews[0]["hotel_name"] == "Test Hotel"
+    assert reviews[1]["positive"] == "No me gustó el ruido." # Fallback body
+
+def test_extract_current_page_js_falls_back(reviews_modal, mock_driver):
+    from selenium.common.exceptions import JavascriptException
+    mock_driver.execute_script.side_effect = JavascriptException("boom")
+    mock_driver.find_elements.return_value = [MagicMock(spec=WebElement)]
+    reviews_modal._get_safe_text = MagicMock(return_value="x")
+    reviews_modal.js_extraction = True
+
+    reviews = reviews_modal.extract_current_page()
+
+    assert len(reviews) == 1
+    assert reviews[0]["title"] == "x"
@@ -0,0 +1,66 @@
+import threading
+import unittest
+
+from src.core.search_frontier import SearchFrontier, build_search_urls
+
+def card(url: str) -> dict:
+    return {"url": url, "name": "", "review_count": None, "score": None}
+
+class TestBuildSearchUrls(unittest.TestCase):
+    def test_regions_times_partitions(self):
+        urls = build_search_urls(
+            ["https://b.com/searchresults.html?ss=Tlaxcala", "https://b.com/searchresults.html?ss=Puebla"],
+            ["nflt=class%3D4", "nflt=class%3D5"],
+        )
+
+        self.assertEqual(len(urls), 4)
+        self.assertIn("https://b.com/searchresults.html?ss=Puebla&nflt=class%3D5", urls)
+
+    def test_without_partitions(self):
+        self.assertEqual(build_search_urls(["u1", "u1", "u2"]), ["u1", "u2"])
+
+class TestSearchFrontier(unittest.TestCase):
+    def test_dedups_across_regions_and_reports_progress(self):
+        results = {
+            "tlaxcala": [[card("a"), card("b")], [card("c")]],
+            "puebla": [[card("b"), card("d")]],
+        }
+        frontier = SearchFrontier(list(results), lambda url: iter(results[url]), parallelism=2)
+
+        urls = [c["url"] for batch in frontier for c in batch]
+
+        self.assertEqual(sorted(urls), ["a", "b", "c", "d"])
+        self.assertEqual(frontier.stats["tlaxcala"].cards + frontier.stats["puebla"].cards, 5)
+        self.assertEqual(frontier.stats["tlaxcala"].new_cards + frontier.stats["puebla"].new_cards, 4)
+        self.assertTrue(all(s.done for s in frontier.stats.values()))
+
+    def test_failing_region_does_not_stop_others(self):
+        def search(url):
+            if url == "bad":
+                raise RuntimeError("sin resultados")
+            yield [card(url)]
+
+        frontier = SearchFrontier(["bad", "good"], search, parallelism=2)
+
+        self.assertEqual([c["url"] for batch in frontier for c in batch], ["good"])
+        self.assertEqual(frontier.stats["bad"].error, "sin resultados")
+
+    def test_consumer_stop_closes_searches(self):
+        closed = threading.Event()
+        def endless(url):
+            try:
+                i = 0
+                while True:
+                    i += 1
+                    yield [card(f"{url}-{i}")]
+            finally:
+                closed.set()
+
+        frontier = SearchFrontier(["r1"], endless, parallelism=1)
+        for _ in frontier:
+            break
+
+        self.assertTrue(closed.wait(timeout=2))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("zstandard")
+pytest.importorskip("lxml")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.core.database import Base
+from src.core.pipeline import upsert_reviews_batch
+from src.core.snapshot_store import SnapshotStore, load_snapshots, record_snapshot
+from src.models import Review
+from src.pages.review_parser import parse_reviews_html
+from src.reextract import reextract
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "review_list.html")
+HOTEL_URL = "https://www.booking.com/hotel/mx/casa-azul.es.html"
+
+class TestSnapshotStore(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = SnapshotStore(self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_put_get_roundtrip(self):
+        digest = self.store.put("<html>ñ</html>")
+
+        self.assertEqual(self.store.get(digest), "<html>ñ</html>")
+        self.assertTrue(os.path.exists(self.store.path_for(digest)))
+
+    def test_identical_pages_stored_once(self):
+        first = self.store.put("<html>a</html>")
+        second = self.store.put("<html>a</html>")
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(os.listdir(os.path.join(self.root, first[:2]))), 1)
+
+class TestReextract(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.root, 'test.db')}")
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+
+        store = SnapshotStore(os.path.join(self.root, "snapshots"))
+        with open(FIXTURE, encoding="utf-8") as f:
+            digest = store.put(f.read())
+        hotel_digest = store.put("<html><head><meta property='og:title' content='Casa Azul, Tlaxcala'></head></html>")
+        db = self.Session()
+        record_snapshot(db, HOTEL_URL, "reviews", 1, digest, "Nombre viejo")
+        record_snapshot(db, HOTEL_URL, "hotel", 0, hotel_digest)
+        db.close()
+
+    def tearDown(self):
+        self.engine.dispose()
+        shutil.rmtree(self.root)
+
+    def test_record_snapshot_keeps_latest(self):
+        db = self.Session()
+        record_snapshot(db, HOTEL_URL, "reviews", 1, "otro-hash")
+
+        snapshots = load_snapshots(db, "reviews")
+        self.assertEqual([s.content_hash for s in snapshots], ["otro-hash"])
+        self.assertEqual(snapshots[0].hotel_name, "Nombre viejo")
+        db.close()
+
+    def test_reextract_upserts_reviews(self):
+        with patch("src.reextract.SessionLocal", self.Session):
+            written = reextract(workers=2, root=os.path.join(self.root, "snapshots"))
+            # Una segunda pasada actualiza en lugar de duplicar
+            reextract(workers=1, root=os.path.join(self.root, "snapshots"))
+
+        self.assertEqual(written, {HOTEL_URL: 2})
+        db = self.Session()
+        reviews = db.query(Review).order_by(Review.title).all()
+        self.assertEqual([r.title for r in reviews], ["Excelente estancia", "Regular"])
+        self.assertEqual({r.hotel_name for r in reviews}, {"Casa Azul"})
+        self.assertEqual(reviews[0].score, 9.5)
+        db.close()
+
+    def test_reextract_keys_on_reviews_hotel_url(self):
+        # Booking redirigió la URL encolada: las filas en vivo llevan la URL final
+        live_url = "https://www.booking.com/hotel/mx/casa-azul.es-mx.html?aid=1"
+        snapshots = os.path.join(self.root, "snapshots")
+        db = self.Session()
+        with open(FIXTURE, encoding="utf-8") as f:
+            digest = SnapshotStore(snapshots).put(f.read())
+        record_snapshot(db, HOTEL_URL, "reviews", 1, digest, reviews_hotel_url=live_url)
+        live_reviews = parse_reviews_html(SnapshotStore(snapshots).get(digest), "Casa Azul", live_url)
+        upsert_reviews_batch(db, live_reviews)
+        db.commit()
+        db.close()
+
+        with patch("src.reextract.SessionLocal", self.Session):
+            written = reextract(workers=1, replace=True, root=snapshots)
+
+        self.assertEqual(written, {live_url: 2})
+        db = self.Session()
+        self.assertEqual({r.hotel_url for r in db.query(Review)}, {live_url})
+        self.assertEqual(db.query(Review).count(), 2)
+        db.close()
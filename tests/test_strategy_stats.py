@@ -0,0 +1,60 @@
+import unittest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.core.database import Base
+from src.core.strategy_stats import StrategyStats
+
+A = ("css selector", "#a")
+B = ("css selector", "#b")
+C = ("id", "c")
+
+class TestStrategyStats(unittest.TestCase):
+    def test_order_by_hit_rate_keeps_ties_stable(self):
+        stats = StrategyStats()
+        self.assertEqual(stats.order([A, B, C]), [A, B, C])
+
+        stats.record(A, False)
+        stats.record(A, False)
+        stats.record(C, True)
+        self.assertEqual(stats.order([A, B, C]), [C, B, A])
+
+    def test_save_and_load(self):
+        engine = create_engine('sqlite:///:memory:')
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+
+        stats = StrategyStats()
+        stats.record(B, True)
+        stats.save(session)
+        stats.record(B, True) # Guardar de nuevo actualiza la fila existente
+        stats.save(session)
+
+        loaded = StrategyStats()
+        loaded.load(session)
+        self.assertEqual(loaded.order([A, B]), [B, A])
+        self.assertAlmostEqual(loaded.hit_rate(B), 3 / 4)
+        session.close()
+
+    def test_processes_add_up_instead_of_overwriting(self):
+        engine = create_engine('sqlite:///:memory:')
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        # Dos procesos cargan el mismo historial y guardan al terminar
+        first, second = StrategyStats(), StrategyStats()
+        first.load(session)
+        second.load(session)
+        first.record(A, True)
+        second.record(A, False)
+        second.record(A, False)
+        first.save(session)
+        second.save(session)
+        second.save(session)  # Sin intentos nuevos no suma nada
+
+        loaded = StrategyStats()
+        loaded.load(session)
+        self.assertAlmostEqual(loaded.hit_rate(A), (1 + 1) / (3 + 2))
+        session.close()
+
+if __name__ == '__main__':
+    unittest.main()
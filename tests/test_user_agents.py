@@ -0,0 +1,66 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from src.core import user_agents
+from src.core.driver import build_chrome_options
+from src.core.user_agents import FALLBACK_USER_AGENT, load_user_agent_pool
+
+class TestUserAgentPool(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "user_agents.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_generates_and_caches_on_miss(self):
+        with patch.object(user_agents, "_generate", return_value=["ua-1", "ua-2"]) as generate:
+            self.assertEqual(load_user_agent_pool(self.path, size=2, ttl_hours=1), ["ua-1", "ua-2"])
+            self.assertEqual(load_user_agent_pool(self.path, size=2, ttl_hours=1), ["ua-1", "ua-2"])
+
+        generate.assert_called_once_with(2)
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), ["ua-1", "ua-2"])
+
+    def test_stale_cache_is_regenerated(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(["viejo"], f)
+        old = time.time() - 2 * 3600
+        os.utime(self.path, (old, old))
+
+        with patch.object(user_agents, "_generate", return_value=["nuevo"]):
+            self.assertEqual(load_user_agent_pool(self.path, size=1, ttl_hours=1), ["nuevo"])
+
+    def test_fallback_when_generation_fails(self):
+        with patch.object(user_agents, "_generate", side_effect=RuntimeError("sin dataset")):
+            self.assertEqual(load_user_agent_pool(self.path, size=5, ttl_hours=1), [FALLBACK_USER_AGENT])
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_process_pool_is_loaded_once(self):
+        with patch.object(user_agents, "_pool", None), \
+                patch.object(user_agents, "load_user_agent_pool", return_value=["ua"]) as load:
+            threads = [threading.Thread(target=user_agents.user_agent_pool) for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        load.assert_called_once()
+
+class TestChromeOptions(unittest.TestCase):
+    def test_each_driver_gets_one_user_agent_over_shared_base(self):
+        with patch.object(user_agents, "_pool", ["ua-a"]):
+            first = build_chrome_options()
+            second = build_chrome_options()
+
+        self.assertIsNot(first, second)
+        for options in (first, second):
+            self.assertEqual([arg for arg in options.arguments if arg.startswith("user-agent=")], ["user-agent=ua-a"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import threading
+import unittest
+
+from src.core.work_queue import HotelQueue
+
+def drain(q: HotelQueue) -> list:
+    items = []
+    while True:
+        item = q.get()
+        if item is None:
+            return items
+        items.append(item)
+        q.task_done()
+
+class TestHotelQueue(unittest.TestCase):
+    def test_fifo_without_counts(self):
+        q = HotelQueue(["a", "b", "c"])
+        self.assertEqual(drain(q), ["a", "b", "c"])
+
+    def test_longest_job_first(self):
+        q = HotelQueue(["small", "big", "unknown"], {"small": 10, "big": 900})
+        self.assertEqual(len(q), 3)
+        self.assertEqual(drain(q), ["big", "small", "unknown"])
+
+    def test_page_jobs_before_pending_hotels(self):
+        q = HotelQueue(["h1", "h2"])
+        self.assertEqual(q.get(), "h1")
+        job = {"hotel_url": "h1", "reviews_hotel_url": "h1", "hotel_name": "H1", "page": 2, "offset": 25, "expected_count": 50}
+        q.put_page(job)
+        q.task_done()
+        self.assertEqual(drain(q), [job, "h2"])
+
+    def test_get_waits_for_in_flight_items(self):
+        q = HotelQueue(["h1"])
+        self.assertEqual(q.get(), "h1")
+        got = []
+        waiter = threading.Thread(target=lambda: got.append(q.get()))
+        waiter.start()
+
+        # Mientras h1 está en proceso la cola vacía no significa fin: llega una página
+        q.put_page({"hotel_url": "h1", "reviews_hotel_url": "h1", "hotel_name": "H1", "page": 2, "offset": 25, "expected_count": 50})
+        q.task_done()
+        waiter.join(timeout=2)
+
+        self.assertEqual(got[0]["page"], 2)
+
+    def test_open_queue_waits_for_producer(self):
+        q = HotelQueue(closed=False)
+        got = []
+        consumer = threading.Thread(target=lambda: got.extend(drain(q)))
+        consumer.start()
+
+        q.put("h1")
+        q.put("h2")
+        q.close()
+        consumer.join(timeout=2)
+
+        self.assertFalse(consumer.is_alive())
+        self.assertEqual(got, ["h1", "h2"])
+
+if __name__ == '__main__':
+    unittest.main()